@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'incubator.middleware.QueryProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -89,6 +90,17 @@ DATABASES = {
 }
 
 
+# Cache
+# Dashboard card fragments are cached per startup version (see Startup.card_version);
+# use a shared backend such as Memcached or Redis when running several processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -107,6 +119,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+AUTHENTICATION_BACKENDS = ['incubator.backends.EmailOrUsernameBackend']
+
+# Failed-login throttling (incubator.throttle.LoginThrottle): failures allowed per window
+LOGIN_THROTTLE = {
+    'IP_LIMIT': 30,
+    'ACCOUNT_LIMIT': 5,
+    'WINDOW': 300,  # seconds
+}
+
+# Bulk account creation (incubator.hashing.hash_passwords): whether to hash in a process
+# pool (off under runserver and in tests, where hashing stays synchronous), the processes
+# used (None = one per CPU) and the batch size below which hashing stays inline
+PASSWORD_HASH_POOL = not DEBUG
+PASSWORD_HASH_WORKERS = None
+PASSWORD_HASH_POOL_MIN = 32
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
@@ -130,6 +158,53 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored once per distinct content under MEDIA_ROOT/cas/ (incubator.storage);
+# files under cas/ never change, so the front server may serve them as immutable
+STORAGES = {
+    'default': {'BACKEND': 'incubator.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Resumable deliverable uploads (incubator.uploads): largest chunk and file accepted.
+# Partial files live in CHUNKED_UPLOAD_TEMP_DIR (default MEDIA_ROOT/partial_uploads);
+# keep it on the same filesystem as MEDIA_ROOT so finished uploads are moved, not copied
+CHUNKED_UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 2 * 1024 ** 3
+CHUNKED_UPLOAD_TEMP_DIR = None
+
+# Permission-checked deliverable downloads (incubator.downloads.serve_file). Set to
+# 'X-Accel-Redirect' (nginx) or 'X-Sendfile' (Apache mod_xsendfile) to hand transfers
+# to the front server; None streams from Django. For nginx, map the prefix with
+#   location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+MEDIA_SENDFILE_HEADER = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Background jobs (incubator.jobs), run by `manage.py run_worker`. EAGER runs each due job
+# in-process right after commit, so `runserver` works without a worker (jobs scheduled for
+# later, such as retries and status rollups, still wait for one); turn it off (and run at
+# least one worker) in production, or new startups get no milestones, deletions and file
+# attachments never finish
+JOB_QUEUE_EAGER = DEBUG
+JOB_STALE_AFTER = 600  # seconds before a job on a dead worker is requeued
+JOB_KEEP_COMPLETED = False
+
+# Startup logo variants (incubator.logos): bounding-box widths in px and encoder quality
+LOGO_VARIANT_WIDTHS = (64, 128, 256)
+LOGO_WEBP_QUALITY = 80
+LOGO_JPEG_QUALITY = 82
+
+# Rows fetched per round trip by the streamed CSV/JSONL exports (incubator.exports)
+EXPORT_CHUNK_SIZE = 2000
+
+# Text kept per extracted deliverable file for search (incubator.documents)
+DOCUMENT_TEXT_MAX_CHARS = 1_000_000
+
+# Seconds a status transition waits before the daily rollups count it (incubator.rollups)
+STATUS_ROLLUP_SETTLE = 60
+
+# Seconds cohort analytics (incubator.analytics) stay cached; any status transition also refreshes them
+ANALYTICS_CACHE_SECONDS = 600
+
 AUTH_USER_MODEL = 'incubator.User'
 
 # Session & Cookie Settings for development
@@ -143,3 +218,21 @@ CSRF_COOKIE_SAMESITE = 'Lax'
 CSRF_USE_SESSIONS = False
 CSRF_FAILURE_VIEW = 'incubator.views.csrf_failure'
 
+
+# Per-request SQL profiling (incubator.middleware.QueryProfilingMiddleware)
+# Fraction of requests profiled (0..1). None profiles every request under DEBUG
+# and none otherwise; set a small rate (e.g. 0.01) to sample production traffic.
+QUERY_PROFILING_SAMPLE_RATE = None
+# A statement executed this many times in one request is reported as duplicated (N+1)
+QUERY_PROFILING_DUPLICATE_THRESHOLD = 2
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'incubator': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
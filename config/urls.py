@@ -3,7 +3,9 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from incubator.views import serve_public_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('incubator.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+] + static(settings.MEDIA_URL, view=serve_public_media, document_root=settings.MEDIA_ROOT)
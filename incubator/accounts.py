@@ -0,0 +1,87 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .hashing import hash_passwords
+from .models import User
+
+# Highest code point; base + this sorts after every username starting with base
+_PREFIX_END = '\U0010ffff'
+
+
+def base_username(first_name, last_name):
+    """The lastname.firstname username members get before de-duplication"""
+    return f"{last_name.lower()}.{first_name.lower()}".replace(" ", "")
+
+
+def _taken_suffixes(bases):
+    """Numeric suffixes already used per base, read with one indexed range query"""
+    taken = {base: set() for base in bases}
+    if not bases:
+        return taken
+    ranges = [Q(username__gte=base, username__lt=base + _PREFIX_END) for base in bases]
+    patterns = {base: re.compile(re.escape(base) + r'(\d*)') for base in bases}
+    for username in User.objects.filter(reduce(or_, ranges)).values_list('username', flat=True):
+        for base, pattern in patterns.items():
+            match = pattern.fullmatch(username)
+            if match:
+                # '' is the bare base, otherwise the numeric suffix
+                taken[base].add(int(match.group(1)) if match.group(1) else 0)
+    return taken
+
+
+def allocate_usernames(bases, chunk_size=200):
+    """Free usernames for each base in `bases`, in order.
+
+    The first free name for a base is the base itself, then base1, base2...
+    (the scheme add_member has always used). Repeated bases get distinct
+    names. Costs one query per `chunk_size` distinct bases, however many
+    suffixes are taken. Names are not reserved: callers still rely on the
+    unique constraint (see create_user_with_unique_username).
+    """
+    distinct = list(dict.fromkeys(bases))
+    taken = {}
+    for start in range(0, len(distinct), chunk_size):
+        taken.update(_taken_suffixes(distinct[start:start + chunk_size]))
+
+    usernames = []
+    for base in bases:
+        used = taken[base]
+        suffix = 0
+        while suffix in used:
+            suffix += 1
+        used.add(suffix)
+        usernames.append(f"{base}{suffix}" if suffix else base)
+    return usernames
+
+
+def create_user_with_unique_username(base, attempts=5, **fields):
+    """create_user() under the first free username for `base`.
+
+    A concurrent request may claim the same name between allocation and
+    INSERT; the unique constraint rejects it and allocation is retried.
+    """
+    for attempt in range(attempts):
+        username = allocate_usernames([base])[0]
+        try:
+            with transaction.atomic():
+                return User.objects.create_user(username=username, **fields)
+        except IntegrityError:
+            if attempt == attempts - 1 or not User.objects.filter(username=username).exists():
+                raise
+
+
+def bulk_create_users(users, passwords, batch_size=500):
+    """Hash `passwords` across CPU cores, then bulk-insert `users` with them.
+
+    Creating thousands of accounts one create_user() at a time is bound by
+    the hasher on a single core; here the hashes are computed in parallel
+    (see hash_passwords) and the rows inserted with bulk_create. Usernames
+    must already be allocated (allocate_usernames).
+    """
+    for user, encoded in zip(users, hash_passwords(passwords), strict=True):
+        user.password = encoded
+    return User.objects.bulk_create(users, batch_size=batch_size)
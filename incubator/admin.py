@@ -1,3 +1,26 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ProgramTemplate, MilestoneTemplate, DeliverableTemplate
+
+
+class MilestoneTemplateInline(admin.TabularInline):
+    model = MilestoneTemplate
+    extra = 0
+
+
+class DeliverableTemplateInline(admin.TabularInline):
+    model = DeliverableTemplate
+    extra = 0
+
+
+@admin.register(ProgramTemplate)
+class ProgramTemplateAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_default', 'created_at')
+    inlines = [MilestoneTemplateInline]
+
+
+@admin.register(MilestoneTemplate)
+class MilestoneTemplateAdmin(admin.ModelAdmin):
+    list_display = ('program', 'milestone_progress', 'title', 'due_offset_days')
+    list_filter = ('program',)
+    inlines = [DeliverableTemplateInline]
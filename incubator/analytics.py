@@ -0,0 +1,219 @@
+"""Cohort analytics over milestone completion times, computed with NumPy.
+
+All milestones are read with one values_list query (completion time,
+startup intake and stage/industry, latest deliverable upload) into
+arrays. Group statistics, percentiles, outlier fences and cohort curves
+are then computed with array operations rather than per-object loops,
+and the result is cached until the next status transition.
+NumPy is an optional dependency, imported on first use.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+
+from .cohorts import filter_cohort
+from .models import Milestone, StatusTransition
+
+PERCENTILES = (25, 50, 75, 90)
+CURVE_DAYS = (30, 60, 90, 180, 270, 365, 540, 730)
+FIELDS = (
+    'id', 'startup_id', 'startup__name', 'milestone_progress', 'startup__stage', 'startup__industry',
+    'startup__created_at', 'completed_at', 'last_upload',
+)
+
+
+class AnalyticsUnavailable(Exception):
+    pass
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise AnalyticsUnavailable('Cohort analytics require the numpy package.') from exc
+    return numpy
+
+
+def _wall_clock(value):
+    # numpy datetime64 is naive; compare in local time like cohort labels do
+    return None if value is None else timezone.localtime(value).replace(tzinfo=None)
+
+
+def load_arrays(cohort=None):
+    """One query for every milestone, returned as a dict of column arrays"""
+    np = _numpy()
+    milestones = Milestone.objects.all()
+    if cohort:
+        milestones = filter_cohort(milestones, cohort, field='startup__created_at')
+    rows = list(
+        milestones.annotate(last_upload=Max('deliverables__uploaded_at')).order_by().values_list(*FIELDS)
+    )
+    columns = dict(zip(FIELDS, zip(*rows))) if rows else dict.fromkeys(FIELDS, ())
+    return {
+        'id': np.array(columns['id'], dtype=np.int64),
+        'startup_id': np.array(columns['startup_id'], dtype=np.int64),
+        'startup_name': np.array(columns['startup__name'], dtype=object),
+        'progress': np.array([-1 if value is None else value for value in columns['milestone_progress']], dtype=np.int64),
+        'stage': np.array([value or '' for value in columns['startup__stage']], dtype=str),
+        'industry': np.array([value or 'Unspecified' for value in columns['startup__industry']], dtype=str),
+        'created': np.array([_wall_clock(value) for value in columns['startup__created_at']], dtype='datetime64[s]'),
+        'completed': np.array([_wall_clock(value) for value in columns['completed_at']], dtype='datetime64[s]'),
+        'last_upload': np.array([_wall_clock(value) for value in columns['last_upload']], dtype='datetime64[s]'),
+    }
+
+
+def _days(np, later, earlier):
+    days = (later - earlier) / np.timedelta64(1, 'D')  # NaT -> nan
+    days[days < 0] = np.nan  # completion recorded before the start is bad data, not a fast finish
+    return days
+
+
+def _grouped_percentiles(np, inverse, values, groups, percentiles):
+    """Linearly interpolated percentiles of `values` per group, shape (groups, len(percentiles)).
+
+    Sorting once by (group, value) puts each group's sample in a contiguous
+    run, so every percentile of every group is a vectorized index lookup.
+    Groups without values get nan.
+    """
+    present = ~np.isnan(values)
+    inverse, values = inverse[present], values[present]
+    order = np.lexsort((values, inverse))
+    ordered = values[order]
+    counts = np.bincount(inverse, minlength=groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    result = np.full((groups, len(percentiles)), np.nan)
+    has_values = counts > 0
+    if not has_values.any():
+        return result
+    positions = starts[has_values, None] + (counts[has_values, None] - 1) * (np.asarray(percentiles) / 100)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, (starts + counts - 1)[has_values, None])
+    fraction = positions - lower
+    result[has_values] = ordered[lower] + (ordered[upper] - ordered[lower]) * fraction
+    return result
+
+
+def _summary(np, keys, days, review_days):
+    labels, inverse = np.unique(keys, return_inverse=True)
+    groups = len(labels)
+    completed = ~np.isnan(days)
+    totals = np.bincount(inverse, minlength=groups)
+    done = np.bincount(inverse, weights=completed, minlength=groups)
+    day_sums = np.bincount(inverse, weights=np.where(completed, days, 0), minlength=groups)
+    percentiles = _grouped_percentiles(np, inverse, days, groups, PERCENTILES)
+    review = _grouped_percentiles(np, inverse, review_days, groups, (50,))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = day_sums / done
+
+    return [
+        {
+            'key': label.item() if hasattr(label, 'item') else label,
+            'milestones': int(totals[index]),
+            'completed': int(done[index]),
+            'mean_days': _round(means[index]),
+            **{f'p{p}_days': _round(percentiles[index, column]) for column, p in enumerate(PERCENTILES)},
+            'median_review_days': _round(review[index, 0]),
+        }
+        for index, label in enumerate(labels)
+    ], inverse, percentiles
+
+
+def _round(value):
+    return None if value != value else round(float(value), 1)  # nan -> None
+
+
+def _outliers(np, data, days, inverse, percentiles, limit=50):
+    """Completions beyond Tukey's fence (Q3 + 1.5 IQR) for their milestone number"""
+    q1, q3 = percentiles[:, PERCENTILES.index(25)], percentiles[:, PERCENTILES.index(75)]
+    fences = q3 + 1.5 * (q3 - q1)
+    sample_sizes = np.bincount(inverse, weights=~np.isnan(days), minlength=len(fences))
+    fences[sample_sizes < 4] = np.nan  # too few completions to call anything unusual
+    row_fence = fences[inverse]
+    with np.errstate(invalid='ignore'):
+        flagged = np.flatnonzero(days > row_fence)
+    flagged = flagged[np.argsort(row_fence[flagged] - days[flagged])][:limit]  # furthest beyond first
+    return [
+        {
+            'milestone_id': int(data['id'][row]),
+            'startup_id': int(data['startup_id'][row]),
+            'startup_name': data['startup_name'][row],
+            'milestone_progress': int(data['progress'][row]) if data['progress'][row] >= 0 else None,
+            'days': _round(days[row]),
+            'fence_days': _round(row_fence[row]),
+        }
+        for row in flagged
+    ]
+
+
+def _cohort_curves(np, data, days):
+    """Share of each intake cohort's milestones completed within N days of joining.
+
+    A checkpoint is None until every startup in the cohort has been
+    around that long, so young cohorts do not look artificially slow.
+    """
+    created = data['created']
+    years = created.astype('datetime64[Y]').astype(np.int64) + 1970
+    quarters = created.astype('datetime64[M]').astype(np.int64) % 12 // 3 + 1
+    labels, inverse = np.unique(years * 10 + quarters, return_inverse=True)
+    checkpoints = np.asarray(CURVE_DAYS, dtype=float)
+
+    with np.errstate(invalid='ignore'):
+        reached = days[:, None] <= checkpoints[None, :]
+    completed = np.zeros((len(labels), len(checkpoints)))
+    np.add.at(completed, inverse, reached)
+    totals = np.bincount(inverse, minlength=len(labels))
+
+    latest = np.full(len(labels), np.datetime64('1970-01-01T00:00:00', 's'))
+    np.maximum.at(latest, inverse, created)
+    now = np.datetime64(_wall_clock(timezone.now()), 's')
+    age = (now - latest) / np.timedelta64(1, 'D')
+    shares = np.where(age[:, None] >= checkpoints[None, :], completed / totals[:, None], np.nan)
+
+    return [
+        {
+            'cohort': f'{label // 10}-Q{label % 10}',
+            'milestones': int(totals[index]),
+            'curve': {str(day): _round(shares[index, column] * 100) for column, day in enumerate(CURVE_DAYS)},
+        }
+        for index, label in enumerate(labels)
+    ]
+
+
+def compute(cohort=None):
+    """Time-to-complete statistics by milestone number, stage and industry, cohort curves and outliers"""
+    np = _numpy()
+    data = load_arrays(cohort)
+    if not len(data['id']):
+        return {'cohort': cohort, 'milestones': 0, 'by_milestone': [], 'by_stage': [], 'by_industry': [],
+                'cohort_curves': [], 'outliers': [], 'generated_at': timezone.now().isoformat()}
+
+    days = _days(np, data['completed'], data['created'])
+    review_days = _days(np, data['completed'], data['last_upload'])
+    by_milestone, milestone_groups, milestone_percentiles = _summary(np, data['progress'], days, review_days)
+    for row in by_milestone:
+        row['key'] = None if row['key'] < 0 else row['key']
+
+    return {
+        'cohort': cohort,
+        'milestones': int(len(data['id'])),
+        'completed': int(np.count_nonzero(~np.isnan(days))),
+        'by_milestone': by_milestone,
+        'by_stage': _summary(np, data['stage'], days, review_days)[0],
+        'by_industry': _summary(np, data['industry'], days, review_days)[0],
+        'cohort_curves': _cohort_curves(np, data, days),
+        'outliers': _outliers(np, data, days, milestone_groups, milestone_percentiles),
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def cohort_analytics(cohort=None, refresh=False):
+    """compute(), cached until the next status transition or ANALYTICS_CACHE_SECONDS"""
+    last_transition = StatusTransition.objects.aggregate(last=Max('pk'))['last'] or 0
+    key = f'cohort-analytics:{(cohort or "all").upper()}:{last_transition}'
+    result = None if refresh else cache.get(key)
+    if result is None:
+        result = compute(cohort)
+        cache.set(key, result, getattr(settings, 'ANALYTICS_CACHE_SECONDS', 600))
+    return result
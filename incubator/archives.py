@@ -0,0 +1,122 @@
+import csv
+import io
+import os
+import zipfile
+
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Deliverable
+
+COPY_BUFFER = 64 * 1024
+FILE_FIELDS = (('upload_file', ''), ('admin_file', '-admin'))
+
+
+class _Sink:
+    """Unseekable write target: ZipFile appends to it, the generator drains it.
+
+    Because it cannot seek, zipfile writes sizes in data descriptors after
+    each member instead of going back to patch headers, so nothing but the
+    current 64 KiB buffer is ever held.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def archive_path(deliverable, suffix, name):
+    """Stable in-archive path built from ids, so two passes agree without shared state"""
+    milestone, startup = deliverable.milestone, deliverable.milestone.startup
+    return '/'.join([
+        f'{startup.id}-{slugify(startup.name) or "startup"}',
+        f'{milestone.milestone_progress or 0:02d}-{milestone.id}-{slugify(milestone.title or "") or "milestone"}',
+        f'{deliverable.id}-{slugify(deliverable.name) or "deliverable"}{suffix}{os.path.splitext(name)[1].lower()}',
+    ])
+
+
+def _zip_time(moment):
+    moment = timezone.localtime(moment) if moment else timezone.localtime()
+    return max(moment.timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+
+
+def _deliverables(queryset):
+    return (
+        queryset.select_related('milestone__startup')
+        .order_by('milestone__startup_id', 'milestone__milestone_progress', 'milestone_id', 'id')
+        .iterator(chunk_size=200)
+    )
+
+
+def _manifest_rows(queryset):
+    yield ['startup', 'milestone', 'deliverable', 'status', 'due_date', 'uploaded_at', 'file', 'admin_file']
+    for deliverable in _deliverables(queryset):
+        paths = []
+        for field, suffix in FILE_FIELDS:
+            file = getattr(deliverable, field)
+            present = bool(file) and file.storage.exists(file.name)
+            paths.append(archive_path(deliverable, suffix, file.name) if present else '')
+        yield [
+            deliverable.milestone.startup.name, deliverable.milestone.title, deliverable.name, deliverable.status,
+            deliverable.due_date.isoformat() if deliverable.due_date else '',
+            timezone.localtime(deliverable.uploaded_at).isoformat() if deliverable.uploaded_at else '',
+            *paths,
+        ]
+
+
+def stream_deliverables_zip(queryset, manifest=False):
+    """Yield a ZIP of the deliverables' files (and optionally a manifest.csv) piece by piece.
+
+    Files are read from storage in COPY_BUFFER chunks and stored
+    uncompressed (uploads are mostly already-compressed PDFs, Office files
+    and video). Rows are iterated server-side, twice when a manifest is
+    asked for, so memory stays flat whatever the archive size. Missing
+    files are skipped (and left blank in the manifest).
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        if manifest:
+            info = zipfile.ZipInfo('manifest.csv', date_time=_zip_time(None))
+            with archive.open(info, 'w', force_zip64=True) as entry:
+                text = io.TextIOWrapper(entry, encoding='utf-8', newline='')
+                writer = csv.writer(text)
+                for row in _manifest_rows(queryset):
+                    writer.writerow(row)
+                    if len(sink.chunks) > 16:
+                        text.flush()
+                        yield sink.drain()
+                text.flush()
+                text.detach()
+            yield sink.drain()
+
+        for deliverable in _deliverables(queryset):
+            for field, suffix in FILE_FIELDS:
+                file = getattr(deliverable, field)
+                if not file or not file.storage.exists(file.name):
+                    continue
+                info = zipfile.ZipInfo(archive_path(deliverable, suffix, file.name), _zip_time(deliverable.uploaded_at))
+                with file.storage.open(file.name, 'rb') as source, archive.open(info, 'w', force_zip64=True) as entry:
+                    for data in iter(lambda: source.read(COPY_BUFFER), b''):
+                        entry.write(data)
+                        yield sink.drain()
+                yield sink.drain()
+    yield sink.drain()
+
+
+def deliverables_for(startup=None, milestone=None, startups=None):
+    if milestone is not None:
+        return Deliverable.objects.filter(milestone=milestone)
+    if startup is not None:
+        return Deliverable.objects.filter(milestone__startup=startup)
+    return Deliverable.objects.filter(milestone__startup__in=startups)
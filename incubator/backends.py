@@ -0,0 +1,55 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .throttle import login_throttle
+
+UserModel = get_user_model()
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    """Authenticate with a username or an email address.
+
+    The account is resolved with one indexed query (username match preferred
+    over email match) and the password is hashed exactly once, also when no
+    account matches. Throttled clients are rejected before any hashing.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        if login_throttle.is_blocked(request, username):
+            # Stops authenticate() from trying any other backend
+            raise PermissionDenied('Too many failed login attempts')
+
+        user = self.get_user_by_login(username)
+        if user is None:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            UserModel().set_password(password)
+        elif user.check_password(password) and self.user_can_authenticate(user):
+            login_throttle.reset(request, user.get_username())
+            return user
+
+        login_throttle.record_failure(request, username)
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        return await sync_to_async(self.authenticate)(request, username, password, **kwargs)
+
+    def get_user_by_login(self, login):
+        lookup = Q(username=login)
+        if '@' in login:
+            lookup |= Q(email=login)
+        return (
+            UserModel._default_manager.filter(lookup)
+            .annotate(username_match=Case(When(username=login, then=Value(0)), default=Value(1),
+                                          output_field=IntegerField()))
+            .order_by('username_match', 'id')
+            .first()
+        )
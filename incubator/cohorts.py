@@ -0,0 +1,41 @@
+"""Cohorts are intake quarters: startups created in the same calendar quarter.
+
+Labels look like `2025-Q3`; a bare year (`2025`) selects all four quarters.
+"""
+import re
+from datetime import MAXYEAR, MINYEAR, datetime
+
+from django.utils import timezone
+
+COHORT_RE = re.compile(r'^(?P<year>\d{4})(?:-Q(?P<quarter>[1-4]))?$', re.IGNORECASE)
+
+
+class InvalidCohort(ValueError):
+    pass
+
+
+def cohort_label(moment):
+    moment = timezone.localtime(moment) if timezone.is_aware(moment) else moment
+    return f'{moment.year}-Q{(moment.month - 1) // 3 + 1}'
+
+
+def cohort_range(label):
+    """[start, end) datetimes covered by a cohort label"""
+    match = COHORT_RE.match((label or '').strip())
+    if not match:
+        raise InvalidCohort(f"Cohorts look like 2025-Q3 or 2025, not '{label}'.")
+    year, quarter = int(match['year']), match['quarter']
+    if not MINYEAR <= year <= MAXYEAR - 1:  # the range ends in the following year at the latest
+        raise InvalidCohort(f'Cohort years run from {MINYEAR} to {MAXYEAR - 1}, not {year}.')
+    first_month, months = (1, 12) if quarter is None else ((int(quarter) - 1) * 3 + 1, 3)
+    end_year, end_month = year + (first_month + months - 1) // 12, (first_month + months - 1) % 12 + 1
+    return (
+        timezone.make_aware(datetime(year, first_month, 1)),
+        timezone.make_aware(datetime(end_year, end_month, 1)),
+    )
+
+
+def filter_cohort(queryset, label, field='created_at'):
+    """Rows whose `field` (a Startup created_at path) falls in the cohort"""
+    start, end = cohort_range(label)
+    return queryset.filter(**{f'{field}__gte': start, f'{field}__lt': end})
@@ -0,0 +1,201 @@
+"""Text extraction from deliverable files for full-text search.
+
+Text is stored once per distinct file (DocumentText, keyed by SHA-256)
+and linked to each deliverable field holding it (DeliverableDocument), so
+the same template uploaded by fifty startups is read and indexed once.
+Extraction runs on a worker after upload (incubator.tasks.index_deliverable_document).
+"""
+import hashlib
+import importlib.util
+import logging
+import re
+import zipfile
+from datetime import timedelta
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import Deliverable, DeliverableDocument, DocumentText
+from .storage import BLOB_NAME_RE, HASH_BUFFER, blob_extension
+
+logger = logging.getLogger('incubator.documents')
+
+TEXT_EXTENSIONS = {'.txt', '.md', '.csv', '.tsv', '.json', '.html', '.htm', '.rtf'}
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class UnsupportedDocument(Exception):
+    pass
+
+
+class ExtractorUnavailable(Exception):
+    """The file type is supported but its optional package is not installed"""
+
+
+def max_chars():
+    return getattr(settings, 'DOCUMENT_TEXT_MAX_CHARS', 1_000_000)
+
+
+def _plain_text(fileobj):
+    limit = max_chars() * 4
+    data = fileobj.read(limit)
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError as exc:
+        if len(data) == limit and exc.reason == 'unexpected end of data':
+            # UTF-8 that the size cap cut mid-character; cp1252 would accept it as mojibake
+            return data.decode('utf-8-sig', errors='replace').rstrip('\ufffd')
+    try:
+        return data.decode('cp1252')
+    except UnicodeDecodeError:
+        return data.decode('utf-8', errors='replace')
+
+
+def _docx_text(fileobj):
+    """Paragraph text of word/document.xml, parsed incrementally with the stdlib"""
+    try:
+        archive = zipfile.ZipFile(fileobj)
+        source = archive.open('word/document.xml')
+    except (zipfile.BadZipFile, KeyError) as exc:
+        raise UnsupportedDocument('Not a Word document.') from exc
+    paragraphs, current, size = [], [], 0
+    with archive, source:
+        for _, element in ElementTree.iterparse(source):
+            if element.tag == f'{WORD_NS}t' and element.text:
+                current.append(element.text)
+            elif element.tag == f'{WORD_NS}tab':
+                current.append('\t')
+            elif element.tag == f'{WORD_NS}p':
+                paragraph = ''.join(current).strip()
+                if paragraph:
+                    paragraphs.append(paragraph)
+                    size += len(paragraph) + 1
+                current = []
+                element.clear()
+                if size >= max_chars():
+                    break
+    return '\n'.join(paragraphs)
+
+
+def _pdf_text(fileobj):
+    try:
+        from pypdf import PdfReader
+    except ImportError as exc:
+        raise ExtractorUnavailable('Reading .pdf files requires the pypdf package.') from exc
+    pages, size = [], 0
+    for page in PdfReader(fileobj).pages:
+        text = page.extract_text() or ''
+        pages.append(text)
+        size += len(text)
+        if size >= max_chars():
+            break
+    return '\n'.join(pages)
+
+
+def has_extractor(extension):
+    """Whether text can be extracted from `extension` files with the packages installed here"""
+    if extension == '.pdf':
+        return importlib.util.find_spec('pypdf') is not None
+    return extension == '.docx' or extension in TEXT_EXTENSIONS
+
+
+def extract_text(fileobj, extension):
+    """Text of a DOCX, PDF or plain-text file, capped at DOCUMENT_TEXT_MAX_CHARS"""
+    if extension == '.docx':
+        text = _docx_text(fileobj)
+    elif extension == '.pdf':
+        text = _pdf_text(fileobj)
+    elif extension in TEXT_EXTENSIONS:
+        text = _plain_text(fileobj)
+    else:
+        raise UnsupportedDocument(f"No text extractor for '{extension or 'no extension'}' files.")
+    # Collapse runs of blank space so snippets and the index stay compact
+    return re.sub(r'[ \t\r\f\v]+', ' ', re.sub(r'\n\s*\n+', '\n', text)).strip()[:max_chars()]
+
+
+def file_sha256(file):
+    match = BLOB_NAME_RE.match(file.name)
+    if match:
+        return match['sha256']  # content-addressed names already carry it
+    digest = hashlib.sha256()
+    with file.storage.open(file.name, 'rb') as fileobj:
+        for data in iter(lambda: fileobj.read(HASH_BUFFER), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def document_for(file):
+    """The DocumentText for a stored file, extracting it only if its hash is new"""
+    sha256 = file_sha256(file)
+    document = DocumentText.objects.filter(sha256=sha256).first()
+    if document is not None:
+        return document
+
+    extension = blob_extension(file.name)
+    status, text = 'ok', ''
+    try:
+        with file.storage.open(file.name, 'rb') as fileobj:
+            text = extract_text(fileobj, extension)
+        status = 'ok' if text else 'empty'
+    except UnsupportedDocument as exc:
+        status = 'unsupported'
+        logger.info('Not indexing %s: %s', file.name, exc)
+    except ExtractorUnavailable as exc:
+        status = 'failed'  # index_documents --retry-failed once the package is installed
+        logger.warning('Not indexing %s: %s', file.name, exc)
+    except Exception as exc:  # malformed files must not fail the job forever
+        status = 'failed'
+        logger.warning('Could not extract text from %s: %s', file.name, exc)
+
+    try:
+        with transaction.atomic():
+            return DocumentText.objects.create(sha256=sha256, extension=extension, status=status, text=text)
+    except IntegrityError:
+        # Another worker extracted the same bytes meanwhile
+        return DocumentText.objects.get(sha256=sha256)
+
+
+def index_deliverable_field(deliverable_id, field):
+    """Point the deliverable field at the text of its current file (or drop the link if none)"""
+    deliverable = Deliverable.objects.filter(pk=deliverable_id).first()
+    if deliverable is None:
+        return None
+    file = getattr(deliverable, field)
+    if not file or not file.storage.exists(file.name):
+        DeliverableDocument.objects.filter(deliverable_id=deliverable_id, field=field).delete()
+        return None
+
+    document = document_for(file)
+    # Only link if the file was not replaced while extracting; its own job will link the new one
+    if Deliverable.objects.filter(pk=deliverable_id, **{field: file.name}).exists():
+        DeliverableDocument.objects.update_or_create(
+            deliverable_id=deliverable_id, field=field, defaults={'document': document},
+        )
+    return document
+
+
+def schedule_indexing(deliverable, fields):
+    """Queue extraction (incubator.tasks.index_deliverable_document) for changed file fields.
+
+    Cleared fields are unlinked right away.
+    """
+    for field in fields:
+        if getattr(deliverable, field):
+            enqueue('incubator.tasks.index_deliverable_document', deliverable_id=deliverable.pk, field=field)
+        else:
+            DeliverableDocument.objects.filter(deliverable=deliverable, field=field).delete()
+
+
+def collect_unlinked(grace=timedelta(hours=1)):
+    """Delete extracted text no deliverable links to any more; returns how many rows went.
+
+    Rows younger than `grace` are kept: a job may have extracted one and
+    not linked it yet. The FTS triggers drop the deleted text from the index.
+    """
+    deleted, _ = DocumentText.objects.filter(
+        deliverables__isnull=True, extracted_at__lt=timezone.now() - grace,
+    ).delete()
+    return deleted
@@ -0,0 +1,128 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, quote_etag
+
+from .storage import BLOB_NAME_RE
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _RangeFile:
+    """A file positioned at a range start that reads at most `length` bytes.
+
+    fileno() is exposed so a wsgi.file_wrapper with sendfile support (e.g.
+    gunicorn's) still sends the range zero-copy, bounded by Content-Length.
+    """
+
+    def __init__(self, fileobj, start, length):
+        fileobj.seek(start)
+        self.fileobj, self.remaining = fileobj, length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fileobj.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.fileobj.fileno()
+
+    def close(self):
+        self.fileobj.close()
+
+
+def file_etag(name, stat):
+    """The content hash for content-addressed blobs, otherwise mtime and size"""
+    match = BLOB_NAME_RE.match(name)
+    return quote_etag(match['sha256'] if match else f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    return header.strip() == '*' or etag in {tag.strip().removeprefix('W/') for tag in header.split(',')}
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single `bytes=` range, None to send the whole file"""
+    match = RANGE_RE.match(header or '')
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1  # suffix range: the last N bytes
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end:
+        raise ValueError('unsatisfiable range')
+    return start, end
+
+
+def serve_file(request, storage, name, filename, as_attachment=False):
+    """Send a stored file to a user who has already been authorised.
+
+    With MEDIA_SENDFILE_HEADER set to X-Accel-Redirect (nginx) or
+    X-Sendfile (Apache/lighttpd), only headers are returned and the front
+    server performs the transfer. Otherwise the file is streamed from here
+    through wsgi.file_wrapper (sendfile where the server supports it) with
+    ETag/If-None-Match and single-range Range/If-Range support.
+    """
+    path = storage.path(name)
+    stat = os.stat(path)
+    etag = file_etag(name, stat)
+    immutable = bool(BLOB_NAME_RE.match(name))
+    cache_control = 'private, max-age=31536000, immutable' if immutable else 'private, no-cache'
+
+    if _etag_matches(request.headers.get('If-None-Match'), etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        return response
+
+    header = getattr(settings, 'MEDIA_SENDFILE_HEADER', None)
+    if header:
+        response = HttpResponse()
+        del response['Content-Type']  # let the front server set it from the file
+        if header == 'X-Accel-Redirect':
+            response[header] = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/') + quote(name)
+        else:
+            response[header] = path
+    else:
+        requested = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        if if_range and if_range.strip() != etag:
+            requested = None  # the client's partial copy is stale: send everything
+        try:
+            byte_range = parse_range(requested, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+        fileobj = open(path, 'rb')
+        if byte_range:
+            start, end = byte_range
+            response = FileResponse(_RangeFile(fileobj, start, end - start + 1), status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = end - start + 1
+        else:
+            response = FileResponse(fileobj)
+            response['Content-Length'] = stat.st_size
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control
+    disposition = 'attachment' if as_attachment else 'inline'
+    response['Content-Disposition'] = f"{disposition}; filename*=UTF-8''{quote(filename)}"
+    if not header:
+        response['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    return response
@@ -0,0 +1,122 @@
+"""Portfolio extracts (startups, milestones, progress reports) as streamed CSV or JSON Lines"""
+import csv
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .cohorts import InvalidCohort, filter_cohort
+from .models import Milestone, ProgressReport, Startup
+
+# kind -> (model, projected fields, date-range field, path to the startup)
+EXPORTS = {
+    'startups': (
+        Startup,
+        ['id', 'name', 'industry', 'stage', 'owner__username', 'contact_number', 'created_at',
+         'total_milestones', 'completed_milestones'],
+        'created_at', '',
+    ),
+    'milestones': (
+        Milestone,
+        ['id', 'startup_id', 'startup__name', 'milestone_progress', 'title', 'status', 'due_date', 'completed_at'],
+        'due_date', 'startup__',
+    ),
+    'reports': (
+        ProgressReport,
+        ['id', 'startup_id', 'startup__name', 'submitted_by__username', 'title', 'description',
+         'achievements', 'challenges', 'next_steps', 'submitted_at'],
+        'submitted_at', 'startup__',
+    ),
+}
+FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def _parse_date(value, name):
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"'{name}' must be a date like 2025-01-31.")
+
+
+def export_rows(kind, since=None, until=None, stage=None, cohort=None):
+    """Values queryset for an export; `since`/`until` are inclusive YYYY-MM-DD dates.
+
+    Date bounds are applied as a half-open range on the raw column (not
+    `__date`), so the existing created_at/submitted_at indexes still serve
+    the filter.
+    """
+    if kind not in EXPORTS:
+        raise ExportError(f"Unknown export '{kind}'; choose one of {', '.join(EXPORTS)}.")
+    model, fields, date_field, startup_path = EXPORTS[kind]
+    queryset = model.objects.all()
+
+    since, until = _parse_date(since, 'since'), _parse_date(until, 'until')
+    is_datetime = model._meta.get_field(date_field).get_internal_type() == 'DateTimeField'
+    if since:
+        bound = timezone.make_aware(datetime.combine(since, time.min)) if is_datetime else since
+        queryset = queryset.filter(**{f'{date_field}__gte': bound})
+    if until:
+        until += timedelta(days=1)
+        bound = timezone.make_aware(datetime.combine(until, time.min)) if is_datetime else until
+        queryset = queryset.filter(**{f'{date_field}__lt': bound})
+
+    if stage:
+        if stage not in dict(Startup.STAGE_CHOICES):
+            raise ExportError(f"Unknown stage '{stage}'.")
+        queryset = queryset.filter(**{f'{startup_path}stage': stage})
+    if cohort:
+        try:
+            queryset = filter_cohort(queryset, cohort, field=f'{startup_path}created_at')
+        except InvalidCohort as exc:
+            raise ExportError(str(exc))
+
+    return fields, queryset.order_by('pk').values(*fields)
+
+
+class _Echo:
+    """csv.writer target that hands each formatted line straight back"""
+
+    def write(self, value):
+        return value
+
+
+def _batched(lines, batch=200):
+    # One yield per line would make a chunked response of tiny writes
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= batch:
+            yield ''.join(buffer)
+            buffer.clear()
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_csv(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    yield from _batched(
+        writer.writerow([row[field] for field in fields]) for row in rows.iterator(chunk_size=chunk_size())
+    )
+
+
+def stream_jsonl(fields, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    yield from _batched(encoder.encode(row) + '\n' for row in rows.iterator(chunk_size=chunk_size()))
+
+
+def stream_export(fmt, fields, rows):
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format '{fmt}'; choose csv or jsonl.")
+    return stream_csv(fields, rows) if fmt == 'csv' else stream_jsonl(fields, rows)
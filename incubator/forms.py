@@ -78,3 +78,15 @@ class StartupMemberForm(forms.Form):
     position = forms.CharField(max_length=100, widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Position (e.g. CEO)'}))
     email = forms.EmailField(widget=forms.EmailInput(attrs={'class': 'form-control', 'placeholder': 'Email Address'}))
     contact_number = forms.CharField(max_length=20, widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Contact Number'}))
+
+class MemberImportForm(forms.Form):
+    file = forms.FileField(
+        help_text='CSV or XLSX with columns: startup (name or id), first_name, middle_name, last_name, position, email, contact_number',
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'}),
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.csv', '.xlsx', '.xlsm')):
+            raise forms.ValidationError('Upload a .csv or .xlsx file.')
+        return upload
@@ -0,0 +1,86 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+
+
+# (workers, executor) shared by every call in this process, started on first use
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _context():
+    # Forking copies a threaded server mid-request (held locks, open connections); start clean processes
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _encode(hasher, password, salt):
+    return hasher.encode(password, salt)
+
+
+def _executor(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool[0] != workers:
+            if _pool is not None:
+                _pool[1].shutdown(wait=False)
+            _pool = (workers, ProcessPoolExecutor(max_workers=workers, mp_context=_context()))
+        return _pool[1]
+
+
+def _discard_executor(executor):
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool[1] is executor:
+            _pool = None
+    executor.shutdown(wait=False)
+
+
+@atexit.register
+def _shutdown():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool[1].shutdown(wait=True, cancel_futures=True)
+
+
+def hash_passwords(passwords, workers=None):
+    """make_password() for each of `passwords`, spread over a process pool.
+
+    Each password gets its own salt, exactly as make_password would give it.
+    The hasher and salts are chosen here, so worker processes only run the
+    key derivation and need no Django settings. The pool is started on the
+    first large batch and reused by later ones (an import hashes one batch
+    per chunk), so its processes are only spawned once, from a forkserver
+    rather than a fork of this process, and shut down at exit.
+
+    Hashing stays inline unless PASSWORD_HASH_POOL is set, and for batches
+    smaller than PASSWORD_HASH_POOL_MIN, where the round trip costs more
+    than it saves.
+    """
+    passwords = list(passwords)
+    workers = workers or getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+    if (
+        not getattr(settings, 'PASSWORD_HASH_POOL', False) or workers == 1
+        or len(passwords) < getattr(settings, 'PASSWORD_HASH_POOL_MIN', 32)
+    ):
+        return [make_password(password) for password in passwords]
+
+    hasher = get_hasher()
+    salts = [hasher.salt() for _ in passwords]
+    pool = _executor(workers)
+    try:
+        return list(pool.map(
+            _encode, [hasher] * len(passwords), passwords, salts,
+            chunksize=max(1, len(passwords) // (workers * 4)),
+        ))
+    except BrokenProcessPool:
+        _discard_executor(pool)  # a worker died; the next call starts a fresh pool
+        raise
@@ -0,0 +1,209 @@
+import csv
+import io
+import zipfile
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+
+from django.db import IntegrityError, transaction
+
+from .accounts import allocate_usernames, base_username, bulk_create_users, create_user_with_unique_username
+from .forms import StartupMemberForm
+from .models import User, Startup, StartupMember
+
+DEFAULT_PASSWORD = "123"  # same default add_member gives new incubatees
+
+# Spreadsheet header aliases -> StartupMemberForm field names
+HEADER_ALIASES = {
+    'startup': 'startup', 'startup_name': 'startup', 'startup_id': 'startup',
+    'first_name': 'first_name', 'firstname': 'first_name',
+    'middle_name': 'middle_name', 'middlename': 'middle_name',
+    'last_name': 'last_name', 'lastname': 'last_name', 'surname': 'last_name',
+    'position': 'position', 'role': 'position',
+    'email': 'email', 'email_address': 'email',
+    'contact_number': 'contact_number', 'contact': 'contact_number', 'phone': 'contact_number',
+}
+
+
+REQUIRED_COLUMNS = ('startup', 'first_name', 'last_name', 'position', 'email', 'contact_number')
+
+INVALID_WORKBOOK = 'The file is not a valid Excel workbook. Open it in Excel, save it as .xlsx (or CSV UTF-8) and upload it again.'
+
+
+class ImportFileError(Exception):
+    """The file cannot be read at all (bad format, missing columns)"""
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)  # (row number, message)
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+
+def _normalise_header(value):
+    key = str(value or '').strip().lower().replace(' ', '_').replace('-', '_')
+    return HEADER_ALIASES.get(key, key)
+
+
+def _csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    except UnicodeDecodeError as exc:
+        raise ImportFileError(
+            'The file is not UTF-8 encoded. Save it as "CSV UTF-8" (or as .xlsx) and upload it again.'
+        ) from exc
+    finally:
+        text.detach()
+
+
+def _xlsx_rows(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ImportFileError('Reading .xlsx files requires the openpyxl package.') from exc
+    from openpyxl.utils.exceptions import InvalidFileException
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError) as exc:
+        # KeyError: a zip archive without the workbook parts
+        raise ImportFileError(INVALID_WORKBOOK) from exc
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield ['' if value is None else str(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def read_member_rows(fileobj, filename):
+    """Yield (row number, {field: value}) from a CSV or XLSX file, streaming"""
+    suffix = Path(filename).suffix.lower()
+    if suffix == '.csv':
+        rows = _csv_rows(fileobj)
+    elif suffix in ('.xlsx', '.xlsm'):
+        if not zipfile.is_zipfile(fileobj):
+            raise ImportFileError(INVALID_WORKBOOK)
+        fileobj.seek(0)
+        rows = _xlsx_rows(fileobj)
+    else:
+        raise ImportFileError('Upload a .csv or .xlsx file.')
+
+    header = next(rows, None)
+    if not header:
+        raise ImportFileError('The file is empty.')
+    columns = [_normalise_header(value) for value in header]
+    missing = set(REQUIRED_COLUMNS) - set(columns)
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(sorted(missing))}.")
+
+    for number, row in enumerate(rows, start=2):
+        if not any(str(value).strip() for value in row):
+            continue
+        yield number, {column: str(value).strip() for column, value in zip(columns, row)}
+
+
+class MemberImporter:
+    """Create incubatee accounts and memberships from spreadsheet rows.
+
+    Rows are validated with StartupMemberForm and written in chunks: one
+    query resolves the chunk's startups, one allocates its usernames, the
+    passwords are hashed in parallel and bulk_create inserts the users and
+    memberships. Invalid rows are reported in the result without stopping
+    the import.
+    """
+
+    def __init__(self, chunk_size=500, password=DEFAULT_PASSWORD):
+        self.chunk_size = chunk_size
+        self.password = password
+
+    def run(self, rows):
+        result = ImportResult()
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return result
+            self.import_chunk(chunk, result)
+
+    def resolve_startups(self, keys):
+        ids = {int(key) for key in keys if key.isdigit()}
+        names = {key for key in keys if not key.isdigit()}
+        by_key = {}
+        for startup in Startup.objects.filter(pk__in=ids).only('id', 'name'):
+            by_key[str(startup.pk)] = startup
+        for startup in Startup.objects.filter(name__in=names).only('id', 'name').order_by('id'):
+            by_key.setdefault(startup.name, startup)
+        return by_key
+
+    def validate(self, chunk, result):
+        startups = self.resolve_startups({data.get('startup', '') for _, data in chunk} - {''})
+        valid = []
+        for number, data in chunk:
+            startup = startups.get(data.get('startup', ''))
+            if startup is None:
+                result.errors.append((number, f"Unknown startup '{data.get('startup', '')}'."))
+                continue
+            form = StartupMemberForm(data)
+            if not form.is_valid():
+                message = '; '.join(f'{name}: {errors[0]}' for name, errors in form.errors.items())
+                result.errors.append((number, message))
+                continue
+            valid.append((number, startup, form.cleaned_data))
+        return valid
+
+    def build_user(self, username, data):
+        return User(
+            username=username,
+            email=data['email'],
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+            middle_name=data['middle_name'],
+            contact_number=data['contact_number'],
+            role='incubatee',
+        )
+
+    def import_chunk(self, chunk, result):
+        valid = self.validate(chunk, result)
+        if not valid:
+            return
+
+        usernames = allocate_usernames([base_username(data['first_name'], data['last_name']) for _, _, data in valid])
+        users = [self.build_user(username, data) for username, (_, _, data) in zip(usernames, valid)]
+        try:
+            with transaction.atomic():
+                bulk_create_users(users, [self.password] * len(users))
+                StartupMember.objects.bulk_create([
+                    StartupMember(startup=startup, user=user, role=data['position'])
+                    for user, (_, startup, data) in zip(users, valid)
+                ])
+        except IntegrityError:
+            # A username was claimed concurrently; fall back to per-row retries
+            for number, startup, data in valid:
+                self.import_row(number, startup, data, result)
+        else:
+            result.created += len(users)
+        # bulk_create skips the signals that refresh dashboard cards
+        Startup.bump_card_version(pk__in={startup.pk for _, startup, _ in valid})
+
+    def import_row(self, number, startup, data, result):
+        try:
+            with transaction.atomic():
+                user = create_user_with_unique_username(
+                    base_username(data['first_name'], data['last_name']),
+                    email=data['email'],
+                    password=self.password,
+                    first_name=data['first_name'],
+                    last_name=data['last_name'],
+                    middle_name=data['middle_name'],
+                    contact_number=data['contact_number'],
+                    role='incubatee',
+                )
+                StartupMember.objects.create(startup=startup, user=user, role=data['position'])
+        except IntegrityError as exc:
+            result.errors.append((number, f'Could not create account: {exc}'))
+        else:
+            result.created += 1
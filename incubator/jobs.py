@@ -0,0 +1,201 @@
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger('incubator.jobs')
+
+
+def task(priority=0, max_attempts=5, backoff=10, on_failure=None):
+    """Mark a function as a job; call `func.enqueue(**kwargs)` to run it on a worker.
+
+    Keyword arguments are stored as JSON, so pass ids and strings, not
+    model instances. Tasks may run more than once (a worker can die after
+    finishing but before recording it) and must be safe to repeat.
+    `on_failure(**kwargs)` is called once the job has failed for good, to
+    clean up whatever the job would have consumed.
+    """
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__name__}'
+        func.job_options = {
+            'priority': priority, 'max_attempts': max_attempts, 'backoff': backoff, 'on_failure': on_failure,
+        }
+        func.enqueue = lambda **kwargs: enqueue(func.task_name, **kwargs)
+        return func
+    return decorator
+
+
+def enqueue(task_name, *, priority=None, run_at=None, delay=None, **kwargs):
+    """Queue `task_name` to run with `kwargs` at `run_at` (or after `delay` seconds).
+
+    The row is written in the caller's transaction, so the job only becomes
+    visible to workers if that transaction commits. With JOB_QUEUE_EAGER a job
+    that is already due is run in-process right after commit instead of
+    waiting for a worker; one scheduled for later stays queued for a worker.
+    """
+    options = import_string(task_name).job_options
+    if run_at is None:
+        run_at = timezone.now() + timedelta(seconds=delay or 0)
+    job = Job.objects.create(
+        task=task_name,
+        kwargs=kwargs,
+        priority=options['priority'] if priority is None else priority,
+        max_attempts=options['max_attempts'],
+        run_at=run_at,
+    )
+    if getattr(settings, 'JOB_QUEUE_EAGER', False) and run_at <= timezone.now():
+        transaction.on_commit(lambda: Worker(name='eager').run_job(job.pk))
+    return job
+
+
+def retry_delay(backoff, attempts):
+    """Exponential backoff with jitter, capped at an hour"""
+    return min(backoff * 2 ** (attempts - 1), 3600) * random.uniform(0.8, 1.2)
+
+
+class Worker:
+    """Claims and runs queued jobs; any number may run against one database.
+
+    A job is claimed with a single UPDATE ... WHERE id = (next due job)
+    RETURNING id, so picking and taking it is one statement and exactly one
+    worker wins it; where the database supports SKIP LOCKED the candidate
+    row is also locked so workers do not contend for the same one. Jobs
+    left running by a worker that died are requeued after JOB_STALE_AFTER
+    seconds.
+    """
+
+    def __init__(self, name=None, batch=10):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.batch = batch
+        self.stale_after = getattr(settings, 'JOB_STALE_AFTER', 600)
+        self.keep_done = getattr(settings, 'JOB_KEEP_COMPLETED', False)
+
+    def claim(self):
+        now = timezone.now()
+        candidates = Job.objects.filter(status='queued', run_at__lte=now).order_by('-priority', 'run_at', 'id')
+        with transaction.atomic():
+            if connection.features.has_select_for_update_skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            if connection.vendor == 'mysql':
+                return self._claim_each(candidates, now)
+            subquery, params = candidates.values('pk')[:1].query.sql_with_params()
+            locked_at, qn = connection.ops.adapt_datetimefield_value(now), connection.ops.quote_name
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {qn(Job._meta.db_table)} SET {qn("status")} = %s, {qn("locked_by")} = %s, '
+                    f'{qn("locked_at")} = %s, {qn("attempts")} = {qn("attempts")} + 1 '
+                    f'WHERE {qn("id")} = ({subquery}) AND {qn("status")} = %s RETURNING {qn("id")}',
+                    ['running', self.name, locked_at, *params, 'queued'],
+                )
+                row = cursor.fetchone()
+            return Job.objects.get(pk=row[0]) if row else None
+
+    def _claim_each(self, candidates, now):
+        # MySQL has no UPDATE ... RETURNING: take the first candidate a conditional UPDATE wins
+        for pk in list(candidates.values_list('pk', flat=True)[:self.batch]):
+            claimed = Job.objects.filter(pk=pk, status='queued').update(
+                status='running', locked_by=self.name, locked_at=now, attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return Job.objects.get(pk=pk)
+        return None
+
+    def run_job(self, pk):
+        """Run one specific queued job now (eager mode and tests)"""
+        claimed = Job.objects.filter(pk=pk, status='queued').update(
+            status='running', locked_by=self.name, locked_at=timezone.now(), attempts=F('attempts') + 1,
+        )
+        if claimed:
+            self.execute(Job.objects.get(pk=pk))
+
+    def execute(self, job):
+        func = None
+        try:
+            func = import_string(job.task)
+            func(**job.kwargs)
+        except Exception:
+            self.failed(job, func, traceback.format_exc())
+        else:
+            if self.keep_done:
+                Job.objects.filter(pk=job.pk).update(status='done', finished_at=timezone.now(), locked_by='')
+            else:
+                Job.objects.filter(pk=job.pk).delete()
+            logger.info('Job %s %s done', job.pk, job.task)
+
+    def failed(self, job, func, error):
+        backoff = getattr(func, 'job_options', {}).get('backoff', 10)
+        if job.attempts < job.max_attempts:
+            run_at = timezone.now() + timedelta(seconds=retry_delay(backoff, job.attempts))
+            Job.objects.filter(pk=job.pk).update(status='queued', run_at=run_at, locked_by='', last_error=error)
+            logger.warning('Job %s %s failed (attempt %s), retrying at %s', job.pk, job.task, job.attempts, run_at)
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status='failed', finished_at=timezone.now(), locked_by='', last_error=error,
+            )
+            logger.error('Job %s %s failed permanently: %s', job.pk, job.task, error.strip().splitlines()[-1])
+            self.gave_up(job, func)
+
+    def gave_up(self, job, func):
+        cleanup = getattr(func, 'job_options', {}).get('on_failure')
+        if cleanup is None:
+            return
+        try:
+            cleanup(**job.kwargs)
+        except Exception:
+            logger.exception('Cleanup after job %s %s failed', job.pk, job.task)
+
+    def requeue_stale(self):
+        """Requeue jobs whose worker died mid-run, failing those out of attempts"""
+        now = timezone.now()
+        stale = Job.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=self.stale_after))
+        exhausted = stale.filter(attempts__gte=F('max_attempts'))
+        for job in list(exhausted):
+            if exhausted.filter(pk=job.pk).update(
+                status='failed', finished_at=now, locked_by='', last_error='Worker stopped while running the job.',
+            ):
+                try:
+                    func = import_string(job.task)
+                except ImportError:
+                    continue
+                self.gave_up(job, func)
+        return stale.update(status='queued', locked_by='')
+
+    def run(self, burst=False, sleep=1.0, max_jobs=None, should_stop=lambda: False):
+        """Process jobs until stopped; `burst` returns once nothing is due"""
+        processed, last_sweep = 0, 0.0
+        while not should_stop() and (max_jobs is None or processed < max_jobs):
+            try:
+                if time.monotonic() - last_sweep > 60:
+                    self.requeue_stale()
+                    last_sweep = time.monotonic()
+                job = self.claim()
+            except OperationalError as error:
+                # e.g. SQLite's "database is locked" while other workers write; back off and try again
+                logger.warning('Worker %s could not claim a job (%s), retrying', self.name, error)
+                close_old_connections()
+                time.sleep(sleep * random.uniform(0.5, 1.5))
+                continue
+            if job is None:
+                if burst:
+                    break
+                time.sleep(sleep)
+                continue
+            try:
+                self.execute(job)
+            except OperationalError:
+                # The job stays running and is requeued once stale; tasks are safe to repeat
+                logger.exception('Worker %s could not record the outcome of job %s', self.name, job.pk)
+            processed += 1
+            close_old_connections()  # honour CONN_MAX_AGE between jobs
+        return processed
@@ -0,0 +1,96 @@
+import io
+import logging
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .jobs import enqueue
+from .models import Startup
+
+logger = logging.getLogger('incubator.logos')
+
+FORMATS = {
+    'webp': ('WEBP', 'LOGO_WEBP_QUALITY', 80),
+    'jpeg': ('JPEG', 'LOGO_JPEG_QUALITY', 82),
+}
+
+
+def variant_widths():
+    return tuple(getattr(settings, 'LOGO_VARIANT_WIDTHS', (64, 128, 256)))
+
+
+def needs_variants(startup):
+    variants = startup.logo_variants or {}
+    if not startup.logo:
+        return False
+    # Entries from before heights were recorded are [width, name]
+    return variants.get('source') != startup.logo.name or any(len(entry) < 3 for entry in variants.get('jpeg', []))
+
+
+def _encode(image, fmt):
+    """`image` re-encoded; nothing but pixels is written, so EXIF/ICC/XMP are dropped"""
+    pil_format, quality_setting, default_quality = FORMATS[fmt]
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, quality=getattr(settings, quality_setting, default_quality), optimize=True)
+    return buffer.getvalue()
+
+
+def render_variants(fileobj):
+    """Yield (format, width, height, bytes) for each configured width, never upscaling"""
+    with Image.open(fileobj) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+
+    widths = [width for width in variant_widths() if width < image.width] or [image.width]
+    for width in widths:
+        resized = image.copy()
+        resized.thumbnail((width, width), Image.LANCZOS)
+        for fmt in FORMATS:
+            yield fmt, resized.width, resized.height, _encode(resized, fmt)
+
+
+def generate_logo_variants(startup):
+    """Build and store the variants of the startup's current logo.
+
+    The row is updated only if the logo is still the one processed, so a
+    logo replaced meanwhile is not given the old variants. Returns True when
+    variants were stored.
+    """
+    source = startup.logo.name
+    variants = {'source': source, **{fmt: [] for fmt in FORMATS}}
+    try:
+        with startup.logo.open('rb') as fileobj:
+            for fmt, width, height, data in render_variants(fileobj):
+                name = startup.logo.storage.save(f'startup_logos/variants/{startup.pk}-{width}.{fmt}', ContentFile(data))
+                variants[fmt].append([width, height, name])
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        # Recorded with no variants, so templates fall back to the original
+        logger.warning('Could not build logo variants for startup %s: %s', startup.pk, exc)
+
+    updated = Startup.objects.filter(pk=startup.pk, logo=source).update(
+        logo_variants=variants, card_version=time.time_ns(),
+    )
+    if not updated:
+        release_variants(variants, startup.logo.storage)
+        return False
+    release_variants(startup.logo_variants, startup.logo.storage)
+    startup.logo_variants = variants
+    return True
+
+
+def release_variants(variants, storage):
+    """Give up the storage references held by a variants dict"""
+    for fmt in FORMATS:
+        for *_, name in (variants or {}).get(fmt, []):
+            storage.delete(name)
+
+
+def schedule_logo_variants(startup):
+    """Queue the logo for processing by a worker (incubator.tasks.build_logo_variants)"""
+    enqueue('incubator.tasks.build_logo_variants', startup_id=startup.pk)
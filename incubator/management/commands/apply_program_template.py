@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from incubator.models import ProgramTemplate, Startup
+
+
+class Command(BaseCommand):
+    help = 'Create a program template\'s milestones and deliverables for a batch of startups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', help='Program template name (defaults to the default program)')
+        parser.add_argument(
+            '--startup', type=int, action='append', dest='startup_ids',
+            help='Startup id to onboard; repeatable. Defaults to every startup without milestones.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Startups per transaction')
+
+    def handle(self, *args, **options):
+        if options['program']:
+            program = ProgramTemplate.objects.filter(name=options['program']).first()
+            if program is None:
+                raise CommandError(f"Program template '{options['program']}' does not exist.")
+        else:
+            program = ProgramTemplate.get_default()
+            if program is None:
+                raise CommandError('No default program template is configured.')
+
+        startups = Startup.objects.order_by('id')
+        if options['startup_ids']:
+            startups = startups.filter(id__in=options['startup_ids'])
+        else:
+            startups = startups.filter(milestones__isnull=True)
+        startup_ids = list(startups.values_list('id', flat=True))
+
+        batch_size = options['batch_size']
+        created, onboarded = 0, set()
+        for start in range(0, len(startup_ids), batch_size):
+            batch = Startup.objects.filter(id__in=startup_ids[start:start + batch_size])
+            milestones = program.apply(batch)
+            created += len(milestones)
+            onboarded.update(milestone.startup_id for milestone in milestones)
+
+        skipped = len(startup_ids) - len(onboarded)
+        self.stdout.write(self.style.SUCCESS(
+            f'Applied {program.name} to {len(onboarded)} startup(s): {created} milestone(s) created.'
+            + (f' Skipped {skipped} startup(s) that already have milestones.' if skipped else '')
+        ))
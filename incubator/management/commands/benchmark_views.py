@@ -0,0 +1,306 @@
+import hashlib
+import importlib.util
+import io
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment
+from django.urls import reverse
+
+from incubator import uploads
+from incubator.models import User, Startup, StartupMember, Milestone, Deliverable
+
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+PASSWORD = '123'
+FILE_DATA = b'x' * 256 * 1024  # deliverable file for the download and chunked upload routes
+
+
+class Fixture:
+    """Users and objects the scenarios run against, picked from the seeded data"""
+
+    def __init__(self):
+        self.super_admin, _ = User.objects.get_or_create(
+            username='bench.superadmin', defaults={'role': 'super_admin'}
+        )
+        membership = (
+            StartupMember.objects.select_related('startup', 'user')
+            .filter(startup__total_milestones__gte=2)
+            .order_by('-startup__total_milestones', 'id')
+            .first()
+        )
+        if membership is None:
+            raise CommandError('Seeded data has no startup with members and milestones; increase the size.')
+        self.startup = membership.startup
+        self.incubatee = membership.user
+        self.admin = self.startup.owner
+        self.milestone = self.startup.milestones.order_by('milestone_progress').first()
+        self.deliverable = Deliverable.objects.filter(milestone=self.milestone).order_by('id').first()
+        if self.deliverable is None:
+            self.deliverable = Deliverable.objects.create(milestone=self.milestone, name='Benchmark deliverable')
+        if not self.deliverable.upload_file:
+            self.deliverable.upload_file.save('deck.pdf', ContentFile(FILE_DATA))
+
+    def throwaway_incubatee(self):
+        return User.objects.create(username=f'bench.tmp.{time.monotonic_ns()}', role='incubatee')
+
+    def throwaway_startup(self):
+        return Startup.objects.create(name='Benchmark throwaway', owner=self.admin)
+
+    def throwaway_member(self):
+        user = self.throwaway_incubatee()
+        StartupMember.objects.create(startup=self.startup, user=user)
+        return user
+
+    def throwaway_upload(self, received=False):
+        upload = uploads.start_upload(
+            self.deliverable, 'upload_file', self.incubatee, f'deck-{time.monotonic_ns()}.pdf', len(FILE_DATA),
+        )
+        if received:
+            uploads.append_chunk(upload, 0, io.BytesIO(FILE_DATA), len(FILE_DATA))
+        return upload
+
+
+def chunk_request(upload):
+    return reverse('upload_detail', args=[upload.pk]), FILE_DATA, {
+        'content_type': 'application/octet-stream',
+        'headers': {'Upload-Offset': '0', 'Upload-Checksum': f'sha256 {hashlib.sha256(FILE_DATA).hexdigest()}'},
+    }
+
+
+def members_csv(startup_id, rows=2):
+    tag = time.monotonic_ns()
+    lines = ['Startup,First Name,Last Name,Position,Email,Contact Number'] + [
+        f'{startup_id},Bench,Import{i},Developer,import{tag}.{i}@example.com,0' for i in range(rows)
+    ]
+    return SimpleUploadedFile('members.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+
+def upload(name='deck.pdf', size=64 * 1024):
+    return SimpleUploadedFile(name, b'x' * size, content_type='application/pdf')
+
+
+def scenarios(fx):
+    """(name, user, method, build) where build() returns (url, data[, client kwargs]) and may create setup rows"""
+    startup_id, milestone_id = fx.startup.id, fx.milestone.id
+    file_url = reverse('download_deliverable_file', args=[fx.deliverable.id, 'upload_file'])
+    routes = [
+        ('index', fx.admin, 'get', lambda: (reverse('index'), None)),
+        ('login_form', None, 'get', lambda: (reverse('login'), None)),
+        ('login_submit', None, 'post', lambda: (
+            reverse('login'), {'username': fx.admin.username, 'password': PASSWORD})),
+        ('logout', fx.admin, 'get', lambda: (reverse('logout'), None)),
+        ('dashboard_super_admin', fx.super_admin, 'get', lambda: (reverse('dashboard'), None)),
+        ('dashboard_admin', fx.admin, 'get', lambda: (reverse('dashboard'), None)),
+        ('dashboard_incubatee', fx.incubatee, 'get', lambda: (reverse('dashboard'), None)),
+        ('add_admin', fx.super_admin, 'get', lambda: (reverse('add_admin'), None)),
+        ('delete_user', fx.admin, 'post', lambda: (
+            reverse('delete_user', args=[fx.throwaway_incubatee().id]), {})),
+        ('delete_startup', fx.admin, 'post', lambda: (
+            reverse('delete_startup', args=[fx.throwaway_startup().id]), {})),
+        ('add_startup', fx.admin, 'post', lambda: (
+            reverse('add_startup'), {'name': 'Benchmark Startup', 'description': 'Created by benchmark',
+                                     'email': 'bench@example.com', 'contact_number': '0'})),
+        ('edit_startup', fx.admin, 'get', lambda: (reverse('edit_startup', args=[startup_id]), None)),
+        ('view_startup', fx.admin, 'get', lambda: (reverse('view_startup', args=[startup_id]), None)),
+        ('view_startup_incubatee', fx.incubatee, 'get', lambda: (
+            reverse('view_startup', args=[startup_id]), None)),
+        ('add_member_form', fx.admin, 'get', lambda: (reverse('add_member', args=[startup_id]), None)),
+        ('add_member', fx.admin, 'post', lambda: (
+            reverse('add_member', args=[startup_id]),
+            {'first_name': 'Bench', 'last_name': 'Member', 'position': 'CTO',
+             'email': 'member@example.com', 'contact_number': '0'})),
+        ('add_milestone', fx.admin, 'post', lambda: (reverse('add_milestone', args=[startup_id]), {})),
+        ('delete_member', fx.admin, 'post', lambda: (
+            reverse('delete_member', args=[startup_id, fx.throwaway_member().id]), {})),
+        ('submit_progress', fx.incubatee, 'post', lambda: (
+            reverse('submit_progress', args=[startup_id]),
+            {'title': 'Weekly update', 'description': 'Benchmark report'})),
+        ('view_milestone', fx.admin, 'get', lambda: (
+            reverse('view_milestone', args=[startup_id, milestone_id]), None)),
+        ('update_milestone_status', fx.admin, 'post', lambda: (
+            reverse('update_milestone_status', args=[startup_id, milestone_id]), {'status': 'completed'})),
+        ('attach_admin_file', fx.admin, 'post', lambda: (
+            reverse('attach_admin_file', args=[fx.deliverable.id]), {'file': upload('template.docx')})),
+        ('attach_incubatee_file', fx.incubatee, 'post', lambda: (
+            reverse('attach_incubatee_file', args=[fx.deliverable.id]), {'file': upload()})),
+        ('startup_page', fx.admin, 'get', lambda: (reverse('startup_page'), None)),
+        ('search', fx.admin, 'get', lambda: (reverse('search'), {'q': 'market pilot'})),
+        ('transition_trends', fx.admin, 'get', lambda: (reverse('transition_trends'), {'days': 30})),
+        ('export_startups_csv', fx.admin, 'get', lambda: (reverse('export_data', args=['startups']), None)),
+        ('export_reports_jsonl', fx.admin, 'get', lambda: (
+            reverse('export_data', args=['reports']), {'format': 'jsonl'})),
+        ('download_file', fx.incubatee, 'get', lambda: (file_url, None)),
+        ('download_file_range', fx.incubatee, 'get', lambda: (
+            file_url, None, {'headers': {'Range': 'bytes=1024-65535'}})),
+        ('download_milestone_zip', fx.admin, 'get', lambda: (
+            reverse('download_milestone_deliverables', args=[startup_id, milestone_id]), None)),
+        ('upload_start', fx.incubatee, 'post', lambda: (
+            reverse('start_upload', args=[fx.deliverable.id]),
+            {'field': 'upload_file', 'filename': f'deck-{time.monotonic_ns()}.pdf', 'size': len(FILE_DATA)})),
+        ('upload_chunk', fx.incubatee, 'put', lambda: chunk_request(fx.throwaway_upload())),
+        ('upload_complete', fx.incubatee, 'post', lambda: (
+            reverse('complete_upload', args=[fx.throwaway_upload(received=True).pk]), {})),
+        ('import_members', fx.admin, 'post', lambda: (
+            reverse('import_members'), {'file': members_csv(fx.throwaway_startup().id)})),
+    ]
+    if importlib.util.find_spec('numpy'):  # cohort analytics answer 503 without it
+        routes.append(('cohort_analytics', fx.admin, 'get', lambda: (reverse('cohort_analytics'), None)))
+    return routes
+
+
+class Command(BaseCommand):
+    help = 'Measure wall time, SQL queries and peak memory per view and compare with stored baselines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated seeded startup counts')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per route (median is kept)')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON file')
+        parser.add_argument('--update-baseline', action='store_true', help='Write results as the new baseline')
+        parser.add_argument(
+            '--threshold', type=float, default=1.5,
+            help='Fail when time or memory exceeds baseline by this factor',
+        )
+        parser.add_argument('--min-delta-ms', type=float, default=5.0, help='Ignore time regressions below this')
+        parser.add_argument('--only', help='Comma-separated route names to run')
+        parser.add_argument('--seed', type=int, default=42, help='Seed passed to seed_incubator')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        only = set(options['only'].split(',')) if options['only'] else None
+
+        setup_test_environment()
+        old_name = settings.DATABASES['default']['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                MEDIA_ROOT=media_root, ALLOWED_HOSTS=['*'], DEBUG=False, JOB_QUEUE_EAGER=False,
+            ):
+                results = self.run_sizes(sizes, only, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        growing = self.query_growth(results)
+        if growing:
+            for line in growing:
+                self.stderr.write(line)
+            raise CommandError(f'{len(growing)} view(s) run more queries as the data grows.')
+
+        baseline_path = Path(options['baseline'])
+        if options['update_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}'))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'No baseline at {baseline_path}; run with --update-baseline.'))
+            return
+        regressions = self.compare(json.loads(baseline_path.read_text()), results, options)
+        if regressions:
+            for line in regressions:
+                self.stderr.write(line)
+            raise CommandError(f'{len(regressions)} view regression(s) against {baseline_path}.')
+        self.stdout.write(self.style.SUCCESS('No regressions against baseline.'))
+
+    def run_sizes(self, sizes, only, options):
+        results, seeded = {}, 0
+        for size in sizes:
+            if size > seeded:
+                call_command(
+                    'seed_incubator', '--startups', str(size - seeded), '--seed', str(options['seed'] + size),
+                    '--password', PASSWORD, '--fast', stdout=io.StringIO(),
+                )
+                seeded = size
+            fixture = Fixture()
+            self.stdout.write(f'\n{size} startups ({Deliverable.objects.count()} deliverables)')
+            self.stdout.write(f"{'route':<28}{'ms':>10}{'queries':>10}{'peak KiB':>12}")
+            results[str(size)] = {}
+            for name, user, method, build in scenarios(fixture):
+                if only and name not in only:
+                    continue
+                row = self.measure(user, method, build, options['repeat'])
+                results[str(size)][name] = row
+                self.stdout.write(f"{name:<28}{row['time_ms']:>10.1f}{row['queries']:>10}{row['peak_kib']:>12.0f}")
+        return results
+
+    def measure(self, user, method, build, repeat):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+
+        def request():
+            url, data, *extra = build()
+            kwargs = extra[0] if extra else {}
+            send = getattr(client, method)
+            if user is not None and not client.session.session_key:
+                client.force_login(user)  # logout scenario drops the session
+            response = send(url, data, **kwargs) if data is not None else send(url, **kwargs)
+            if response.streaming:
+                # Exports, ZIPs and files do their queries and reads while streaming
+                for _ in response.streaming_content:
+                    pass
+                response.close()
+            return response
+
+        request()  # warm up caches, templates and URL resolution
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            response = request()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        if response.status_code >= 400:
+            raise CommandError(f'{method.upper()} {response.request["PATH_INFO"]} returned {response.status_code}')
+
+        return {
+            'time_ms': round(statistics.median(timings), 2),
+            'queries': len(queries),
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def query_growth(self, results):
+        """Routes whose query count rises with the seeded size: an N+1 a baseline would only record"""
+        sizes = sorted(results, key=int)
+        growing = []
+        for name in results[sizes[0]] if sizes else ():
+            counts = [(size, results[size][name]['queries']) for size in sizes if name in results[size]]
+            if counts[-1][1] > counts[0][1]:
+                growing.append(f"{name}: queries grow with data size ({', '.join(f'[{s}] {q}' for s, q in counts)})")
+        return growing
+
+    def compare(self, baseline, results, options):
+        threshold, min_delta = options['threshold'], options['min_delta_ms']
+        regressions = []
+        for size, routes in results.items():
+            for name, current in routes.items():
+                base = baseline.get(size, {}).get(name)
+                if base is None:
+                    continue
+                label = f'[{size}] {name}'
+                if current['queries'] > base['queries']:
+                    regressions.append(f"{label}: {current['queries']} queries (baseline {base['queries']})")
+                if (current['time_ms'] > base['time_ms'] * threshold
+                        and current['time_ms'] - base['time_ms'] > min_delta):
+                    regressions.append(f"{label}: {current['time_ms']}ms (baseline {base['time_ms']}ms)")
+                if current['peak_kib'] > base['peak_kib'] * threshold and current['peak_kib'] - base['peak_kib'] > 64:
+                    regressions.append(f"{label}: {current['peak_kib']}KiB peak (baseline {base['peak_kib']}KiB)")
+        return regressions
+
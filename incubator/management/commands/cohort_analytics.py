@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from incubator import analytics
+from incubator.cohorts import InvalidCohort
+
+
+class Command(BaseCommand):
+    help = 'Print milestone time-to-complete percentiles, cohort curves and outliers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cohort', help='Only startups of this intake cohort, e.g. 2025-Q3')
+        parser.add_argument('--refresh', action='store_true', help='Recompute instead of using the cached result')
+        parser.add_argument('--json', action='store_true', help='Print the raw result as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            result = analytics.cohort_analytics(options['cohort'], refresh=options['refresh'])
+        except (InvalidCohort, analytics.AnalyticsUnavailable) as exc:
+            raise CommandError(str(exc))
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+
+        self.stdout.write(f"{result['milestones']} milestone(s), {result.get('completed', 0)} completed.")
+        for title, section in (('Milestone', 'by_milestone'), ('Stage', 'by_stage'), ('Industry', 'by_industry')):
+            self.stdout.write(f'\nDays to complete by {title.lower()}:')
+            self.stdout.write(f"  {title:<20} {'done':>9} {'p25':>7} {'p50':>7} {'p75':>7} {'p90':>7}")
+            for row in result[section]:
+                values = [row[f'p{p}_days'] for p in analytics.PERCENTILES]
+                self.stdout.write(
+                    f"  {str(row['key']):<20} {row['completed']:>4}/{row['milestones']:<4} "
+                    + ' '.join(f"{'-' if value is None else value:>7}" for value in values)
+                )
+        self.stdout.write('\nCohort curves (% of milestones done within N days):')
+        for curve in result['cohort_curves']:
+            points = ', '.join(f'{day}d {share}%' for day, share in curve['curve'].items() if share is not None)
+            self.stdout.write(f"  {curve['cohort']}: {points or 'too recent'}")
+        self.stdout.write(self.style.SUCCESS(f"\n{len(result['outliers'])} outlier completion(s)."))
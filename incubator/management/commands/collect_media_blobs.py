@@ -0,0 +1,40 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from incubator.models import StoredBlob
+from incubator.storage import BLOB_PREFIX
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed blobs that no file field has referenced for a while'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24, help='How long a blob stays unreferenced first')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the blobs that would be deleted')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        unreferenced = StoredBlob.objects.filter(refcount=0, updated_at__lt=cutoff)
+        removed = freed = 0
+        for blob in unreferenced.iterator():
+            if options['dry_run']:
+                self.stdout.write(f'{blob.name} ({blob.size} bytes)')
+                continue
+            # purge() re-checks under a row lock: a save may have referenced it again meanwhile
+            if default_storage.purge(blob.name):
+                removed += 1
+                freed += blob.size
+
+        # Spool files left behind by interrupted saves
+        tmp_dir = default_storage.path(f'{BLOB_PREFIX}/tmp')
+        if not options['dry_run'] and os.path.isdir(tmp_dir):
+            for entry in os.scandir(tmp_dir):
+                if entry.stat().st_mtime < time.time() - options['grace_hours'] * 3600:
+                    os.unlink(entry.path)
+
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} blob(s), {freed // 1024} KiB freed.'))
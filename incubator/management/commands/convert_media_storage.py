@@ -0,0 +1,96 @@
+import os
+import shutil
+from collections import Counter
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from incubator.models import StoredBlob
+from incubator.signals import FILE_FIELDS
+from incubator.storage import ContentAddressedStorage, blob_extension, blob_name, hash_file, is_blob_name
+
+
+class Command(BaseCommand):
+    help = 'Move existing uploads under MEDIA_ROOT into content-addressed blobs and recount references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be converted')
+        parser.add_argument('--recount-only', action='store_true', help='Only rebuild StoredBlob reference counts')
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('STORAGES["default"] is not incubator.storage.ContentAddressedStorage.')
+
+        if not options['recount_only']:
+            self.convert(options['dry_run'])
+        if not options['dry_run']:
+            self.recount()
+
+    def convert(self, dry_run):
+        """Link each legacy file to its blob, repoint the rows, then drop the original"""
+        originals, converted, missing, saved = set(), 0, 0, 0
+        for model, fields in FILE_FIELDS.items():
+            for field in fields:
+                names = (
+                    model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+                    .values_list(field, flat=True).distinct()
+                )
+                for old in names.iterator():
+                    if is_blob_name(old):
+                        continue
+                    path = default_storage.path(old)
+                    if not os.path.exists(path):
+                        self.stderr.write(f'{model.__name__}.{field}: {old} is missing, left as is')
+                        missing += 1
+                        continue
+                    sha256, size = hash_file(path)
+                    new = blob_name(sha256, blob_extension(old))
+                    target = default_storage.path(new)
+                    self.stdout.write(f'{old} -> {new}')
+                    converted += 1
+                    if dry_run:
+                        continue
+                    if os.path.exists(target):
+                        saved += size
+                    else:
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        try:
+                            os.link(path, target)
+                        except OSError:
+                            shutil.copy2(path, target)
+                    # queryset update: no signals, so no reference is released for the legacy name
+                    model.objects.filter(**{field: old}).update(**{field: new})
+                    originals.add(path)
+
+        for path in originals:
+            os.unlink(path)
+        verb = 'Would convert' if dry_run else 'Converted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {converted} file(s); '
+            f'{saved // 1024} KiB of duplicates removed, {missing} missing file(s).'
+        ))
+
+    def recount(self):
+        """Set every blob's refcount to the number of file fields that name it"""
+        counts = Counter()
+        for model, fields in FILE_FIELDS.items():
+            for field in fields:
+                names = model.objects.filter(**{f'{field}__startswith': 'cas/'}).values_list(field, flat=True)
+                counts.update(name for name in names.iterator() if is_blob_name(name))
+
+        known = set(StoredBlob.objects.values_list('name', flat=True))
+        now = timezone.now()
+        StoredBlob.objects.bulk_create([
+            StoredBlob(name=name, sha256=name.rsplit('/', 1)[1][:64], size=default_storage.size(name), refcount=0)
+            for name in counts if name not in known and default_storage.exists(name)
+        ])
+        changed = []
+        for blob in StoredBlob.objects.only('name', 'refcount').iterator():
+            if blob.refcount != counts[blob.name]:
+                blob.refcount, blob.updated_at = counts[blob.name], now
+                changed.append(blob)
+        StoredBlob.objects.bulk_update(changed, ['refcount', 'updated_at'], batch_size=500)
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(counts)} referenced blob(s); {sum(counts.values())} reference(s) in total.'
+        ))
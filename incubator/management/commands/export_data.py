@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from incubator import exports
+
+
+class Command(BaseCommand):
+    help = 'Write a startups, milestones or progress-reports extract as CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(exports.EXPORTS))
+        parser.add_argument('--format', choices=list(exports.FORMATS), default='csv')
+        parser.add_argument('--since', help='First date included (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Last date included (YYYY-MM-DD)')
+        parser.add_argument('--stage', help='Only startups in this stage')
+        parser.add_argument('--cohort', help='Only startups of this intake cohort, e.g. 2025-Q3')
+        parser.add_argument('--output', '-o', help='File to write (default stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            fields, rows = exports.export_rows(
+                options['kind'], since=options['since'], until=options['until'],
+                stage=options['stage'], cohort=options['cohort'],
+            )
+            content = exports.stream_export(options['format'], fields, rows)
+        except exports.ExportError as exc:
+            raise CommandError(str(exc))
+
+        if not options['output']:
+            for piece in content:
+                self.stdout.write(piece, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            for piece in content:
+                output.write(piece)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['kind']} export to {options['output']}."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from incubator.logos import generate_logo_variants, needs_variants
+from incubator.models import Startup
+
+
+class Command(BaseCommand):
+    help = 'Build resized WebP/JPEG variants for startup logos that do not have current ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--startup', type=int, action='append', help='Only this startup id (repeatable)')
+        parser.add_argument('--force', action='store_true', help='Rebuild variants even when they are current')
+
+    def handle(self, *args, **options):
+        startups = Startup.objects.exclude(logo='').exclude(logo__isnull=True).only('id', 'logo', 'logo_variants')
+        if options['startup']:
+            startups = startups.filter(pk__in=options['startup'])
+
+        built = skipped = 0
+        for startup in startups.order_by('id').iterator(chunk_size=200):
+            if not options['force'] and not needs_variants(startup):
+                skipped += 1
+                continue
+            if generate_logo_variants(startup):
+                built += 1
+                self.stdout.write(f'{startup.pk}: {len(startup.logo_variants["webp"])} size(s)')
+        self.stdout.write(self.style.SUCCESS(f'Built variants for {built} logo(s); {skipped} already current.'))
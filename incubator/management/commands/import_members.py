@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from incubator.importers import ImportFileError, MemberImporter, read_member_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create startup members from a CSV or XLSX spreadsheet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Spreadsheet with startup, first_name, last_name, position, email, contact_number columns')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows validated and inserted per batch')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as fileobj:
+                result = MemberImporter(chunk_size=options['chunk_size']).run(read_member_rows(fileobj, path))
+        except (OSError, ImportFileError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        for row, message in result.errors:
+            self.stderr.write(f'Row {row}: {message}')
+        self.stdout.write(self.style.SUCCESS(f'{result.created} member(s) imported, {result.failed} row(s) skipped.'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from incubator import documents
+from incubator.jobs import enqueue
+from incubator.models import Deliverable, DocumentText
+
+
+class Command(BaseCommand):
+    help = 'Extract and index text from deliverable files not indexed yet and drop text no file uses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--now', action='store_true', help='Extract in this process instead of queueing jobs')
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Forget failed extractions, and unsupported ones that can be read now, and try them again',
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            unsupported = DocumentText.objects.filter(status='unsupported').values_list('extension', flat=True)
+            readable = [extension for extension in set(unsupported) if documents.has_extractor(extension)]
+            _, deleted = DocumentText.objects.filter(
+                Q(status='failed') | Q(status='unsupported', extension__in=readable),
+            ).delete()
+            self.stdout.write(f"Forgot {deleted.get('incubator.DocumentText', 0)} failed extraction(s).")
+        self.stdout.write(f'Removed {documents.collect_unlinked()} unlinked document text(s).')
+
+        queued = 0
+        for field in ('upload_file', 'admin_file'):
+            pending = (
+                Deliverable.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+                .exclude(documents__field=field)
+                .values_list('pk', flat=True)
+            )
+            for deliverable_id in pending.iterator(chunk_size=500):
+                if options['now']:
+                    documents.index_deliverable_field(deliverable_id, field)
+                else:
+                    enqueue('incubator.tasks.index_deliverable_document', deliverable_id=deliverable_id, field=field)
+                queued += 1
+
+        done = 'Indexed' if options['now'] else 'Queued'
+        self.stdout.write(self.style.SUCCESS(f'{done} {queued} deliverable file(s).'))
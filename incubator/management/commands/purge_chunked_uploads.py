@@ -0,0 +1,44 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from incubator import uploads
+from incubator.models import ChunkedUpload, Job
+
+ATTACH_TASK = 'incubator.tasks.attach_deliverable_file'
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable uploads (and their partial or staged files) that have not received data recently'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Idle time after which an upload is abandoned')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = ChunkedUpload.objects.filter(updated_at__lt=cutoff)
+        purged = 0
+        for upload in stale.iterator():
+            uploads.discard_upload(upload)
+            purged += 1
+
+        # Partial files whose upload row is gone (e.g. the deliverable was deleted), and
+        # staged files no attach job is waiting for (e.g. the worker died mid-job)
+        orphans = 0
+        directory = uploads.partial_dir()
+        if directory.exists():
+            live = {f'{pk}.part' for pk in ChunkedUpload.objects.values_list('pk', flat=True)}
+            live.update(
+                os.path.basename(kwargs.get('staged_path', ''))
+                for kwargs in Job.objects.filter(task=ATTACH_TASK, status__in=['queued', 'running'])
+                .values_list('kwargs', flat=True)
+            )
+            for path in [*directory.glob('*.part'), *directory.glob('*.staged')]:
+                if path.name not in live and path.stat().st_mtime < time.time() - options['hours'] * 3600:
+                    path.unlink(missing_ok=True)
+                    orphans += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} stale upload(s) and {orphans} orphaned partial/staged file(s).'))
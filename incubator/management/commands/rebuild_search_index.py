@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from incubator import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search indexes of startups, progress reports and deliverable file text'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-optimize', action='store_true', help='Skip merging the index segments afterwards')
+
+    def handle(self, *args, **options):
+        if not search.rebuild(optimize=not options['no_optimize']):
+            self.stdout.write(self.style.WARNING('Full-text indexes need SQLite FTS5; search uses icontains here.'))
+            return
+        self.stdout.write(self.style.SUCCESS('Rebuilt the full-text search indexes.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from incubator.models import Startup
+
+
+class Command(BaseCommand):
+    help = 'Repair Startup milestone counters that have drifted from the Milestone table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report drifted startups')
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Startup.drifted_milestone_counters().values_list(
+                'id', 'name', 'total_milestones', 'completed_milestones', 'actual_total', 'actual_completed'
+            )
+        )
+        for startup_id, name, total, completed, actual_total, actual_completed in drifted:
+            self.stdout.write(
+                f'{name} (#{startup_id}): {completed}/{total} stored, {actual_completed}/{actual_total} actual'
+            )
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All milestone counters are in sync.'))
+            return
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} startup(s) drifted (dry run, nothing changed).'))
+            return
+
+        fixed = Startup.refresh_milestone_counters([row[0] for row in drifted])
+        self.stdout.write(self.style.SUCCESS(f'Repaired milestone counters on {fixed} startup(s).'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from incubator import rollups
+
+
+class Command(BaseCommand):
+    help = 'Fold new milestone/deliverable status transitions into the daily rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recompute every rollup from the full log')
+
+    def handle(self, *args, **options):
+        folded = rollups.rebuild() if options['rebuild'] else rollups.fold_all()
+        self.stdout.write(self.style.SUCCESS(f'Folded {folded} transition(s) into the daily rollups.'))
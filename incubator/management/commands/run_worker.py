@@ -0,0 +1,33 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from incubator.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs; start several of these for concurrent workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, help='Exit after this many jobs')
+        parser.add_argument('--name', help='Worker name recorded on claimed jobs (default host:pid)')
+
+    def handle(self, *args, **options):
+        stopping = []
+
+        def stop(signum, frame):
+            # Finish the current job, then exit
+            stopping.append(signum)
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        worker = Worker(name=options['name'])
+        self.stdout.write(f'Worker {worker.name} started.')
+        processed = worker.run(
+            burst=options['burst'], sleep=options['sleep'], max_jobs=options['max_jobs'],
+            should_stop=lambda: bool(stopping),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker.name} stopped after {processed} job(s).'))
@@ -0,0 +1,278 @@
+import math
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from incubator.models import (
+    User, Startup, StartupMember, Milestone, Deliverable, Readiness, Comment, ProgressReport,
+)
+
+
+INDUSTRIES = ['Agritech', 'Edtech', 'Fintech', 'Healthtech', 'Logistics', 'Cleantech', 'E-commerce', 'SaaS']
+POSITIONS = ['CEO', 'CTO', 'COO', 'CFO', 'Developer', 'Designer', 'Marketing Lead']
+READINESS_KINDS = ['TRL', 'CRL', 'BRL', 'FRL']
+SEED_EMAIL_DOMAIN = 'seed.example.com'  # marks generated users and startups for --flush
+WORDS = (
+    'market customer product prototype revenue pilot partner funding team launch feedback '
+    'validation growth design user channel pricing supply model research traction mentor'
+).split()
+
+
+class Distribution:
+    """Draws non-negative integer counts around a mean"""
+
+    def __init__(self, kind, rng):
+        self.kind = kind
+        self.rng = rng
+
+    def draw(self, mean):
+        if mean <= 0:
+            return 0
+        if self.kind == 'fixed':
+            return int(round(mean))
+        if self.kind == 'uniform':
+            return self.rng.randint(0, int(round(2 * mean)))
+        # Poisson: Knuth for small means, normal approximation for large ones
+        if mean > 30:
+            return max(0, int(round(self.rng.gauss(mean, math.sqrt(mean)))))
+        limit, k, p = math.exp(-mean), 0, 1.0
+        while True:
+            p *= self.rng.random()
+            if p <= limit:
+                return k
+            k += 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-generate synthetic users, startups, milestones, deliverables and reports. Each run adds '
+        'rows under a new tag; --flush first removes everything earlier runs generated.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--startups', type=int, default=100, help='Number of startups to create')
+        parser.add_argument('--admins', type=int, default=5, help='Admin accounts owning the startups')
+        parser.add_argument('--members', type=float, default=3, help='Mean members per startup')
+        parser.add_argument('--milestones', type=float, default=4, help='Mean milestones per startup')
+        parser.add_argument('--deliverables', type=float, default=4, help='Mean deliverables per milestone')
+        parser.add_argument('--comments', type=float, default=1, help='Mean comments per deliverable')
+        parser.add_argument('--readiness', type=float, default=1, help='Mean readiness levels per deliverable')
+        parser.add_argument('--reports', type=float, default=5, help='Mean progress reports per startup')
+        parser.add_argument(
+            '--distribution', choices=['poisson', 'uniform', 'fixed'], default='poisson',
+            help='How per-parent counts are drawn around their mean',
+        )
+        parser.add_argument('--days', type=int, default=365, help='Spread creation dates over this many days')
+        parser.add_argument('--batch-size', type=int, default=250, help='Startups written per transaction')
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible data')
+        parser.add_argument('--password', default='123', help='Password for every generated account')
+        parser.add_argument(
+            '--flush', action='store_true',
+            help='Delete the users and startups of earlier runs first (row by row, with signals)',
+        )
+        parser.add_argument(
+            '--fast', action='store_true',
+            help='Relax SQLite durability (synchronous=OFF) while seeding; only for throwaway databases',
+        )
+
+    def handle(self, *args, **options):
+        if options['startups'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--startups must be >= 0 and --batch-size >= 1.')
+
+        self.rng = random.Random(options['seed'])
+        self.dist = Distribution(options['distribution'], self.rng)
+        self.options = options
+        self.now = timezone.now()
+        # Hash once; hashing per account would dominate the run time
+        self.password = make_password(options['password'])
+        self.sentences = {}
+        self.totals = dict.fromkeys(
+            ['users', 'startups', 'members', 'milestones', 'deliverables', 'readiness', 'comments', 'reports'], 0
+        )
+
+        if options['fast'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous = OFF')
+
+        started = time.monotonic()
+        if options['flush']:
+            self.flush()
+        self.tag = self.new_tag()
+        with transaction.atomic():
+            admins = self.create_admins(max(1, options['admins']))
+
+        remaining, batch_no = options['startups'], 0
+        while remaining > 0:
+            size = min(remaining, options['batch_size'])
+            with transaction.atomic():
+                self.create_batch(batch_no, size, admins)
+            remaining -= size
+            batch_no += 1
+            self.stdout.write(f"  {options['startups'] - remaining}/{options['startups']} startups", ending='\r')
+            self.stdout.flush()
+
+        elapsed = time.monotonic() - started
+        summary = ', '.join(f'{count} {name}' for name, count in self.totals.items())
+        self.stdout.write(self.style.SUCCESS(f'Seeded {summary} in {elapsed:.1f}s (tag {self.tag}).'))
+
+    # Helpers -----------------------------------------------------------------
+
+    def flush(self):
+        seeded = {'email__endswith': f'@{SEED_EMAIL_DOMAIN}'}
+        with transaction.atomic():
+            startups, _ = Startup.objects.filter(**seeded).delete()
+            users, _ = User.objects.filter(**seeded).delete()
+        self.stdout.write(f'Flushed {startups + users} seeded row(s).')
+
+    def new_tag(self):
+        # Usernames carry the tag, so a re-run with the same --seed must not reuse one
+        while True:
+            tag = uuid.UUID(int=self.rng.getrandbits(128)).hex[:6]
+            if not User.objects.filter(username__startswith=f'seed{tag}.').exists():
+                return tag
+
+    def random_past(self, after=None):
+        start = after or self.now - timedelta(days=self.options['days'])
+        span = max((self.now - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.rng.random() * span)
+
+    def sentence(self, words=8):
+        # Draw from a small pre-built pool; building text per row is the slow part
+        pool = self.sentences.get(words)
+        if pool is None:
+            pool = self.sentences[words] = [
+                ' '.join(self.rng.choice(WORDS) for _ in range(words)).capitalize() + '.' for _ in range(256)
+            ]
+        return self.rng.choice(pool)
+
+    def build_user(self, username, role, first_name, last_name):
+        return User(
+            username=username,
+            email=f'{username}@{SEED_EMAIL_DOMAIN}',
+            password=self.password,
+            first_name=first_name,
+            last_name=last_name,
+            role=role,
+            date_joined=self.random_past(),
+        )
+
+    def create_admins(self, count):
+        admins = [
+            self.build_user(f'seed{self.tag}.admin{i}', 'admin', 'Seed', f'Admin {i}') for i in range(count)
+        ]
+        User.objects.bulk_create(admins)
+        self.totals['users'] += len(admins)
+        return admins
+
+    def create_batch(self, batch_no, size, admins):
+        opts, rng, draw = self.options, self.rng, self.dist.draw
+
+        startups = []
+        for i in range(size):
+            number = batch_no * opts['batch_size'] + i
+            startups.append(Startup(
+                name=f'{rng.choice(INDUSTRIES)} Startup {self.tag}-{number}',
+                description=self.sentence(16),
+                industry=rng.choice(INDUSTRIES),
+                stage=rng.choice(Startup.STAGE_CHOICES)[0],
+                owner=rng.choice(admins),
+                email=f'startup{number}@{SEED_EMAIL_DOMAIN}',
+                created_at=self.random_past(),
+            ))
+
+        # Milestones: the first `completed` of each chain are done, the rest open
+        milestones = []
+        for startup in startups:
+            total = draw(opts['milestones'])
+            completed = rng.randint(0, total)
+            startup.total_milestones = total
+            startup.completed_milestones = completed
+            for number in range(1, total + 1):
+                done = number <= completed
+                milestones.append(Milestone(
+                    startup=startup,
+                    milestone_progress=number,
+                    title=f'Milestone {number}',
+                    description=self.sentence(),
+                    status='completed' if done else 'pending',
+                    due_date=(startup.created_at + timedelta(days=30 * number)).date(),
+                    completed_at=self.random_past(startup.created_at) if done else None,
+                ))
+        Startup.objects.bulk_create(startups)
+
+        users, members, reports = [], [], []
+        for startup in startups:
+            for j in range(draw(opts['members'])):
+                user = self.build_user(f'seed{self.tag}.{startup.pk}.{j}', 'incubatee', 'Member', str(j))
+                users.append(user)
+                members.append(StartupMember(
+                    startup=startup, user=user, role=rng.choice(POSITIONS), joined_at=self.random_past(startup.created_at),
+                ))
+        User.objects.bulk_create(users)
+        StartupMember.objects.bulk_create(members)
+
+        authors = {}
+        for member in members:
+            authors.setdefault(member.startup_id, []).append(member.user)
+        for startup in startups:
+            for _ in range(draw(opts['reports'])):
+                reports.append(ProgressReport(
+                    startup=startup,
+                    submitted_by=rng.choice(authors.get(startup.pk) or admins),
+                    title=self.sentence(4),
+                    description=self.sentence(30),
+                    achievements=self.sentence(12),
+                    challenges=self.sentence(12),
+                    next_steps=self.sentence(12),
+                    submitted_at=self.random_past(startup.created_at),
+                ))
+        ProgressReport.objects.bulk_create(reports)
+
+        Milestone.objects.bulk_create(milestones)
+        deliverables = []
+        for milestone in milestones:
+            for j in range(1, draw(opts['deliverables']) + 1):
+                if milestone.status == 'completed':
+                    status = 'approved'
+                else:
+                    status = rng.choice(['pending', 'pending', 'submitted', 'rejected'])
+                deliverables.append(Deliverable(
+                    milestone=milestone,
+                    name=f'Deliverable {j}',
+                    requirements=self.sentence(10),
+                    due_date=milestone.due_date,
+                    status=status,
+                    uploaded_at=self.random_past(milestone.startup.created_at),
+                ))
+        Deliverable.objects.bulk_create(deliverables)
+
+        readiness, comments = [], []
+        for deliverable in deliverables:
+            commenters = authors.get(deliverable.milestone.startup_id) or admins
+            for _ in range(draw(opts['readiness'])):
+                readiness.append(Readiness(
+                    deliverable=deliverable,
+                    name=rng.choice(READINESS_KINDS),
+                    level=f'Level {rng.randint(1, 9)}',
+                ))
+            for _ in range(draw(opts['comments'])):
+                comments.append(Comment(
+                    deliverable=deliverable,
+                    user=rng.choice(commenters),
+                    content=self.sentence(14),
+                    created_at=self.random_past(deliverable.uploaded_at),
+                ))
+        Readiness.objects.bulk_create(readiness)
+        Comment.objects.bulk_create(comments)
+
+        for name, rows in (
+            ('users', users), ('startups', startups), ('members', members), ('milestones', milestones),
+            ('deliverables', deliverables), ('readiness', readiness), ('comments', comments), ('reports', reports),
+        ):
+            self.totals[name] += len(rows)
@@ -0,0 +1,97 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('incubator.profiling')
+
+
+class QueryRecorder:
+    """execute_wrapper that records each statement's SQL and duration"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def total_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self, threshold):
+        """Statements (by SQL text, parameters excluded) run at least `threshold` times"""
+        counts = Counter(sql for sql, _ in self.queries)
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+
+class QueryProfilingMiddleware:
+    """Per-request SQL query count, DB time and duplicate (N+1) detection.
+
+    Sampled requests get one structured log line on the `incubator.profiling`
+    logger; requests with duplicated statements are logged at WARNING. The
+    `Server-Timing` header is only added under DEBUG or for staff users, as
+    it exposes query counts and timings. Uses connection.execute_wrapper, so
+    it works with DEBUG off. Tune with QUERY_PROFILING_SAMPLE_RATE (0..1;
+    None samples everything under DEBUG and nothing otherwise) and
+    QUERY_PROFILING_DUPLICATE_THRESHOLD.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        rate = getattr(settings, 'QUERY_PROFILING_SAMPLE_RATE', None)
+        self.sample_rate = (1.0 if settings.DEBUG else 0.0) if rate is None else rate
+        self.duplicate_threshold = getattr(settings, 'QUERY_PROFILING_DUPLICATE_THRESHOLD', 2)
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        db_ms = recorder.total_time * 1000
+        duplicates = recorder.duplicates(self.duplicate_threshold)
+        duplicated = sum(duplicates.values())
+
+        timings = [
+            f'db;dur={db_ms:.1f};desc="{len(recorder.queries)} queries"',
+            f'app;dur={max(total_ms - db_ms, 0):.1f}',
+        ]
+        if duplicates:
+            timings.append(f'dupes;desc="{duplicated} duplicated in {len(duplicates)} statements"')
+        if settings.DEBUG or getattr(getattr(request, 'user', None), 'is_staff', False):
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = ', '.join(([existing] if existing else []) + timings)
+
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'db_ms': round(db_ms, 2),
+            'queries': len(recorder.queries),
+            'duplicated': duplicated,
+            'top_duplicates': [
+                {'sql': sql[:200], 'count': count}
+                for sql, count in sorted(duplicates.items(), key=lambda item: -item[1])[:3]
+            ],
+        }
+        logger.log(logging.WARNING if duplicates else logging.INFO, json.dumps(record), extra={'profile': record})
+        return response
@@ -0,0 +1,38 @@
+"""Add denormalized milestone counters to Startup and backfill them"""
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Startup = apps.get_model('incubator', 'Startup')
+    Milestone = apps.get_model('incubator', 'Milestone')
+
+    milestones = Milestone.objects.filter(startup=OuterRef('pk')).order_by().values('startup')
+    Startup.objects.update(
+        total_milestones=Coalesce(Subquery(milestones.annotate(c=Count('pk')).values('c')), 0),
+        completed_milestones=Coalesce(
+            Subquery(milestones.filter(status='completed').annotate(c=Count('pk')).values('c')), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator', '0006_add_admin_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startup',
+            name='total_milestones',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='startup',
+            name='completed_milestones',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+"""Add database-backed program templates and seed the default program
+
+The default program reproduces the milestones/deliverables add_startup used
+to hardcode (4 milestones with 5, 3, 4 and 3 deliverables).
+"""
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+DEFAULT_DELIVERABLE_COUNTS = {1: 5, 2: 3, 3: 4, 4: 3}
+
+
+def create_default_program(apps, schema_editor):
+    ProgramTemplate = apps.get_model('incubator', 'ProgramTemplate')
+    MilestoneTemplate = apps.get_model('incubator', 'MilestoneTemplate')
+    DeliverableTemplate = apps.get_model('incubator', 'DeliverableTemplate')
+
+    if ProgramTemplate.objects.filter(is_default=True).exists():
+        return
+
+    program = ProgramTemplate.objects.create(name='Default Program', is_default=True)
+    for i, deliverable_count in DEFAULT_DELIVERABLE_COUNTS.items():
+        milestone = MilestoneTemplate.objects.create(
+            program=program,
+            milestone_progress=i,
+            title=f"Milestone {i}",
+            description=f"Default milestone {i} for {{startup}}",
+            status='pending',
+        )
+        DeliverableTemplate.objects.bulk_create([
+            DeliverableTemplate(
+                milestone=milestone,
+                name=f"Deliverable {j}",
+                requirements=f"Complete deliverable {j} for milestone {i}",
+            )
+            for j in range(1, deliverable_count + 1)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator', '0007_startup_milestone_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramTemplate',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('is_default', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MilestoneTemplate',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('milestone_progress', models.IntegerField()),
+                ('title', models.CharField(blank=True, max_length=200, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('due_offset_days', models.PositiveIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('not-yet', 'Not Yet'), ('pending', 'Pending'), ('completed', 'Completed')], default='pending', max_length=20)),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='milestones', to='incubator.programtemplate')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DeliverableTemplate',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('requirements', models.TextField(blank=True, null=True)),
+                ('due_offset_days', models.PositiveIntegerField(blank=True, null=True)),
+                ('milestone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliverables', to='incubator.milestonetemplate')),
+            ],
+        ),
+        migrations.RunPython(create_default_program, migrations.RunPython.noop),
+    ]
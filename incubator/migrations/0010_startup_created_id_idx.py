@@ -0,0 +1,16 @@
+"""Index backing keyset pagination of the dashboard startup lists"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator', '0009_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='startup',
+            index=models.Index(fields=['created_at', 'id'], name='startup_created_id_idx'),
+        ),
+    ]
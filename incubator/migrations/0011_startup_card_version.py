@@ -0,0 +1,17 @@
+"""Add the version token used to key cached dashboard card fragments"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator', '0010_startup_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startup',
+            name='card_version',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+    ]
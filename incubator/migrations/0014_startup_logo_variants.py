@@ -0,0 +1,17 @@
+"""Store the resized WebP/JPEG copies generated for each startup logo"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator', '0013_stored_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startup',
+            name='logo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,70 @@
+"""Text extracted from deliverable files, one row per distinct file, with an FTS5 index
+
+Like 0016 the index is an external-content FTS5 table maintained by
+triggers, so each newly extracted document is indexed on insert without
+touching the rest. Other database backends skip the index.
+"""
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+FTS_STATEMENTS = [
+    "CREATE VIRTUAL TABLE incubator_documenttext_fts USING fts5(text, content='incubator_documenttext', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER incubator_documenttext_fts_ai AFTER INSERT ON incubator_documenttext BEGIN "
+    "INSERT INTO incubator_documenttext_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER incubator_documenttext_fts_ad AFTER DELETE ON incubator_documenttext BEGIN "
+    "INSERT INTO incubator_documenttext_fts(incubator_documenttext_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER incubator_documenttext_fts_au AFTER UPDATE OF text ON incubator_documenttext BEGIN "
+    "INSERT INTO incubator_documenttext_fts(incubator_documenttext_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO incubator_documenttext_fts(rowid, text) VALUES (new.id, new.text); END",
+]
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in FTS_STATEMENTS:
+        schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS incubator_documenttext_fts_{suffix}')
+    schema_editor.execute('DROP TABLE IF EXISTS incubator_documenttext_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator', '0016_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentText',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('extension', models.CharField(blank=True, max_length=10)),
+                ('status', models.CharField(choices=[('ok', 'Extracted'), ('empty', 'No text'), ('unsupported', 'Unsupported type'), ('failed', 'Failed')], default='ok', max_length=20)),
+                ('text', models.TextField(blank=True)),
+                ('extracted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DeliverableDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('upload_file', 'Incubatee File'), ('admin_file', 'Admin File')], max_length=20)),
+                ('deliverable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='incubator.deliverable')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliverables', to='incubator.documenttext')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('deliverable', 'field'), name='unique_deliverable_document_field')],
+            },
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,59 @@
+"""Append-only status transition log with daily per-stage rollups"""
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incubator', '0017_document_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('milestone', 'Milestone'), ('deliverable', 'Deliverable')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('milestone_progress', models.IntegerField(blank=True, null=True)),
+                ('stage', models.CharField(max_length=50)),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('startup', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='incubator.startup')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['kind', 'object_id', 'created_at'], name='transition_object_idx'),
+                    models.Index(fields=['startup', 'created_at'], name='transition_startup_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyStatusRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('kind', models.CharField(choices=[('milestone', 'Milestone'), ('deliverable', 'Deliverable')], max_length=20)),
+                ('stage', models.CharField(max_length=50)),
+                ('to_status', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'to_status', 'day'], name='rollup_series_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'kind', 'stage', 'to_status'), name='unique_daily_status_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupCursor',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -1,4 +1,10 @@
-from django.db import models
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 
@@ -13,9 +19,28 @@ class User(AbstractUser):
     contact_number = models.CharField(max_length=20, blank=True, null=True)
     created_by = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['email'], name='user_email_idx'),  # email login
+            models.Index(fields=['role'], name='user_role_idx'),  # dashboards by role
+        ]
+
     def __str__(self):
         return self.username
 
+class StartupQuerySet(models.QuerySet):
+    def with_dashboard_stats(self):
+        """Everything a dashboard card needs, resolved in a single query.
+
+        Milestone totals and `progress` come from the stored counters, the
+        report count is a correlated subquery and the owner is joined in.
+        """
+        reports = ProgressReport.objects.filter(startup=OuterRef('pk')).order_by().values('startup')
+        return self.select_related('owner').annotate(
+            report_count=Coalesce(Subquery(reports.annotate(c=Count('pk')).values('c')), 0),
+        )
+
+
 class Startup(models.Model):
     STAGE_CHOICES = (
         ('ideation', 'Ideation'),
@@ -32,16 +57,75 @@ class Startup(models.Model):
     email = models.EmailField(max_length=120, blank=True, null=True)
     contact_number = models.CharField(max_length=20, blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
+
+    # Denormalized milestone counters, kept in sync by the Milestone signals
+    # in incubator/signals.py so that `progress` never has to query.
+    total_milestones = models.PositiveIntegerField(default=0, editable=False)
+    completed_milestones = models.PositiveIntegerField(default=0, editable=False)
+    # Cache key component for dashboard card fragments; replaced by a new unique
+    # value whenever the startup or anything shown on its card changes.
+    card_version = models.BigIntegerField(default=0, editable=False)
+    # Resized, metadata-stripped copies of `logo` built off the request path by
+    # incubator.logos: {"source": logo name, "webp": [[width, height, name], ...], "jpeg": [...]}
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     members = models.ManyToManyField(User, through='StartupMember', related_name='startups')
 
+    objects = StartupQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='startup_created_id_idx'),  # keyset pagination
+        ]
+
     @property
     def progress(self):
-        total = self.milestones.count()
-        if total == 0:
+        if not self.total_milestones:
             return 0
-        completed = self.milestones.filter(status='completed').count()
-        return int((completed / total) * 100)
+        return int((self.completed_milestones / self.total_milestones) * 100)
+
+    def save(self, *args, **kwargs):
+        # New card version in the same INSERT/UPDATE rather than a second statement
+        self.card_version = time.time_ns()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'card_version'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def milestone_counter_expressions(cls):
+        """Correlated subqueries computing the real milestone counts per startup"""
+        milestones = Milestone.objects.filter(startup=OuterRef('pk')).order_by().values('startup')
+        total = milestones.annotate(c=Count('pk')).values('c')
+        completed = milestones.filter(status='completed').annotate(c=Count('pk')).values('c')
+        return {
+            'total_milestones': Coalesce(Subquery(total), 0),
+            'completed_milestones': Coalesce(Subquery(completed), 0),
+        }
+
+    @classmethod
+    def refresh_milestone_counters(cls, startup_ids=None):
+        """Recompute stored counters from the Milestone table in a single UPDATE"""
+        startups = cls.objects.all()
+        if startup_ids is not None:
+            startups = startups.filter(pk__in=startup_ids)
+        return startups.update(card_version=time.time_ns(), **cls.milestone_counter_expressions())
+
+    @classmethod
+    def bump_card_version(cls, **lookups):
+        """Invalidate cached dashboard cards of the startups matching `lookups`"""
+        return cls.objects.filter(**lookups).update(card_version=time.time_ns())
+
+    @classmethod
+    def drifted_milestone_counters(cls):
+        """Startups whose stored counters disagree with their milestones"""
+        expressions = cls.milestone_counter_expressions()
+        return cls.objects.annotate(
+            actual_total=expressions['total_milestones'],
+            actual_completed=expressions['completed_milestones'],
+        ).exclude(
+            Q(total_milestones=F('actual_total'))
+            & Q(completed_milestones=F('actual_completed'))
+        )
 
     def __str__(self):
         return self.name
@@ -70,19 +154,51 @@ class Milestone(models.Model):
     due_date = models.DateField(blank=True, null=True)
     completed_at = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['startup', 'milestone_progress'], name='milestone_startup_progress_idx'),
+            models.Index(fields=['status'], name='milestone_status_idx'),
+        ]
+
     def is_locked(self):
         """Check if this milestone is locked (previous milestone not completed)"""
         if self.milestone_progress == 1:
             return False  # First milestone is never locked
         
-        previous_milestone = self.startup.milestones.filter(
+        previous_status = Milestone.objects.filter(
+            startup_id=self.startup_id,
             milestone_progress=self.milestone_progress - 1
-        ).first()
+        ).values_list('status', flat=True).first()
         
-        if previous_milestone:
-            return previous_milestone.status != 'completed'
+        if previous_status:
+            return previous_status != 'completed'
         return False
 
+    @staticmethod
+    def resolve_timeline(milestones):
+        """Resolve lock state for a startup's milestones in a single pass.
+
+        `milestones` must all belong to one startup. Sets `locked` on every
+        milestone (same rule as is_locked) and returns the current milestone:
+        the first one that is neither completed nor locked.
+        """
+        milestones = list(milestones)
+        status_by_progress = {}
+        for milestone in milestones:
+            status_by_progress.setdefault(milestone.milestone_progress, milestone.status)
+
+        current = None
+        for milestone in milestones:
+            progress = milestone.milestone_progress
+            if progress is None or progress == 1:
+                milestone.locked = False
+            else:
+                previous_status = status_by_progress.get(progress - 1)
+                milestone.locked = previous_status is not None and previous_status != 'completed'
+            if current is None and milestone.status != 'completed' and not milestone.locked:
+                current = milestone
+        return current
+
     def __str__(self):
         return f"{self.startup.name} - Milestone {self.milestone_progress}"
 
@@ -103,9 +219,186 @@ class Deliverable(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     uploaded_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['milestone', 'id'], name='deliverable_milestone_id_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
+class ChunkedUpload(models.Model):
+    """An in-progress resumable upload of a Deliverable file.
+
+    Chunks are appended to a partial file on disk (see incubator.uploads);
+    `offset` is the number of bytes received so far, so a client that lost
+    its connection asks for it and resumes from there.
+    """
+    FIELD_CHOICES = (
+        ('upload_file', 'Incubatee File'),
+        ('admin_file', 'Admin File'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    deliverable = models.ForeignKey(Deliverable, on_delete=models.CASCADE, related_name='chunked_uploads')
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chunked_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+class StoredBlob(models.Model):
+    """A file in ContentAddressedStorage (incubator.storage) and how many file fields reference it"""
+    name = models.CharField(max_length=255, primary_key=True)  # cas/ab/cd/<sha256><ext>
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['refcount', 'updated_at'], name='blob_refcount_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
+
+class DocumentText(models.Model):
+    """Text extracted from one distinct file, shared by every deliverable holding those bytes"""
+    STATUS_CHOICES = (
+        ('ok', 'Extracted'),
+        ('empty', 'No text'),
+        ('unsupported', 'Unsupported type'),
+        ('failed', 'Failed'),
+    )
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    extension = models.CharField(max_length=10, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ok')
+    text = models.TextField(blank=True)
+    extracted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.sha256[:12]}{self.extension} ({self.status})"
+
+
+class DeliverableDocument(models.Model):
+    """Which extracted text a deliverable's file field currently points at"""
+    deliverable = models.ForeignKey(Deliverable, on_delete=models.CASCADE, related_name='documents')
+    field = models.CharField(max_length=20, choices=ChunkedUpload.FIELD_CHOICES)
+    document = models.ForeignKey(DocumentText, on_delete=models.CASCADE, related_name='deliverables')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['deliverable', 'field'], name='unique_deliverable_document_field'),
+        ]
+    def __str__(self):
+        return f"{self.deliverable_id}:{self.field} -> {self.document_id}"
+
+
+class StatusTransition(models.Model):
+    """One status change of a milestone or deliverable; rows are only ever appended.
+
+    The startup is referenced without a database constraint so the history
+    (and the rollups built from it) outlives deleted startups. `stage` is the
+    startup's stage when the change happened.
+    """
+    KIND_CHOICES = (
+        ('milestone', 'Milestone'),
+        ('deliverable', 'Deliverable'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    startup = models.ForeignKey(Startup, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    milestone_progress = models.IntegerField(blank=True, null=True)
+    stage = models.CharField(max_length=50)
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20)
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'object_id', 'created_at'], name='transition_object_idx'),
+            models.Index(fields=['startup', 'created_at'], name='transition_startup_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError('Status transitions are append-only.')
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.from_status or '-'} -> {self.to_status}"
+
+
+class DailyStatusRollup(models.Model):
+    """Transitions per day, kind, startup stage and new status (maintained by incubator.rollups)"""
+    day = models.DateField()
+    kind = models.CharField(max_length=20, choices=StatusTransition.KIND_CHOICES)
+    stage = models.CharField(max_length=50)
+    to_status = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'kind', 'stage', 'to_status'], name='unique_daily_status_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'to_status', 'day'], name='rollup_series_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.kind}/{self.stage} -> {self.to_status}: {self.count}"
+
+
+class RollupCursor(models.Model):
+    """How far into an append-only log a rollup has been folded"""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
+class Job(models.Model):
+    """A unit of background work for the database job queue (incubator.jobs)"""
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    task = models.CharField(max_length=200)  # dotted path of a @task function
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)  # higher runs first
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
 class Readiness(models.Model):
     deliverable = models.ForeignKey(Deliverable, on_delete=models.CASCADE, related_name='readiness_levels')
     name = models.CharField(max_length=200)
@@ -133,5 +426,111 @@ class ProgressReport(models.Model):
     next_steps = models.TextField(blank=True, null=True)
     submitted_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['submitted_at'], name='report_submitted_idx'),  # recent reports
+            models.Index(fields=['startup', 'submitted_at'], name='report_startup_submitted_idx'),
+        ]
+
     def __str__(self):
         return self.title
+
+
+class ProgramTemplate(models.Model):
+    """Milestones and deliverables every startup in a program starts with"""
+    name = models.CharField(max_length=200, unique=True)
+    is_default = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def get_default(cls):
+        return cls.objects.filter(is_default=True).order_by('id').first()
+
+    @transaction.atomic
+    def apply(self, startups, batch_size=1000):
+        """Create this template's milestones and deliverables for `startups`.
+
+        Everything is written with bulk_create inside one transaction, so the
+        cost is a handful of INSERTs per batch instead of one per row.
+        Startups that already have milestones are skipped, so applying a
+        template twice does not duplicate them. Returns the created milestones.
+        """
+        startups = list(startups)
+        onboarded = set(
+            Milestone.objects.filter(startup__in=startups).values_list('startup_id', flat=True).distinct()
+        )
+        startups = [startup for startup in startups if startup.pk not in onboarded]
+        milestone_templates = list(
+            self.milestones.order_by('milestone_progress', 'id').prefetch_related(
+                models.Prefetch('deliverables', queryset=DeliverableTemplate.objects.order_by('id'))
+            )
+        )
+        if not startups or not milestone_templates:
+            return []
+
+        milestones = []
+        for startup in startups:
+            for template in milestone_templates:
+                milestones.append(template.build(startup))
+        Milestone.objects.bulk_create(milestones, batch_size=batch_size)
+
+        deliverables = []
+        for milestone in milestones:
+            for template in milestone.template.deliverables.all():
+                deliverables.append(template.build(milestone))
+        Deliverable.objects.bulk_create(deliverables, batch_size=batch_size)
+
+        # bulk_create bypasses the Milestone signals that maintain the counters
+        Startup.refresh_milestone_counters([startup.pk for startup in startups])
+        return milestones
+
+    def __str__(self):
+        return self.name
+
+def _offset_date(start, days):
+    """Date `days` after the datetime `start`, or None when no offset is set"""
+    if days is None:
+        return None
+    return timezone.localdate(start) + timedelta(days=days)
+
+class MilestoneTemplate(models.Model):
+    program = models.ForeignKey(ProgramTemplate, on_delete=models.CASCADE, related_name='milestones')
+    milestone_progress = models.IntegerField()
+    title = models.CharField(max_length=200, blank=True, null=True)
+    # "{startup}" is replaced with the startup name
+    description = models.TextField(blank=True, null=True)
+    due_offset_days = models.PositiveIntegerField(blank=True, null=True)  # days after startup creation
+    status = models.CharField(max_length=20, choices=Milestone.STATUS_CHOICES, default='pending')
+
+    def build(self, startup):
+        milestone = Milestone(
+            startup=startup,
+            milestone_progress=self.milestone_progress,
+            title=self.title,
+            description=self.description.replace('{startup}', startup.name) if self.description else self.description,
+            status=self.status,
+            due_date=_offset_date(startup.created_at, self.due_offset_days),
+        )
+        milestone.template = self
+        return milestone
+
+    def __str__(self):
+        return f"{self.program.name} - Milestone {self.milestone_progress}"
+
+class DeliverableTemplate(models.Model):
+    milestone = models.ForeignKey(MilestoneTemplate, on_delete=models.CASCADE, related_name='deliverables')
+    name = models.CharField(max_length=200)
+    requirements = models.TextField(blank=True, null=True)
+    due_offset_days = models.PositiveIntegerField(blank=True, null=True)  # days after startup creation
+
+    def build(self, milestone):
+        return Deliverable(
+            milestone=milestone,
+            name=self.name,
+            requirements=self.requirements,
+            due_date=_offset_date(milestone.startup.created_at, self.due_offset_days),
+            status='pending',
+        )
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = 'incubator.startup-cursor'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def startup_filters(params):
+    """Search/stage/industry filters from request parameters, blanks dropped"""
+    filters = {
+        'q': (params.get('q') or '').strip(),
+        'stage': (params.get('stage') or '').strip(),
+        'industry': (params.get('industry') or '').strip(),
+    }
+    return {key: value for key, value in filters.items() if value}
+
+
+def apply_startup_filters(queryset, filters):
+    if filters.get('q'):
+        queryset = queryset.filter(Q(name__icontains=filters['q']) | Q(description__icontains=filters['q']))
+    if filters.get('stage'):
+        queryset = queryset.filter(stage=filters['stage'])
+    if filters.get('industry'):
+        queryset = queryset.filter(industry__iexact=filters['industry'])
+    return queryset
+
+
+def encode_cursor(startup, filters):
+    return signing.dumps(
+        {'after': [startup.created_at.isoformat(), startup.pk], 'filters': filters},
+        salt=CURSOR_SALT, compress=True,
+    )
+
+
+def decode_cursor(cursor):
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+        created_at, pk = payload['after']
+        return datetime.fromisoformat(created_at), int(pk), payload.get('filters', {})
+    except (signing.BadSignature, KeyError, TypeError, ValueError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def paginate_startups(queryset, params, page_size=None):
+    """One keyset page of startups ordered by (created_at, id).
+
+    `params` is a QueryDict/dict carrying either a `cursor` from a previous
+    page (which also carries that page's filters) or fresh q/stage/industry
+    filters. Only page_size + 1 rows are read whatever the portfolio size.
+    Returns (startups, next_cursor, filters); next_cursor is None on the
+    last page.
+    """
+    page_size = page_size or getattr(settings, 'DASHBOARD_PAGE_SIZE', 24)
+    cursor = params.get('cursor')
+    if cursor:
+        created_at, pk, filters = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+    else:
+        filters = startup_filters(params)
+
+    queryset = apply_startup_filters(queryset, filters).order_by('created_at', 'id')
+    startups = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(startups) > page_size:
+        startups = startups[:page_size]
+        next_cursor = encode_cursor(startups[-1], filters)
+    return startups, next_cursor, filters
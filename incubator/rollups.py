@@ -0,0 +1,130 @@
+"""Status transition log and the daily per-stage rollups trend charts read.
+
+Every milestone/deliverable status change appends a StatusTransition
+(see signals.record_status_transition). A queued job folds the rows
+past a cursor into DailyStatusRollup, so each run only touches new
+transitions and charts read a table of days x stages x statuses rather
+than the whole log.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import DailyStatusRollup, Job, Milestone, RollupCursor, StatusTransition, Startup
+
+CURSOR = 'daily_status'
+ROLLUP_TASK = 'incubator.tasks.rollup_status_transitions'
+
+
+def settle_seconds():
+    return getattr(settings, 'STATUS_ROLLUP_SETTLE', 60)
+
+
+def record_transition(instance, from_status, changed_by=None):
+    """Append the status change of a saved Milestone or Deliverable to the log"""
+    if isinstance(instance, Milestone):
+        kind, startup_id, progress = 'milestone', instance.startup_id, instance.milestone_progress
+    else:
+        kind = 'deliverable'
+        startup_id, progress = Milestone.objects.filter(pk=instance.milestone_id).values_list(
+            'startup_id', 'milestone_progress',
+        ).first() or (None, None)
+    stage = Startup.objects.filter(pk=startup_id).values_list('stage', flat=True).first()
+    if stage is None:
+        return None
+    entry = StatusTransition.objects.create(
+        kind=kind, object_id=instance.pk, startup_id=startup_id, milestone_progress=progress, stage=stage,
+        from_status=from_status or '', to_status=instance.status, changed_by=changed_by,
+    )
+    schedule_rollup()
+    return entry
+
+
+def schedule_rollup():
+    """Queue one rollup run a little later, unless one is already waiting"""
+    if not Job.objects.filter(task=ROLLUP_TASK, status='queued').exists():
+        enqueue(ROLLUP_TASK, delay=settle_seconds())
+
+
+def fold_transitions(batch=5000):
+    """Add up to `batch` new transitions into the daily rollups; returns how many were folded.
+
+    The cursor row is locked for the run, so concurrent runs queue up
+    instead of counting a transition twice. Only transitions older than
+    STATUS_ROLLUP_SETTLE seconds are taken, which leaves time for
+    transactions that allocated a lower id to commit.
+    """
+    with transaction.atomic():
+        cursor, _ = RollupCursor.objects.select_for_update().get_or_create(name=CURSOR)
+        pending = StatusTransition.objects.filter(
+            pk__gt=cursor.last_id, created_at__lte=timezone.now() - timedelta(seconds=settle_seconds()),
+        )
+        upto = next(iter(pending.order_by('pk').values_list('pk', flat=True)[batch - 1:batch]), None)
+        if upto is None:
+            upto = pending.aggregate(last=Max('pk'))['last']
+            if upto is None:
+                return 0
+
+        groups = (
+            StatusTransition.objects.filter(pk__gt=cursor.last_id, pk__lte=upto)
+            .annotate(day=TruncDate('created_at'))
+            .values('day', 'kind', 'stage', 'to_status')
+            .annotate(transitions=Count('pk'))
+            .order_by()
+        )
+        folded = 0
+        for group in groups:
+            key = {field: group[field] for field in ('day', 'kind', 'stage', 'to_status')}
+            if not DailyStatusRollup.objects.filter(**key).update(count=F('count') + group['transitions']):
+                DailyStatusRollup.objects.create(**key, count=group['transitions'])
+            folded += group['transitions']
+
+        cursor.last_id, cursor.updated_at = upto, timezone.now()
+        cursor.save()
+    return folded
+
+
+def fold_all(batch=5000):
+    total = 0
+    while folded := fold_transitions(batch):
+        total += folded
+    return total
+
+
+def run_rollup():
+    """Fold everything settled, then queue another run for when the rest settles.
+
+    Transitions recorded while a rollup was already queued did not queue
+    their own run, and this run skips them until they are
+    STATUS_ROLLUP_SETTLE seconds old, so they are picked up here instead of
+    waiting for the next transition.
+    """
+    folded = fold_all()
+    cursor = RollupCursor.objects.filter(name=CURSOR).values_list('last_id', flat=True).first() or 0
+    oldest = StatusTransition.objects.filter(pk__gt=cursor).aggregate(oldest=Min('created_at'))['oldest']
+    if oldest is not None and not Job.objects.filter(task=ROLLUP_TASK, status='queued').exists():
+        enqueue(ROLLUP_TASK, run_at=max(oldest + timedelta(seconds=settle_seconds()), timezone.now()))
+    return folded
+
+
+def rebuild():
+    """Recompute every rollup from the full log"""
+    with transaction.atomic():
+        DailyStatusRollup.objects.all().delete()
+        RollupCursor.objects.update_or_create(name=CURSOR, defaults={'last_id': 0, 'updated_at': timezone.now()})
+    return fold_all()
+
+
+def daily_series(kind='milestone', to_status='completed', days=30, stage=None):
+    """[(day, transitions)] for the last `days` days, zero-filled, read from the rollups"""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = DailyStatusRollup.objects.filter(kind=kind, to_status=to_status, day__gte=since)
+    if stage:
+        rows = rows.filter(stage=stage)
+    counts = dict(rows.values('day').annotate(total=Sum('count')).values_list('day', 'total').order_by())
+    return [(since + timedelta(days=offset), counts.get(since + timedelta(days=offset), 0)) for offset in range(days)]
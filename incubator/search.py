@@ -0,0 +1,220 @@
+"""Full-text search over startups and progress reports.
+
+On SQLite the FTS5 tables created by migrations 0016 and 0017 (and kept
+in sync by triggers) are queried with BM25 ranking and highlighted
+snippets. Other backends fall back to an unranked icontains scan.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import DeliverableDocument, ProgressReport, Startup
+
+# Private-use markers survive escaping, then become <mark> tags
+_OPEN, _CLOSE = '\ue000', '\ue001'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# kind -> (fts table, model, indexed columns, BM25 column weights, columns returned)
+INDEXES = {
+    'startups': (
+        'incubator_startup_fts', Startup, ['name', 'description', 'industry'], (10.0, 2.0, 5.0),
+        ['id', 'name', 'industry', 'stage'],
+    ),
+    'reports': (
+        'incubator_progressreport_fts', ProgressReport,
+        ['title', 'description', 'achievements', 'challenges', 'next_steps'], (8.0, 2.0, 3.0, 3.0, 2.0),
+        ['id', 'title', 'startup_id', 'submitted_at'],
+    ),
+}
+
+# fts table -> (content table, indexed columns) for every index kept in sync by triggers
+SYNCED = {
+    **{table: (model._meta.db_table, columns) for table, model, columns, *_ in INDEXES.values()},
+    'incubator_documenttext_fts': ('incubator_documenttext', ['text']),
+}
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def fts_query(text):
+    """User input as an FTS5 query: every word must match, the last as a prefix.
+
+    Words are quoted, so FTS5 operators and punctuation in the input are
+    searched for literally instead of raising syntax errors.
+    """
+    tokens = TOKEN_RE.findall(text or '')
+    if not tokens:
+        return ''
+    quoted = [f'"{token}"' for token in tokens]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _highlight(snippet):
+    return mark_safe(escape(snippet).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>'))
+
+
+def search(kind, text, limit=20):
+    """Best matches as dicts of the returned columns plus a highlighted `snippet`"""
+    table, model, columns, weights, returned = INDEXES[kind]
+    query = fts_query(text)
+    if not query:
+        return []
+    if not fts_available():
+        return _fallback_search(model, columns, returned, text, limit)
+
+    source = model._meta.db_table
+    select = ', '.join(f'{source}.{column}' for column in returned)
+    sql = (
+        f"SELECT {select}, snippet({table}, -1, %s, %s, '…', 12), bm25({table}, {', '.join(map(str, weights))}) AS rank "
+        f"FROM {table} JOIN {source} ON {source}.id = {table}.rowid "
+        f"WHERE {table} MATCH %s ORDER BY rank LIMIT %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_OPEN, _CLOSE, query, limit])
+        rows = cursor.fetchall()
+    results = []
+    for row in rows:
+        result = dict(zip(returned, row[:len(returned)]))
+        result['snippet'] = _highlight(row[len(returned)])
+        result['rank'] = row[-1]
+        results.append(result)
+    if model is ProgressReport:
+        _add_startup_names(results)
+    return results
+
+
+def _fallback_search(model, columns, returned, text, limit):
+    condition = Q()
+    for token in TOKEN_RE.findall(text):
+        condition &= Q(*[Q(**{f'{column}__icontains': token}) for column in columns], _connector=Q.OR)
+    rows = model.objects.filter(condition).order_by('-pk').values(*dict.fromkeys(returned + columns))[:limit]
+    results = []
+    for row in rows:
+        text_value = next((row[column] for column in columns if row[column]), '')
+        results.append({**{column: row[column] for column in returned}, 'snippet': escape(text_value[:120]), 'rank': 0})
+    if model is ProgressReport:
+        _add_startup_names(results)
+    return results
+
+
+def _add_startup_names(results):
+    # One query for the page instead of a join inside the MATCH
+    names = dict(Startup.objects.filter(pk__in={r['startup_id'] for r in results}).values_list('pk', 'name'))
+    for result in results:
+        result['startup_name'] = names.get(result['startup_id'])
+
+
+def search_documents(text, startup_id=None, milestone_id=None, limit=20):
+    """Deliverable files whose extracted text matches, optionally within one startup or milestone.
+
+    Each result is a dict of deliverable_id, deliverable_name, field,
+    milestone_id, milestone_title, startup_id, startup_name and snippet.
+    """
+    query = fts_query(text)
+    if not query:
+        return []
+    links = DeliverableDocument.objects.all()
+    if startup_id:
+        links = links.filter(deliverable__milestone__startup_id=startup_id)
+    if milestone_id:
+        links = links.filter(deliverable__milestone_id=milestone_id)
+    columns = {
+        'deliverable_id': 'deliverable_id', 'deliverable_name': 'deliverable__name', 'field': 'field',
+        'milestone_id': 'deliverable__milestone_id', 'milestone_title': 'deliverable__milestone__title',
+        'startup_id': 'deliverable__milestone__startup_id', 'startup_name': 'deliverable__milestone__startup__name',
+    }
+
+    if not fts_available():
+        for token in TOKEN_RE.findall(text):
+            links = links.filter(document__text__icontains=token)
+        rows = links.order_by('-pk').values(*columns.values(), 'document__text')[:limit]
+        return [
+            {**{key: row[path] for key, path in columns.items()}, 'snippet': escape(row['document__text'][:120])}
+            for row in rows
+        ]
+
+    conditions, params = '', [_OPEN, _CLOSE, query]
+    if startup_id:
+        conditions += ' AND m.startup_id = %s'
+        params.append(startup_id)
+    if milestone_id:
+        conditions += ' AND d.milestone_id = %s'
+        params.append(milestone_id)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT link.deliverable_id, d.name, link.field, d.milestone_id, m.title, m.startup_id, s.name, "
+            "snippet(incubator_documenttext_fts, 0, %s, %s, '…', 16) "
+            "FROM incubator_documenttext_fts "
+            "JOIN incubator_deliverabledocument link ON link.document_id = incubator_documenttext_fts.rowid "
+            "JOIN incubator_deliverable d ON d.id = link.deliverable_id "
+            "JOIN incubator_milestone m ON m.id = d.milestone_id "
+            "JOIN incubator_startup s ON s.id = m.startup_id "
+            f"WHERE incubator_documenttext_fts MATCH %s{conditions} "
+            "ORDER BY bm25(incubator_documenttext_fts), link.deliverable_id LIMIT %s",
+            params + [limit],
+        )
+        rows = cursor.fetchall()
+    return [{**dict(zip(columns, row[:-1])), 'snippet': _highlight(row[-1])} for row in rows]
+
+
+def _trigger_statements(fts, table, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    return {
+        f'{fts}_ai': f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                     f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f'{fts}_ad': f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                     f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f'{fts}_au': f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+                     f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+                     f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+    }
+
+
+def ensure_triggers(using=DEFAULT_DB_ALIAS):
+    """Recreate sync triggers that a table rebuild dropped; returns the fts tables repaired.
+
+    SQLite's schema editor applies most AlterFields by copying the table
+    and dropping the original, which silently takes its triggers along, and
+    the index then goes stale. Runs after every migrate (see apps.py); an
+    index whose triggers were missing is rebuilt, since rows may have
+    changed meanwhile.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite':
+        return []
+    repaired = []
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {name for name, in cursor.fetchall()}
+        for fts, (table, columns) in SYNCED.items():
+            if fts not in existing:
+                continue  # migrated back to before the index was created
+            statements = _trigger_statements(fts, table, columns)
+            if existing.issuperset(statements):
+                continue
+            for statement in statements.values():
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            repaired.append(fts)
+    return repaired
+
+
+def rebuild(optimize=True):
+    """Re-read every indexed row (after raw SQL loads or restores) and merge segments"""
+    if not fts_available():
+        return False
+    ensure_triggers()
+    with connection.cursor() as cursor:
+        for table in SYNCED:
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+            if optimize:
+                cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+    return True
@@ -0,0 +1,110 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import documents, logos, rollups, search
+from .models import Milestone, Startup, StartupMember, Deliverable, ProgressReport
+from .storage import ContentAddressedStorage, is_blob_name
+
+# File fields whose blobs are reference-counted by ContentAddressedStorage
+FILE_FIELDS = {
+    Deliverable: ('upload_file', 'admin_file'),
+    Startup: ('logo',),
+}
+
+
+@receiver(post_save, sender=Milestone)
+@receiver(post_delete, sender=Milestone)
+def sync_milestone_counters(sender, instance, **kwargs):
+    """Keep Startup.total_milestones / completed_milestones in step with its milestones"""
+    Startup.refresh_milestone_counters([instance.startup_id])
+
+
+@receiver(post_init, sender=Milestone)
+@receiver(post_init, sender=Deliverable)
+def remember_status(sender, instance, **kwargs):
+    instance._stored_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Milestone)
+@receiver(post_save, sender=Deliverable)
+def record_status_transition(sender, instance, created, **kwargs):
+    """Log status changes of existing rows; views set `_changed_by` to credit the user"""
+    previous = getattr(instance, '_stored_status', None)
+    if not created and previous is not None and instance.status != previous:
+        rollups.record_transition(instance, previous, getattr(instance, '_changed_by', None))
+    instance._stored_status = instance.status
+
+
+@receiver(post_save, sender=Startup)
+def startup_changed(sender, instance, **kwargs):
+    # Startup.save() already replaced card_version in its own UPDATE
+    if logos.needs_variants(instance):
+        logos.schedule_logo_variants(instance)
+    elif not instance.logo and instance.logo_variants:
+        Startup.objects.filter(pk=instance.pk).update(logo_variants={})
+        transaction.on_commit(partial(logos.release_variants, instance.logo_variants, sender.logo.field.storage))
+
+
+@receiver(post_save, sender=StartupMember)
+@receiver(post_delete, sender=StartupMember)
+@receiver(post_save, sender=ProgressReport)
+@receiver(post_delete, sender=ProgressReport)
+def startup_child_changed(sender, instance, **kwargs):
+    Startup.bump_card_version(pk=instance.startup_id)
+
+
+@receiver(post_save, sender=Deliverable)
+@receiver(post_delete, sender=Deliverable)
+def deliverable_changed(sender, instance, **kwargs):
+    Startup.bump_card_version(milestones__id=instance.milestone_id)
+
+
+def _file_names(instance):
+    # Read from __dict__ so deferred fields are not fetched just to track them
+    names = {}
+    for field in FILE_FIELDS[type(instance)]:
+        value = instance.__dict__.get(field)
+        names[field] = getattr(value, 'name', value) or None
+    return names
+
+
+def _release_blobs(sender, names):
+    for field, name in names:
+        storage = sender._meta.get_field(field).storage
+        if name and is_blob_name(name) and isinstance(storage, ContentAddressedStorage):
+            transaction.on_commit(partial(storage.delete, name))
+
+
+@receiver(post_init, sender=Deliverable)
+@receiver(post_init, sender=Startup)
+def remember_file_names(sender, instance, **kwargs):
+    instance._stored_file_names = _file_names(instance)
+
+
+@receiver(post_save, sender=Deliverable)
+@receiver(post_save, sender=Startup)
+def release_replaced_files(sender, instance, **kwargs):
+    """A replaced or cleared file gives up its reference on the stored blob (and its indexed text)"""
+    current = _file_names(instance)
+    previous = getattr(instance, '_stored_file_names', {})
+    changed = [field for field, name in previous.items() if name != current[field]]
+    _release_blobs(sender, [(field, previous[field]) for field in changed])
+    instance._stored_file_names = current
+    if sender is Deliverable and changed:
+        documents.schedule_indexing(instance, changed)
+
+
+@receiver(post_delete, sender=Deliverable)
+@receiver(post_delete, sender=Startup)
+def release_deleted_files(sender, instance, **kwargs):
+    _release_blobs(sender, _file_names(instance).items())
+    if sender is Startup and instance.__dict__.get('logo_variants'):
+        transaction.on_commit(partial(logos.release_variants, instance.logo_variants, sender.logo.field.storage))
+
+
+def restore_search_triggers(sender, using, **kwargs):
+    # Connected to post_migrate in apps.py: table rebuilds during migrate drop the FTS triggers
+    search.ensure_triggers(using)
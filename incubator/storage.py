@@ -0,0 +1,144 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+BLOB_PREFIX = 'cas'
+BLOB_NAME_RE = re.compile(rf'^{BLOB_PREFIX}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/(?P<sha256>[0-9a-f]{{64}})(?P<ext>\.[a-z0-9]{{1,10}})?$')
+HASH_BUFFER = 64 * 1024
+
+
+def blob_name(sha256, ext=''):
+    """cas/ab/cd/abcd...<ext>: two shard levels keep directories small"""
+    return f'{BLOB_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}'
+
+
+def blob_extension(name):
+    ext = os.path.splitext(name)[1].lower()
+    return ext if re.fullmatch(r'\.[a-z0-9]{1,10}', ext) else ''
+
+
+def is_blob_name(name):
+    return bool(name and BLOB_NAME_RE.match(name))
+
+
+def hash_file(path):
+    digest, size = hashlib.sha256(), 0
+    with open(path, 'rb') as fileobj:
+        for data in iter(lambda: fileobj.read(HASH_BUFFER), b''):
+            digest.update(data)
+            size += len(data)
+    return digest.hexdigest(), size
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that stores each distinct file once, named by its SHA-256.
+
+    The upload_to directory and the file name are replaced by
+    cas/<2 hex>/<2 hex>/<sha256><ext>, so the same bytes saved for many
+    deliverables share one blob, and a name's content never changes (its URL
+    can be cached as immutable). Each save adds a reference in StoredBlob
+    and delete() drops one; unreferenced blobs are removed by the
+    collect_media_blobs command after a grace period rather than inline.
+    purge() holds the blob's row lock while it re-checks the refcount and
+    removes the file, and a save takes its reference before looking for the
+    file, so a save racing a purge either keeps the blob alive or writes the
+    file again. Names outside cas/ (files from before convert_media_storage)
+    behave as in FileSystemStorage.
+    """
+
+    def _save(self, name, content):
+        ext = blob_extension(name)
+        if hasattr(content, 'temporary_file_path'):
+            source, owned = content.temporary_file_path(), False
+            sha256 = getattr(content, 'sha256', None)  # already verified by uploads.finalize_upload
+            if sha256:
+                size = os.path.getsize(source)
+            else:
+                sha256, size = hash_file(source)
+        else:
+            source, sha256, size = self._spool(content)
+            owned = True
+
+        name = blob_name(sha256, ext)
+        path = self.path(name)
+        self.add_reference(name, sha256, size)
+        if os.path.exists(path):
+            if owned:
+                os.unlink(source)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True, mode=self.directory_permissions_mode or 0o777)
+            file_move_safe(source, path, allow_overwrite=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(path, self.file_permissions_mode)
+        return name
+
+    def _spool(self, content):
+        """Copy `content` to a temp file beside the blobs, hashing it on the way.
+
+        The temp file is on the blobs' filesystem, so it can be renamed into place.
+        """
+        tmp_dir = self.path(f'{BLOB_PREFIX}/tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest, size = hashlib.sha256(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest(), size
+
+    def get_available_name(self, name, max_length=None):
+        # Names are content hashes: the same name for the same bytes is the point
+        return name
+
+    def add_reference(self, name, sha256, size, count=1):
+        from .models import StoredBlob
+
+        while True:
+            _, created = StoredBlob.objects.get_or_create(
+                name=name, defaults={'sha256': sha256, 'size': size, 'refcount': count},
+            )
+            # The UPDATE waits on a purge in progress and finds nothing once it commits; create the row again
+            if created or StoredBlob.objects.filter(pk=name).update(
+                refcount=F('refcount') + count, updated_at=timezone.now(),
+            ):
+                return
+
+    def delete(self, name):
+        """Drop one reference to a blob; legacy names are deleted outright"""
+        if not is_blob_name(name):
+            return super().delete(name)
+        from .models import StoredBlob
+
+        StoredBlob.objects.filter(pk=name, refcount__gt=0).update(
+            refcount=F('refcount') - 1, updated_at=timezone.now(),
+        )
+
+    def purge(self, name):
+        """Remove an unreferenced blob's file and row; False if it has been referenced again.
+
+        The row stays locked until the file is gone, so a save of the same
+        content blocks on its reference until the purge commits.
+        """
+        from .models import StoredBlob
+
+        with transaction.atomic():
+            if StoredBlob.objects.select_for_update().filter(pk=name, refcount=0).first() is None:
+                return False
+            super().delete(name)
+            StoredBlob.objects.filter(pk=name).delete()
+        return True
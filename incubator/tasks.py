@@ -0,0 +1,61 @@
+"""Background jobs run by `manage.py run_worker` (see incubator.jobs)"""
+import os
+
+from django.db import transaction
+
+from . import documents, logos, rollups
+from .jobs import task
+from .models import Deliverable, ProgramTemplate, Startup
+from .uploads import attach_staged_file
+
+
+@task(priority=10)
+def apply_program_template(startup_ids, program_id=None):
+    """Create the program's milestones/deliverables for startups that have none yet"""
+    program = ProgramTemplate.objects.filter(pk=program_id).first() if program_id else ProgramTemplate.get_default()
+    if program is None:
+        return
+    with transaction.atomic():
+        startups = list(Startup.objects.select_for_update().filter(pk__in=startup_ids, total_milestones=0))
+        if startups:
+            program.apply(startups)
+
+
+def discard_staged_file(staged_path, **kwargs):
+    if os.path.exists(staged_path):
+        os.unlink(staged_path)
+
+
+@task(priority=5, on_failure=discard_staged_file)
+def attach_deliverable_file(deliverable_id, field, staged_path, filename):
+    if not os.path.exists(staged_path):
+        return  # already attached by an earlier run of this job
+    deliverable = Deliverable.objects.filter(pk=deliverable_id).first()
+    if deliverable is None:
+        os.unlink(staged_path)
+        return
+    attach_staged_file(deliverable, field, staged_path, filename)
+
+
+@task(priority=0)
+def delete_startup(startup_id):
+    startup = Startup.objects.filter(pk=startup_id).first()
+    if startup is not None:
+        startup.delete()
+
+
+@task(priority=-5, max_attempts=3)
+def build_logo_variants(startup_id):
+    startup = Startup.objects.filter(pk=startup_id).first()
+    if startup is not None and logos.needs_variants(startup):
+        logos.generate_logo_variants(startup)
+
+
+@task(priority=-10, max_attempts=3)
+def index_deliverable_document(deliverable_id, field):
+    documents.index_deliverable_field(deliverable_id, field)
+
+
+@task(priority=-10)
+def rollup_status_transitions():
+    rollups.run_rollup()
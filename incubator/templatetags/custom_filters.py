@@ -9,3 +9,44 @@ def percentage(value, arg):
         return int((value / arg) * 100)
     except (ValueError, ZeroDivisionError):
         return 0
+
+
+def _logo_variants(startup, fmt):
+    """Current variants of `fmt` as [(width, height, name)], empty while they are being built"""
+    variants = startup.logo_variants or {}
+    if not startup.logo or variants.get('source') != startup.logo.name:
+        return []
+    # Entries built before heights were recorded are [width, name] until rebuilt
+    return [tuple(entry) if len(entry) == 3 else (entry[0], None, entry[1]) for entry in variants.get(fmt, [])]
+
+
+@register.filter
+def logo_srcset(startup, fmt='jpeg'):
+    storage = startup.logo.storage
+    return ', '.join(f'{storage.url(name)} {width}w' for width, _, name in _logo_variants(startup, fmt))
+
+
+@register.filter
+def logo_src(startup, size=128):
+    """Smallest JPEG variant at least `size` px wide, else the largest, else the original"""
+    variants = sorted(_logo_variants(startup, 'jpeg'))
+    for width, _, name in variants:
+        if width >= int(size):
+            return startup.logo.storage.url(name)
+    return startup.logo.storage.url(variants[-1][2]) if variants else startup.logo.url
+
+
+@register.filter
+def logo_box(startup, size=128):
+    """{'width', 'height'} of the logo fitted into a `size` px square, keeping its aspect ratio.
+
+    The height is None while the logo's dimensions are unknown (no variants
+    yet), so only the width is rendered and the browser keeps the ratio.
+    """
+    size = int(size)
+    measured = [(width, height) for width, height, _ in _logo_variants(startup, 'jpeg') if height]
+    if not measured:
+        return {'width': size, 'height': None}
+    width, height = max(measured)
+    scale = size / max(width, height)
+    return {'width': max(1, round(width * scale)), 'height': max(1, round(height * scale))}
@@ -1,3 +1,1364 @@
-from django.test import TestCase
+import csv
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import hashers
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.db.models import Q
+from django.http import Http404
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .models import User, Startup, StartupMember, ProgressReport, Milestone, Deliverable, ChunkedUpload, StoredBlob, Job, ProgramTemplate, DocumentText, StatusTransition, DailyStatusRollup
+from .accounts import allocate_usernames, bulk_create_users, create_user_with_unique_username
+from . import analytics, documents, hashing, logos, rollups, search, tasks, uploads
+from .hashing import hash_passwords
+from .jobs import Worker, retry_delay
+from .importers import ImportFileError, MemberImporter, read_member_rows
+from .cohorts import InvalidCohort, cohort_label, cohort_range
+from .pagination import paginate_startups
+from .views import serve_public_media
+
+
+class MilestoneCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.startup = Startup.objects.create(name='Acme', owner=cls.admin)
+
+    def counters(self, startup=None):
+        startup = Startup.objects.get(pk=(startup or self.startup).pk)
+        return startup.completed_milestones, startup.total_milestones, startup.progress
+
+    def test_counters_follow_milestone_saves_and_deletes(self):
+        first = Milestone.objects.create(startup=self.startup, milestone_progress=1, status='pending')
+        second = Milestone.objects.create(startup=self.startup, milestone_progress=2, status='completed')
+        self.assertEqual(self.counters(), (1, 2, 50))
+
+        first.status = 'completed'
+        first.save()
+        self.assertEqual(self.counters(), (2, 2, 100))
+        second.status = 'pending'
+        second.save()
+        self.assertEqual(self.counters(), (1, 2, 50))
+
+        second.delete()
+        self.assertEqual(self.counters(), (1, 1, 100))
+        first.delete()
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+    def test_reconcile_command_repairs_drifted_counters(self):
+        other = Startup.objects.create(name='Other', owner=self.admin)
+        for startup in (self.startup, other):
+            Milestone.objects.create(startup=startup, milestone_progress=1, status='completed')
+        out = StringIO()
+        call_command('reconcile_milestone_counters', stdout=out)
+        self.assertIn('All milestone counters are in sync.', out.getvalue())
+
+        # Queryset updates and raw SQL skip the signals
+        Milestone.objects.filter(startup=self.startup).update(status='pending')
+        Startup.objects.filter(pk=other.pk).update(total_milestones=7)
+        out = StringIO()
+        call_command('reconcile_milestone_counters', '--dry-run', stdout=out)
+        self.assertIn(f'Acme (#{self.startup.pk}): 1/1 stored, 0/1 actual', out.getvalue())
+        self.assertIn('2 startup(s) drifted', out.getvalue())
+        self.assertEqual(self.counters(), (1, 1, 100))
+
+        out = StringIO()
+        call_command('reconcile_milestone_counters', stdout=out)
+        self.assertIn('Repaired milestone counters on 2 startup(s).', out.getvalue())
+        self.assertEqual((self.counters(), self.counters(other)), ((0, 1, 0), (1, 1, 100)))
+        self.assertFalse(Startup.drifted_milestone_counters().exists())
+
+
+class ProgramTemplateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.program = ProgramTemplate.objects.create(name='Accelerator')
+        first = cls.program.milestones.create(milestone_progress=1, title='Discovery', due_offset_days=30,
+                                              description='Interviews for {startup}')
+        first.deliverables.create(name='Interview notes', due_offset_days=14)
+        first.deliverables.create(name='Persona')
+        cls.program.milestones.create(milestone_progress=2, title='Pilot', status='completed')
+        created_at = timezone.make_aware(timezone.datetime(2025, 1, 20, 12))
+        cls.startups = [
+            Startup.objects.create(name=f'S{index}', owner=cls.admin, created_at=created_at) for index in range(3)
+        ]
+
+    def test_apply_builds_dated_rows_and_counters(self):
+        milestones = self.program.apply(self.startups[:2])
+        self.assertEqual(len(milestones), 4)
+        startup = Startup.objects.get(pk=self.startups[0].pk)
+        self.assertEqual((startup.completed_milestones, startup.total_milestones), (1, 2))  # despite bulk_create
+        discovery = startup.milestones.get(milestone_progress=1)
+        self.assertEqual(discovery.description, 'Interviews for S0')
+        self.assertEqual(discovery.due_date, timezone.datetime(2025, 2, 19).date())
+        self.assertEqual(startup.milestones.get(milestone_progress=2).due_date, None)
+        self.assertEqual(
+            dict(discovery.deliverables.values_list('name', 'due_date')),
+            {'Interview notes': timezone.datetime(2025, 2, 3).date(), 'Persona': None},
+        )
+        self.assertFalse(Startup.drifted_milestone_counters().exists())
+
+    def test_applying_twice_does_not_duplicate(self):
+        self.program.apply(self.startups[:1])
+        self.assertEqual(len(self.program.apply(self.startups)), 4)  # only the two new startups
+        self.assertEqual(self.program.apply(self.startups), [])
+        self.assertEqual(Milestone.objects.count(), 6)
+        self.assertEqual(Deliverable.objects.count(), 6)
+
+    def test_command_and_task(self):
+        Milestone.objects.create(startup=self.startups[2], milestone_progress=1)
+        out = StringIO()
+        call_command('apply_program_template', '--program', 'Accelerator', stdout=out)
+        self.assertIn('Applied Accelerator to 2 startup(s): 4 milestone(s) created.', out.getvalue())
+        out = StringIO()
+        call_command('apply_program_template', '--program', 'Accelerator', '--startup', str(self.startups[0].pk),
+                     stdout=out)
+        self.assertIn('to 0 startup(s): 0 milestone(s) created. Skipped 1', out.getvalue())
+        with self.assertRaisesMessage(CommandError, "'Incubator' does not exist"):
+            call_command('apply_program_template', '--program', 'Incubator', stdout=StringIO())
+
+        startup = Startup.objects.create(name='Late', owner=self.admin)
+        for _ in range(2):
+            tasks.apply_program_template(startup_ids=[startup.pk], program_id=self.program.pk)
+        self.assertEqual(startup.milestones.count(), 2)
+        self.assertEqual(Startup.objects.get(pk=startup.pk).total_milestones, 2)
+
+
+class SeedCommandTests(TestCase):
+    SMALL = ['--startups', '3', '--admins', '1', '--members', '2', '--milestones', '2', '--deliverables', '1',
+             '--comments', '1', '--readiness', '1', '--reports', '1', '--distribution', 'fixed', '--seed', '7']
+
+    def seed(self, *extra):
+        out = StringIO()
+        call_command('seed_incubator', *self.SMALL, *extra, stdout=out)
+        return out.getvalue()
+
+    def seeded(self):
+        users = User.objects.filter(email__endswith='@seed.example.com')
+        return users.count(), Startup.objects.filter(owner__in=users).count(), Deliverable.objects.count()
+
+    def test_seeds_requested_volumes_reruns_and_flushes(self):
+        own = User.objects.create(username='real', role='admin')
+        Startup.objects.create(name='Real', owner=own)
+        out = self.seed()
+        self.assertIn('7 users, 3 startups, 6 members, 6 milestones, 6 deliverables, 6 readiness, 6 comments, '
+                      '3 reports', out)
+        self.assertEqual(self.seeded(), (7, 3, 6))
+        self.assertFalse(Startup.drifted_milestone_counters().exists())
+
+        # Same seed again: new rows under a new tag instead of clashing usernames
+        self.seed()
+        self.assertEqual(self.seeded(), (14, 6, 12))
+
+        self.assertIn('Flushed', self.seed('--flush'))
+        self.assertEqual(self.seeded(), (7, 3, 6))
+        self.seed('--flush', '--startups', '0')
+        self.assertEqual(self.seeded(), (1, 0, 0))  # just the admin
+        self.assertEqual(list(Startup.objects.values_list('name', flat=True)), ['Real'])
+        self.assertTrue(User.objects.filter(username='real').exists())
+
+
+class DashboardQueryCountTests(TestCase):
+    """Dashboards must cost a fixed number of queries regardless of portfolio size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.super_admin = User.objects.create_user('root', password='pw', role='super_admin')
+        cls.admin = User.objects.create_user('admin', password='pw', role='admin')
+        cls.incubatee = User.objects.create_user('member', password='pw', role='incubatee')
+
+    def add_startups(self, count):
+        for i in range(count):
+            startup = Startup.objects.create(name=f'Startup {i}', owner=self.admin)
+            StartupMember.objects.create(startup=startup, user=self.incubatee)
+            Milestone.objects.create(startup=startup, milestone_progress=1, status='completed')
+            Milestone.objects.create(startup=startup, milestone_progress=2)
+            ProgressReport.objects.create(
+                startup=startup, submitted_by=self.incubatee, title='Update', description='Update'
+            )
+
+    def assert_dashboard_queries(self, user, expected):
+        self.client.force_login(user)
+        with self.assertNumQueries(expected):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    def assert_constant_queries(self, user, expected):
+        self.add_startups(1)
+        self.assert_dashboard_queries(user, expected)
+        self.add_startups(15)
+        self.assert_dashboard_queries(user, expected)
+
+    def test_super_admin_dashboard(self):
+        self.assert_constant_queries(self.super_admin, 6)
+
+    def test_admin_dashboard(self):
+        self.assert_constant_queries(self.admin, 4)
+
+    def test_incubatee_dashboard(self):
+        self.assert_constant_queries(self.incubatee, 3)
+
+    def test_dashboard_shows_stored_progress(self):
+        self.add_startups(1)
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('dashboard'))
+        startup = response.context['startups'][0]
+        self.assertEqual(startup.total_milestones, 2)
+        self.assertEqual(startup.progress, 50)
+        self.assertEqual(startup.report_count, 1)
+
+
+class MilestoneTimelineTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user('owner', password='pw', role='admin')
+        self.startup = Startup.objects.create(name='Timeline', owner=owner)
+        statuses = ['completed', 'pending', 'pending', 'completed', 'not-yet']
+        for number, status in enumerate(statuses, start=1):
+            Milestone.objects.create(startup=self.startup, milestone_progress=number, status=status)
+
+    def test_resolve_timeline_matches_is_locked(self):
+        milestones = list(self.startup.milestones.order_by('milestone_progress'))
+        with self.assertNumQueries(0):
+            current = Milestone.resolve_timeline(milestones)
+        self.assertEqual(current.milestone_progress, 2)
+        for milestone in milestones:
+            self.assertEqual(milestone.locked, milestone.is_locked())
+
+    def test_view_startup_query_count_independent_of_chain_length(self):
+        self.client.force_login(self.startup.owner)
+        url = reverse('view_startup', args=[self.startup.id])
+        with self.assertNumQueries(7):
+            self.client.get(url)
+        for number in range(6, 20):
+            Milestone.objects.create(startup=self.startup, milestone_progress=number)
+        with self.assertNumQueries(7):
+            self.client.get(url)
+
+
+@override_settings(QUERY_PROFILING_SAMPLE_RATE=1.0)
+class QueryProfilingMiddlewareTests(TestCase):
+    def test_server_timing_reports_duplicated_queries(self):
+        owner = User.objects.create_user('owner', password='pw', role='admin', is_staff=True)
+        startup = Startup.objects.create(name='Profiled', owner=owner)
+        for number in range(3):
+            StartupMember.objects.create(
+                startup=startup, user=User.objects.create_user(f'member{number}', password='pw')
+            )
+        self.client.force_login(owner)
+        with self.assertLogs('incubator.profiling', level='WARNING') as logs:
+            response = self.client.get(reverse('edit_startup', args=[startup.id]))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('dupes;desc=', response['Server-Timing'])
+        self.assertIn('"duplicated": 2', logs.output[0])  # request.user + startup.owner
+
+        response = self.client.get(reverse('add_member', args=[startup.id]))
+        self.assertIn('"4 queries"', response['Server-Timing'])  # session, user, startup, members with their users
+        self.assertNotIn('dupes;desc=', response['Server-Timing'])
+
+    def test_server_timing_is_only_sent_to_staff(self):
+        self.client.force_login(User.objects.create_user('member', password='pw', role='incubatee'))
+        with self.assertLogs('incubator.profiling', level='INFO'):
+            response = self.client.get(reverse('dashboard'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(QUERY_PROFILING_SAMPLE_RATE=None)
+    def test_outside_debug_nothing_is_sampled_by_default(self):
+        with self.assertNoLogs('incubator.profiling'):
+            self.client.get(reverse('login'))
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class QueryPlanTests(TestCase):
+    """Hot querysets must be answered from an index, never a full table scan or sort"""
+
+    FULL_SCAN = re.compile(r'\bSCAN (\w+)$')
+    TEMP_SORT = re.compile(r'USE TEMP B-TREE FOR ORDER BY')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', email='owner@example.com', password='pw', role='admin')
+        cls.startup = Startup.objects.create(name='Planned', owner=cls.owner)
+        cls.milestone = Milestone.objects.create(startup=cls.startup, milestone_progress=1)
+        Deliverable.objects.create(milestone=cls.milestone, name='Deck')
+        ProgressReport.objects.create(startup=cls.startup, submitted_by=cls.owner, title='t', description='d')
+
+    def assert_indexed(self, queryset):
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            self.assertIsNone(self.FULL_SCAN.search(line.strip()), f'Full table scan:\n{plan}\n{queryset.query}')
+            self.assertIsNone(self.TEMP_SORT.search(line), f'Unindexed sort:\n{plan}\n{queryset.query}')
+
+    def test_login_email_lookup(self):
+        self.assert_indexed(User.objects.filter(email='owner@example.com'))
+
+    def test_users_by_role(self):
+        self.assert_indexed(User.objects.filter(role='admin'))
+
+    def test_previous_milestone_lookup(self):
+        self.assert_indexed(
+            Milestone.objects.filter(startup_id=self.startup.id, milestone_progress=1).values_list('status')
+        )
+
+    def test_latest_milestone_for_add_milestone(self):
+        self.assert_indexed(self.startup.milestones.order_by('-milestone_progress')[:1])
+
+    def test_timeline_milestones(self):
+        self.assert_indexed(self.startup.milestones.order_by('milestone_progress', 'id'))
+
+    def test_milestones_by_status(self):
+        self.assert_indexed(Milestone.objects.filter(status='completed'))
+
+    def test_recent_reports(self):
+        self.assert_indexed(ProgressReport.objects.order_by('-submitted_at')[:10])
+
+    def test_startup_reports(self):
+        self.assert_indexed(self.startup.progress_reports.order_by('-submitted_at'))
+
+    def test_milestone_deliverables(self):
+        self.assert_indexed(self.milestone.deliverables.order_by('id'))
+
+    def test_startup_keyset_page(self):
+        startups, _, _ = paginate_startups(Startup.objects.all(), {}, page_size=1)
+        after = startups[0]
+        self.assert_indexed(
+            Startup.objects.filter(
+                Q(created_at__gt=after.created_at) | Q(created_at=after.created_at, pk__gt=after.pk)
+            ).order_by('created_at', 'id')[:25]
+        )
+
+
+@override_settings(DASHBOARD_PAGE_SIZE=2)
+class StartupPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='pw', role='admin')
+        for i in range(7):
+            Startup.objects.create(name=f'Startup {i}', owner=cls.admin, stage='scaling' if i % 2 else 'ideation')
+
+    def walk(self, **filters):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('dashboard'), filters)
+        ids = [startup.id for startup in response.context['startups']]
+        cursor = response.context['next_cursor']
+        while cursor:
+            page = self.client.get(reverse('startup_page'), {'cursor': cursor}).json()
+            ids += page['ids']
+            cursor = page['next_cursor']
+        names = dict(Startup.objects.values_list('id', 'name'))
+        return [names[startup_id] for startup_id in ids]
+
+    def test_walks_every_startup_once_in_order(self):
+        self.assertEqual(self.walk(), [f'Startup {i}' for i in range(7)])
+
+    def test_filters_carry_through_cursor(self):
+        self.assertEqual(self.walk(stage='scaling'), ['Startup 1', 'Startup 3', 'Startup 5'])
+
+    def test_rejects_tampered_cursor(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('startup_page'), {'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+
+
+class StartupCardCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='pw', role='admin')
+        cls.startup = Startup.objects.create(name='Cached', owner=cls.admin)
+
+    def version(self):
+        return Startup.objects.values_list('card_version', flat=True).get(pk=self.startup.pk)
+
+    def assert_bumps(self, action):
+        before = self.version()
+        action()
+        self.assertNotEqual(self.version(), before)
+
+    def test_related_writes_bump_card_version(self):
+        milestone = Milestone.objects.create(startup=self.startup, milestone_progress=1)
+        self.assert_bumps(lambda: Milestone.objects.create(startup=self.startup, milestone_progress=2))
+        self.assert_bumps(lambda: Deliverable.objects.create(milestone=milestone, name='Deck'))
+        self.assert_bumps(lambda: StartupMember.objects.create(startup=self.startup, user=self.admin))
+        self.assert_bumps(lambda: ProgressReport.objects.create(
+            startup=self.startup, submitted_by=self.admin, title='t', description='d'))
+        self.assert_bumps(lambda: Startup.objects.get(pk=self.startup.pk).save())
+
+    def test_startup_save_bumps_in_the_same_update(self):
+        startup = Startup.objects.get(pk=self.startup.pk)
+        before = startup.card_version
+        with self.assertNumQueries(1):
+            startup.save(update_fields=['name'])
+        self.assertNotEqual(self.version(), before)
+        self.assertEqual(self.version(), startup.card_version)
+
+    def test_card_is_rerendered_after_change(self):
+        self.client.force_login(self.admin)
+        self.assertContains(self.client.get(reverse('dashboard')), '0 Total')
+        Milestone.objects.create(startup=self.startup, milestone_progress=1)
+        self.assertContains(self.client.get(reverse('dashboard')), '1 Total')
+
+
+@override_settings(LOGIN_THROTTLE={'IP_LIMIT': 10, 'ACCOUNT_LIMIT': 3, 'WINDOW': 60})
+class LoginTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('doe.john', email='john@example.com', password='secret')
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, username, password):
+        return self.client.post(reverse('login'), {'username': username, 'password': password})
+
+    def test_email_login_hashes_password_once(self):
+        with mock.patch('django.contrib.auth.base_user.check_password', wraps=hashers.check_password) as check:
+            response = self.login('john@example.com', 'secret')
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual(check.call_count, 1)
+
+    def test_unknown_account_hashes_once(self):
+        with mock.patch('django.contrib.auth.base_user.make_password', wraps=hashers.make_password) as make:
+            with mock.patch('django.contrib.auth.base_user.check_password') as check:
+                self.login('ghost@example.com', 'secret')
+        self.assertEqual(make.call_count + check.call_count, 1)
+
+    def test_account_throttled_after_repeated_failures(self):
+        for _ in range(3):
+            self.assertEqual(self.login('john@example.com', 'wrong').status_code, 200)
+        with mock.patch('django.contrib.auth.base_user.check_password') as check:
+            response = self.login('john@example.com', 'secret')
+        self.assertEqual(response.status_code, 429)
+        check.assert_not_called()
+
+    def test_username_and_email_share_the_account_limit(self):
+        for login in ('john@example.com', 'Doe.John', 'doe.john'):
+            self.assertEqual(self.login(login, 'wrong').status_code, 200)
+        self.assertEqual(self.login('DOE.JOHN ', 'secret').status_code, 429)
+        self.assertEqual(self.login('john@example.com', 'secret').status_code, 429)
+
+    def test_ip_throttled_across_accounts(self):
+        for number in range(10):
+            self.login(f'nobody{number}', 'wrong')
+        self.assertEqual(self.login('doe.john', 'secret').status_code, 429)
+
+
+class UsernameAllocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for username in ['doe.john', 'doe.john1', 'doe.john2', 'doe.john4', 'doe.johnny', 'doe.jane']:
+            User.objects.create(username=username)
+
+    def test_single_query_fills_first_gap(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(allocate_usernames(['doe.john']), ['doe.john3'])
+
+    def test_bulk_allocation_keeps_repeats_distinct(self):
+        with self.assertNumQueries(1):
+            usernames = allocate_usernames(['doe.john', 'doe.john', 'doe.jane', 'roe.rick'])
+        self.assertEqual(usernames, ['doe.john3', 'doe.john5', 'doe.jane1', 'roe.rick'])
+
+    def test_retries_when_a_concurrent_request_takes_the_name(self):
+        real_allocate = allocate_usernames
+        calls = []
+
+        def racing_allocate(bases):
+            calls.append(bases)
+            if len(calls) == 1:
+                User.objects.create(username='doe.john3')  # claimed by someone else meanwhile
+                return ['doe.john3']
+            return real_allocate(bases)
+
+        with mock.patch('incubator.accounts.allocate_usernames', side_effect=racing_allocate):
+            user = create_user_with_unique_username('doe.john', password='pw')
+        self.assertEqual(user.username, 'doe.john5')
+        self.assertEqual(len(calls), 2)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class PasswordHashingTests(TestCase):
+    def test_hashing_is_inline_unless_the_pool_is_enabled(self):
+        start_pool = mock.patch('incubator.hashing.ProcessPoolExecutor')
+        with override_settings(PASSWORD_HASH_POOL=False, PASSWORD_HASH_POOL_MIN=1), start_pool as pool:
+            encoded = hash_passwords(['a', 'b'], workers=2)
+        pool.assert_not_called()
+        self.assertTrue(hashers.check_password('b', encoded[1]))
+
+    def test_pool_hashes_match_make_password(self):
+        with override_settings(PASSWORD_HASH_POOL=True, PASSWORD_HASH_POOL_MIN=1):
+            encoded = hash_passwords(['a', 'b', 'a'], workers=2)
+        self.assertTrue(hashers.check_password('a', encoded[0]))
+        self.assertTrue(hashers.check_password('b', encoded[1]))
+        self.assertNotEqual(encoded[0], encoded[2])  # salted independently
+
+    def test_batches_reuse_one_pool(self):
+        start_pool = mock.patch('incubator.hashing.ProcessPoolExecutor', wraps=hashing.ProcessPoolExecutor)
+        with override_settings(PASSWORD_HASH_POOL=True, PASSWORD_HASH_POOL_MIN=1), start_pool as pool:
+            for batch in (['a', 'b'], ['c', 'd'], ['e', 'f']):
+                hash_passwords(batch, workers=3)  # a size no other test uses, so the pool starts here
+        self.assertEqual(pool.call_count, 1)
+        self.assertNotEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'fork')
+
+    def test_bulk_create_users_inserts_hashed_accounts(self):
+        users = [User(username=f'bulk{i}') for i in range(3)]
+        with self.assertNumQueries(1):
+            bulk_create_users(users, ['pw'] * 3)
+        self.assertTrue(User.objects.get(username='bulk2').check_password('pw'))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class MemberImportTests(TestCase):
+    CSV = (
+        "Startup,First Name,Last Name,Position,Email,Contact Number\n"
+        "Acme,John,Doe,CEO,john@example.com,0917\n"
+        "Acme,John,Doe,CTO,john2@example.com,0918\n"
+        "Nowhere,Jane,Roe,CFO,jane@example.com,0919\n"
+        "Acme,Bad,Email,COO,not-an-email,0920\n"
+        "\n"
+        "{pk},Ann,Lee,Designer,ann@example.com,0921\n"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.startup = Startup.objects.create(name='Acme', owner=cls.admin)
+        User.objects.create(username='doe.john')
+
+    def rows(self, text=None):
+        content = (text or self.CSV.format(pk=self.startup.pk)).encode()
+        return read_member_rows(SimpleUploadedFile('members.csv', content), 'members.csv')
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        result = MemberImporter(chunk_size=3).run(self.rows())
+        self.assertEqual(result.created, 3)
+        self.assertEqual([row for row, _ in result.errors], [4, 5])
+        self.assertIn('Nowhere', result.errors[0][1])
+        self.assertIn('email', result.errors[1][1])
+        self.assertEqual(
+            sorted(self.startup.members.values_list('username', 'startupmember__role')),
+            [('doe.john1', 'CEO'), ('doe.john2', 'CTO'), ('lee.ann', 'Designer')],
+        )
+
+    def test_missing_columns_reject_the_file(self):
+        with self.assertRaisesMessage(ImportFileError, 'contact_number'):
+            list(self.rows("startup,first_name,last_name,position,email\n"))
+
+    def test_view_renders_row_errors(self):
+        self.client.force_login(self.admin)
+        upload = SimpleUploadedFile('members.csv', self.CSV.format(pk=self.startup.pk).encode())
+        response = self.client.post(reverse('import_members'), {'file': upload})
+        self.assertContains(response, 'Unknown startup')
+        self.assertEqual(self.startup.members.count(), 3)
+
+    def test_non_utf8_csv_is_a_file_error(self):
+        content = "Startup,First Name,Last Name,Position,Email,Contact Number\nAcme,José,Doe,CEO,j@example.com,0917\n"
+        rows = read_member_rows(io.BytesIO(content.encode('cp1252')), 'members.csv')
+        with self.assertRaisesMessage(ImportFileError, 'CSV UTF-8'):
+            MemberImporter().run(rows)
+
+    def test_corrupt_workbook_is_a_file_error(self):
+        with self.assertRaisesMessage(ImportFileError, 'not a valid Excel workbook'):
+            list(read_member_rows(io.BytesIO(b'Startup,First Name\nAcme,John\n'), 'members.xlsx'))
+
+    @unittest.skipUnless(importlib.util.find_spec('openpyxl'), 'openpyxl is not installed')
+    def test_zip_without_a_workbook_is_a_file_error(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('notes.txt', 'not a workbook')
+        archive.seek(0)
+        with self.assertRaisesMessage(ImportFileError, 'not a valid Excel workbook'):
+            list(read_member_rows(archive, 'members.xlsx'))
+
+    def test_view_reports_unreadable_files_on_the_form(self):
+        self.client.force_login(self.admin)
+        for name, content in [('members.csv', 'Startup,Nom\nAcme,Zoë\n'.encode('latin-1')), ('members.xlsx', b'garbage')]:
+            with self.subTest(name=name):
+                response = self.client.post(reverse('import_members'), {'file': SimpleUploadedFile(name, content)})
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context['form'].errors['file'])
+
+
+class ChunkedUploadTests(TestCase):
+    DATA = b'0123456789' * 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.member = User.objects.create(username='member', role='incubatee')
+        startup = Startup.objects.create(name='Acme', owner=cls.admin)
+        StartupMember.objects.create(startup=startup, user=cls.member)
+        milestone = Milestone.objects.create(startup=startup, title='M1', milestone_progress=1)
+        cls.deliverable = Deliverable.objects.create(milestone=milestone, name='Pitch deck')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root, CHUNKED_UPLOAD_CHUNK_SIZE=40)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client.force_login(self.member)
+
+    def start(self, field='upload_file'):
+        return self.client.post(reverse('start_upload', args=[self.deliverable.id]), {
+            'field': field, 'filename': 'deck.pdf', 'size': len(self.DATA),
+        })
+
+    def put(self, url, offset, data, checksum=None):
+        return self.client.put(url, data, content_type='application/octet-stream', headers={
+            'Upload-Offset': str(offset), 'Upload-Checksum': f'sha256 {checksum or hashlib.sha256(data).hexdigest()}',
+        })
+
+    def test_chunks_resume_and_finalize(self):
+        state = self.start().json()
+        self.assertEqual((state['offset'], state['chunk_size']), (0, 40))
+        self.assertEqual(self.put(state['url'], 0, self.DATA[:40]).json()['offset'], 40)
+
+        # A client that lost track is told where to resume
+        stale = self.put(state['url'], 0, self.DATA[:40])
+        self.assertEqual((stale.status_code, stale.json()['offset']), (409, 40))
+        self.assertEqual(self.start().json()['id'], state['id'])
+        self.assertEqual(self.put(state['url'], 40, self.DATA[:41]).status_code, 413)
+
+        self.put(state['url'], 40, self.DATA[40:80])
+        self.put(state['url'], 80, self.DATA[80:])
+        progress = self.client.get(state['url']).json()
+        self.assertEqual((progress['offset'], progress['percent']), (100, 100.0))
+
+        with mock.patch('incubator.storage.hash_file') as rehash:
+            response = self.client.post(state['complete_url'], {'sha256': hashlib.sha256(self.DATA).hexdigest()})
+        self.assertEqual(response.status_code, 200)
+        rehash.assert_not_called()  # storage reuses the digest verified on finalize
+        self.deliverable.refresh_from_db()
+        with self.deliverable.upload_file.open('rb') as fileobj:
+            self.assertEqual(fileobj.read(), self.DATA)
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_checksum_mismatch_resets_the_upload(self):
+        state = self.start().json()
+        for offset in range(0, len(self.DATA), 40):
+            self.put(state['url'], offset, self.DATA[offset:offset + 40])
+        response = self.client.post(state['complete_url'], {'sha256': '0' * 64})
+        self.assertEqual((response.status_code, response.json()['offset']), (422, 0))
+        self.deliverable.refresh_from_db()
+        self.assertFalse(self.deliverable.upload_file)
+
+    def test_each_chunk_is_verified_so_complete_needs_no_digest(self):
+        state = self.start().json()
+        damaged = self.put(state['url'], 0, self.DATA[:40], checksum=hashlib.sha256(b'other').hexdigest())
+        self.assertEqual((damaged.status_code, damaged.json()['offset']), (422, 0))
+        self.assertEqual(uploads.part_path(ChunkedUpload.objects.get()).stat().st_size, 0)
+        missing = self.client.put(state['url'], self.DATA[:40], content_type='application/octet-stream',
+                                  headers={'Upload-Offset': '0'})
+        self.assertEqual(missing.status_code, 400)
+
+        for offset in range(0, len(self.DATA), 40):
+            self.assertEqual(self.put(state['url'], offset, self.DATA[offset:offset + 40]).status_code, 200)
+        self.assertEqual(self.client.post(state['complete_url']).status_code, 200)
+        self.deliverable.refresh_from_db()
+        with self.deliverable.upload_file.open('rb') as fileobj:
+            self.assertEqual(fileobj.read(), self.DATA)
+
+    def test_purge_removes_staged_files_no_job_is_waiting_for(self):
+        directory = uploads.partial_dir()
+        directory.mkdir(parents=True)
+        orphan, pending = directory / 'orphan.staged', directory / 'pending.staged'
+        for path in (orphan, pending):
+            path.write_bytes(self.DATA)
+            os.utime(path, (time.time() - 2 * 86400,) * 2)
+        tasks.attach_deliverable_file.enqueue(
+            deliverable_id=self.deliverable.pk, field='upload_file', staged_path=str(pending), filename='deck.pdf',
+        )
+        call_command('purge_chunked_uploads', stdout=StringIO())
+        self.assertFalse(orphan.exists())
+        self.assertTrue(pending.exists())
+
+    def test_incubatees_cannot_upload_admin_files(self):
+        self.assertEqual(self.start(field='admin_file').status_code, 403)
+        other = User.objects.create(username='other', role='incubatee')
+        state = self.start().json()
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(state['url']).status_code, 404)
+
+
+class ContentAddressedStorageTests(TestCase):
+    DATA = b'%PDF-1.4 template'
+
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create(username='admin', role='admin')
+        milestone = Milestone.objects.create(startup=Startup.objects.create(name='Acme', owner=admin), title='M1')
+        cls.first = Deliverable.objects.create(milestone=milestone, name='One')
+        cls.second = Deliverable.objects.create(milestone=milestone, name='Two')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_identical_files_share_one_referenced_blob(self):
+        for deliverable, filename in [(self.first, 'a.pdf'), (self.second, 'b.PDF')]:
+            with self.captureOnCommitCallbacks(execute=True):
+                deliverable.admin_file.save(filename, ContentFile(self.DATA))
+        name = self.first.admin_file.name
+        self.assertEqual(name, f'cas/{name[4:6]}/{name[7:9]}/{hashlib.sha256(self.DATA).hexdigest()}.pdf')
+        self.assertEqual(self.second.admin_file.name, name)
+        self.assertEqual(StoredBlob.objects.get().refcount, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.second.admin_file.save('c.pdf', ContentFile(b'other'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.delete()
+        self.assertEqual(StoredBlob.objects.get(pk=name).refcount, 0)
+
+        StoredBlob.objects.filter(pk=name).update(updated_at=timezone.now() - timedelta(days=2))
+        call_command('collect_media_blobs', stdout=StringIO())
+        self.assertFalse(default_storage.exists(name))
+        self.assertTrue(default_storage.exists(self.second.admin_file.name))
+
+    def test_purge_spares_a_blob_referenced_again(self):
+        name = default_storage.save('a.pdf', ContentFile(self.DATA))
+        default_storage.delete(name)
+        # The collector picked the blob while it was unreferenced, then a save of the same bytes lands
+        self.assertEqual(default_storage.save('b.pdf', ContentFile(self.DATA)), name)
+        self.assertFalse(default_storage.purge(name))
+        self.assertTrue(default_storage.exists(name))
+
+        default_storage.delete(name)
+        self.assertTrue(default_storage.purge(name))
+        self.assertFalse(StoredBlob.objects.filter(pk=name).exists())
+        self.assertEqual(default_storage.save('c.pdf', ContentFile(self.DATA)), name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(StoredBlob.objects.get(pk=name).refcount, 1)
+
+    def test_convert_moves_legacy_files_into_blobs(self):
+        for deliverable in [self.first, self.second]:
+            legacy = f'deliverable_admins/{deliverable.name}.pdf'
+            path = default_storage.path(legacy)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as fileobj:
+                fileobj.write(self.DATA)
+            Deliverable.objects.filter(pk=deliverable.pk).update(admin_file=legacy)
+
+        call_command('convert_media_storage', stdout=StringIO(), stderr=StringIO())
+        names = set(Deliverable.objects.values_list('admin_file', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(default_storage.exists(name))
+        self.assertFalse(default_storage.exists('deliverable_admins/One.pdf'))
+        self.assertEqual(StoredBlob.objects.get(pk=name).refcount, 2)
+
+
+class DeliverableDownloadTests(TestCase):
+    DATA = b'0123456789abcdef'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.member = User.objects.create(username='member', role='incubatee')
+        cls.outsider = User.objects.create(username='outsider', role='incubatee')
+        startup = Startup.objects.create(name='Acme', owner=cls.admin)
+        StartupMember.objects.create(startup=startup, user=cls.member)
+        cls.deliverable = Deliverable.objects.create(
+            milestone=Milestone.objects.create(startup=startup, title='M1'), name='Pitch Deck',
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.deliverable.upload_file.save('deck.pdf', ContentFile(self.DATA))
+        self.url = reverse('download_deliverable_file', args=[self.deliverable.id, 'upload_file'])
+        self.client.force_login(self.member)
+
+    def test_only_members_and_admins_can_download(self):
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(b''.join(response.streaming_content), self.DATA)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn("filename*=UTF-8''pitch-deck.pdf", response['Content-Disposition'])
+
+    def test_range_and_etag(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=4-7'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 4-7/16')
+        self.assertEqual(b''.join(response.streaming_content), b'4567')
+        self.assertEqual(b''.join(self.client.get(self.url, headers={'Range': 'bytes=-3'}).streaming_content), b'def')
+        self.assertEqual(self.client.get(self.url, headers={'Range': 'bytes=99-'}).status_code, 416)
+
+        etag = response['ETag']
+        self.assertEqual(etag, f'"{hashlib.sha256(self.DATA).hexdigest()}"')
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+        stale = self.client.get(self.url, headers={'Range': 'bytes=4-7', 'If-Range': '"old"'})
+        self.assertEqual(stale.status_code, 200)
+
+    def test_download_all_streams_zip_with_manifest(self):
+        missing = Deliverable.objects.create(milestone=self.deliverable.milestone, name='Budget')
+        missing.upload_file.name = 'deliverables/gone.xlsx'
+        missing.save()
+        milestone = self.deliverable.milestone
+        url = reverse('download_milestone_deliverables', args=[milestone.startup_id, milestone.id])
+        response = self.client.get(url, {'manifest': '1'})
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        deck = f'{milestone.startup_id}-acme/00-{milestone.id}-m1/{self.deliverable.id}-pitch-deck.pdf'
+        self.assertEqual(archive.namelist(), ['manifest.csv', deck])
+        self.assertEqual(archive.read(deck), self.DATA)
+        rows = list(csv.reader(io.StringIO(archive.read('manifest.csv').decode())))
+        self.assertEqual([row[2] for row in rows[1:]], ['Pitch Deck', 'Budget'])
+        self.assertEqual([row[6] for row in rows[1:]], [deck, ''])
+
+    def test_untitled_milestone_archive_is_named_by_number(self):
+        milestone = Milestone.objects.create(startup=self.deliverable.milestone.startup, milestone_progress=3)
+        Deliverable.objects.create(milestone=milestone, name='Deck').upload_file.save('deck.pdf', ContentFile(self.DATA))
+        response = self.client.get(reverse('download_milestone_deliverables', args=[milestone.startup_id, milestone.id]))
+        self.assertIn('acme-milestone-3-deliverables.zip', response['Content-Disposition'])
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertTrue(archive.namelist()[0].split('/')[1].endswith(f'03-{milestone.id}-milestone'))
+
+    def test_cohort_download_is_for_admins(self):
+        cohort = cohort_label(self.deliverable.milestone.startup.created_at)
+        url = reverse('download_cohort_deliverables', args=[cohort])
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse('download_cohort_deliverables', args=['spring'])).status_code, 400)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(self.client.get(url).streaming_content)))
+        self.assertEqual(len(archive.namelist()), 1)
+
+    def test_debug_media_route_serves_logos_but_not_deliverables(self):
+        startup = self.deliverable.milestone.startup
+        startup.logo.save('logo.png', ContentFile(b'logo'))
+        variant = startup.logo.storage.save('variant.jpg', ContentFile(b'variant'))
+        startup.logo_variants = {'source': startup.logo.name, 'jpeg': [[64, 32, variant]]}
+        startup.save()
+
+        def get(name):
+            request = RequestFactory().get(f'/media/{name}')
+            return serve_public_media(request, name, document_root=startup.logo.storage.location)
+
+        self.assertEqual(b''.join(get(startup.logo.name).streaming_content), b'logo')
+        self.assertEqual(b''.join(get(variant).streaming_content), b'variant')
+        with self.assertRaises(Http404):
+            get(self.deliverable.upload_file.name)
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect')
+    def test_front_server_handoff(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.deliverable.upload_file.name)
+        self.assertEqual(response.content, b'')
+
+
+class LogoVariantTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.admin = User.objects.create(username='admin', role='admin')
+
+    def logo(self, size=(300, 150), mode='RGBA'):
+        buffer = io.BytesIO()
+        image = Image.new(mode, size, (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30))
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera Maker'
+        image.save(buffer, format='PNG', exif=exif)
+        return SimpleUploadedFile('logo.png', buffer.getvalue(), content_type='image/png')
+
+    def test_save_queues_a_variant_job(self):
+        startup = Startup.objects.create(name='Acme', owner=self.admin, logo=self.logo())
+        job = Job.objects.get()
+        self.assertEqual((job.task, job.kwargs), ('incubator.tasks.build_logo_variants', {'startup_id': startup.pk}))
+
+    def test_variants_are_resized_stripped_and_rendered(self):
+        with mock.patch('incubator.logos.schedule_logo_variants'):
+            startup = Startup.objects.create(name='Acme', owner=self.admin, logo=self.logo())
+        call_command('generate_logo_variants', stdout=StringIO())
+        startup.refresh_from_db()
+        self.assertEqual([(width, height) for width, height, _ in startup.logo_variants['webp']],
+                         [(64, 32), (128, 64), (256, 128)])
+        with startup.logo.storage.open(startup.logo_variants['jpeg'][0][2]) as fileobj, Image.open(fileobj) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (64, 32)))
+            self.assertFalse(image.getexif())
+
+        html = render_to_string('startups/_logo.html', {'startup': startup, 'size': 48})
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('loading="lazy"', html)
+        self.assertIn(' 256w', html)
+        self.assertIn('width="48" height="24"', html)  # the 2:1 logo is not squashed into 48x48
+
+        # Variants recorded without heights are rebuilt; until then only the width is rendered
+        startup.logo_variants = {**startup.logo_variants, 'jpeg': [[w, n] for w, _, n in startup.logo_variants['jpeg']]}
+        self.assertTrue(logos.needs_variants(startup))
+        self.assertNotIn('height=', render_to_string('startups/_logo.html', {'startup': startup, 'size': 48}))
+
+        # A new logo makes the old variants stale until they are rebuilt
+        with mock.patch('incubator.logos.schedule_logo_variants') as schedule:
+            startup.logo = self.logo(size=(40, 40), mode='RGB')
+            startup.save()
+        schedule.assert_called_once()
+        self.assertNotIn('srcset', render_to_string('startups/_logo.html', {'startup': startup, 'size': 48}))
+
+
+class JobQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+
+    def test_claims_by_priority_and_skips_scheduled_jobs(self):
+        low = tasks.delete_startup.enqueue(startup_id=0, priority=-1)
+        high = tasks.delete_startup.enqueue(startup_id=0, priority=5)
+        tasks.delete_startup.enqueue(startup_id=0, delay=3600)
+        worker = Worker(name='w1')
+        self.assertEqual(worker.claim().pk, high.pk)
+        self.assertEqual(worker.claim().pk, low.pk)
+        self.assertIsNone(worker.claim())
+        self.assertEqual(Job.objects.get(pk=high.pk).locked_by, 'w1')
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        job = tasks.attach_deliverable_file.enqueue(
+            deliverable_id=0, field='upload_file', staged_path='/nonexistent', filename='x',
+        )
+        Job.objects.filter(pk=job.pk).update(task='incubator.tasks.missing_task', max_attempts=2)
+        worker = Worker()
+        worker.execute(worker.claim())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('missing_task', job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        worker.execute(worker.claim())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertLess(retry_delay(10, 1), retry_delay(10, 4))
+
+    @override_settings(JOB_QUEUE_EAGER=True)
+    def test_eager_mode_finishes_work_without_a_worker(self):
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('add_startup'), {'name': 'Eager', 'email': 'e@example.com', 'contact_number': '0'})
+        startup = Startup.objects.get(name='Eager')
+        self.assertEqual(startup.milestones.count(), ProgramTemplate.get_default().milestones.count())
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOB_QUEUE_EAGER=True)
+    def test_eager_mode_leaves_scheduled_jobs_to_a_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            later = tasks.delete_startup.enqueue(startup_id=0, delay=3600)
+            now = tasks.delete_startup.enqueue(startup_id=0)
+        self.assertEqual(Job.objects.get(pk=later.pk).status, 'queued')
+        self.assertFalse(Job.objects.filter(pk=now.pk).exists())
+
+    def test_attach_job_that_gives_up_removes_its_staged_file(self):
+        staged = tempfile.NamedTemporaryFile(suffix='.staged', delete=False)
+        staged.close()
+        self.addCleanup(lambda: os.path.exists(staged.name) and os.unlink(staged.name))
+        startup = Startup.objects.create(name='Acme', owner=self.admin)
+        deliverable = Deliverable.objects.create(milestone=Milestone.objects.create(startup=startup), name='Deck')
+        job = tasks.attach_deliverable_file.enqueue(
+            deliverable_id=deliverable.pk, field='no_such_field', staged_path=staged.name, filename='x.pdf',
+        )
+        Job.objects.filter(pk=job.pk).update(max_attempts=1)
+        worker = Worker()
+        worker.execute(worker.claim())
+        self.assertEqual(Job.objects.get(pk=job.pk).status, 'failed')
+        self.assertFalse(os.path.exists(staged.name))
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = tasks.delete_startup.enqueue(startup_id=0)
+        Worker().claim()
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(Worker().requeue_stale(), 1)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, 'queued')
+
+    def test_views_hand_work_to_the_worker(self):
+        self.client.force_login(self.admin)
+        self.client.post(reverse('add_startup'), {'name': 'Queued', 'email': 'q@example.com', 'contact_number': '0'})
+        startup = Startup.objects.get(name='Queued')
+        self.assertEqual(startup.milestones.count(), 0)
+        call_command('run_worker', '--burst', stdout=StringIO())
+        self.assertEqual(startup.milestones.count(), ProgramTemplate.get_default().milestones.count())
+
+        self.client.post(reverse('delete_startup', args=[startup.id]))
+        self.assertTrue(Startup.objects.filter(pk=startup.pk).exists())
+
+        call_command('run_worker', '--burst', stdout=StringIO())
+        self.assertFalse(Startup.objects.filter(pk=startup.pk).exists())
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(JOB_QUEUE_EAGER=False, JOB_KEEP_COMPLETED=True)
+class ConcurrentWorkerTests(TransactionTestCase):
+    def test_workers_share_the_queue_without_running_a_job_twice(self):
+        jobs = [tasks.delete_startup.enqueue(startup_id=0) for _ in range(60)]
+        # The in-memory test database fails contended writes at once instead of
+        # waiting like a database file does, so the workers get a file copy of it
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'queue.sqlite3')
+        connection.ensure_connection()
+        copy = sqlite3.connect(path)
+        connection.connection.backup(copy)
+        copy.close()
+        processed, errors = {}, []
+
+        def work(name):
+            try:
+                processed[name] = Worker(name=name).run(burst=True, sleep=0.01)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work, args=(f'w{index}',)) for index in range(6)]
+        with mock.patch.dict(connections.settings['default'], NAME=path):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(processed.values()), len(jobs))
+        copy = sqlite3.connect(path)
+        self.addCleanup(copy.close)
+        self.assertEqual(set(copy.execute('SELECT status, attempts FROM incubator_job')), {('done', 1)})
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.member = User.objects.create(username='member', role='incubatee')
+        old = Startup.objects.create(name='Old, Inc.', owner=cls.admin, stage='scaling',
+                                     created_at=timezone.make_aware(timezone.datetime(2024, 2, 1)))
+        new = Startup.objects.create(name='New', owner=cls.admin, created_at=timezone.make_aware(timezone.datetime(2025, 8, 1)))
+        for startup in (old, new):
+            ProgressReport.objects.create(startup=startup, submitted_by=cls.member, title=f'{startup.name} Q3',
+                                          description='ok', submitted_at=startup.created_at)
+
+    def test_csv_and_jsonl_with_filters(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('export_data', args=['startups']), {'stage': 'scaling'})
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['name'] for row in rows], ['Old, Inc.'])
+
+        response = self.client.get(reverse('export_data', args=['reports']), {'format': 'jsonl', 'cohort': '2025-Q3'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['New Q3'])
+
+        response = self.client.get(reverse('export_data', args=['reports']), {'since': '2024-02-01', 'until': '2024-02-01'})
+        self.assertEqual(b''.join(response.streaming_content).decode().count('Q3'), 1)
+        self.assertEqual(self.client.get(reverse('export_data', args=['reports']), {'since': 'May'}).status_code, 400)
+
+    def test_cohort_years_outside_the_calendar_are_rejected(self):
+        self.assertEqual(cohort_range('0001')[0].year, 1)
+        self.assertEqual(cohort_range('9998-Q4')[1].year, 9999)
+        for label in ('0000', '9999', '9999-Q4'):
+            with self.assertRaises(InvalidCohort):
+                cohort_range(label)
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse('export_data', args=['startups']), {'cohort': '9999-Q4'}).status_code, 400)
+        with self.assertRaisesMessage(CommandError, 'Cohort years run from 1 to 9998'):
+            call_command('export_data', 'startups', '--cohort', '0000', stdout=StringIO())
+
+    def test_incubatees_cannot_export_and_command_writes_rows(self):
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get(reverse('export_data', args=['startups'])).status_code, 403)
+        out = StringIO()
+        call_command('export_data', 'milestones', '--format', 'jsonl', '--since', '2000-01-01', stdout=out)
+        self.assertEqual(out.getvalue(), '')
+        call_command('export_data', 'startups', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.solar = Startup.objects.create(name='Sunpower', industry='Solar energy', owner=cls.admin,
+                                           description='Rooftop <b>panels</b> for rural clinics')
+        cls.farm = Startup.objects.create(name='Agrify', industry='Agriculture', owner=cls.admin,
+                                          description='Drip irrigation with solar pumps')
+        ProgressReport.objects.create(startup=cls.farm, submitted_by=cls.admin, title='March update',
+                                      description='Pilot done', challenges='Supplier delays on pumps')
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'FTS5 index is SQLite only')
+    def test_ranked_highlighted_and_kept_in_sync(self):
+        results = search.search('startups', 'solar')
+        self.assertEqual([r['name'] for r in results], ['Sunpower', 'Agrify'])  # industry outweighs description
+        self.assertIn('<mark>Solar</mark>', results[0]['snippet'])
+        self.assertIn('&lt;b&gt;', search.search('startups', 'rooftop')[0]['snippet'])
+        self.assertEqual(search.search('reports', 'supplier del')[0]['startup_name'], 'Agrify')
+        self.assertEqual(search.search('startups', '"unbalanced OR ('), [])
+
+        Startup.objects.filter(pk=self.solar.pk).update(industry='Wind')
+        self.farm.delete()
+        self.assertEqual([r['name'] for r in search.search('startups', 'solar')], [])
+        self.assertEqual(search.search('reports', 'pumps'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(search.search('startups', 'wind')[0]['name'], 'Sunpower')
+
+    def test_search_page(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('search'), {'q': 'pumps'})
+        self.assertContains(response, 'March update')
+        self.assertContains(response, 'Agrify')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'FTS5 index is SQLite only')
+class SearchTriggerTests(TransactionTestCase):
+    def trigger_names(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'incubator_startup'")
+            return {name for name, in cursor.fetchall()}
+
+    def test_migrate_restores_triggers_a_table_rebuild_dropped(self):
+        admin = User.objects.create(username='admin', role='admin')
+        # What SQLite's schema editor does for an AlterField on the table
+        with connection.schema_editor() as editor:
+            editor._remake_table(Startup)
+        self.assertEqual(self.trigger_names(), set())
+        startup = Startup.objects.create(name='Sunpower', industry='Solar', owner=admin)
+
+        call_command('migrate', verbosity=0)
+        self.assertEqual(len(self.trigger_names()), 3)
+        self.assertEqual([r['id'] for r in search.search('startups', 'solar')], [startup.pk])
+        startup.industry = 'Wind'
+        startup.save()
+        self.assertEqual(search.search('startups', 'solar'), [])
+        self.assertEqual([r['id'] for r in search.search('startups', 'wind')], [startup.pk])
+        self.assertEqual(search.ensure_triggers(), [])
+
+
+class DocumentIndexTests(TestCase):
+    CAPSTONE = os.path.join(os.path.dirname(os.path.dirname(__file__)), '_flask_backup', 'static', 'uploads',
+                            'CAPSTONE-TEMPLATE-FULL-4th-Year.docx')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.acme = Startup.objects.create(name='Acme', owner=cls.admin)
+        cls.globex = Startup.objects.create(name='Globex', owner=cls.admin)
+        cls.acme_deliverable = Deliverable.objects.create(
+            milestone=Milestone.objects.create(startup=cls.acme, title='M1'), name='Capstone',
+        )
+        cls.globex_deliverable = Deliverable.objects.create(
+            milestone=Milestone.objects.create(startup=cls.globex, title='M1'), name='Capstone copy',
+        )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(self.settings(MEDIA_ROOT=media_root))
+
+    def attach(self, deliverable, name, data):
+        deliverable.upload_file.save(name, ContentFile(data))
+        call_command('run_worker', '--burst', stdout=StringIO())
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'FTS5 index is SQLite only')
+    def test_uploaded_docx_is_extracted_once_and_searchable_by_startup(self):
+        with open(self.CAPSTONE, 'rb') as fileobj:
+            data = fileobj.read()
+        self.attach(self.acme_deliverable, 'capstone.docx', data)
+        self.attach(self.globex_deliverable, 'copy.docx', data)
+        self.assertEqual(DocumentText.objects.count(), 1)
+        self.assertEqual(DocumentText.objects.get().status, 'ok')
+
+        results = search.search_documents('voting system')
+        self.assertEqual({r['startup_name'] for r in results}, {'Acme', 'Globex'})
+        self.assertIn('<mark>', results[0]['snippet'])
+        results = search.search_documents('voting', startup_id=self.globex.id)
+        self.assertEqual([r['deliverable_id'] for r in results], [self.globex_deliverable.id])
+        self.assertEqual(search.search_documents('voting', milestone_id=self.acme_deliverable.milestone_id)[0]['field'],
+                         'upload_file')
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'FTS5 index is SQLite only')
+    def test_replaced_file_is_reindexed_and_backfill_skips_indexed(self):
+        self.attach(self.acme_deliverable, 'notes.txt', b'Quarterly burn rate and runway')
+        self.attach(self.acme_deliverable, 'notes.txt', b'Hiring plan for engineers')
+        self.assertEqual(search.search_documents('runway'), [])
+        self.assertEqual(len(search.search_documents('hiring')), 1)
+
+        self.acme_deliverable.upload_file = None
+        self.acme_deliverable.save()
+        self.assertEqual(search.search_documents('hiring'), [])
+        DocumentText.objects.update(extracted_at=timezone.now() - timedelta(hours=2))
+        out = StringIO()
+        call_command('index_documents', '--now', stdout=out)
+        self.assertIn('Indexed 0', out.getvalue())
+        self.assertIn('Removed 2 unlinked', out.getvalue())  # both versions of notes.txt
+        self.assertFalse(DocumentText.objects.exists())
+
+    def test_unsupported_files_are_recorded(self):
+        self.attach(self.acme_deliverable, 'logo.png', b'\x89PNG not really')
+        self.assertEqual(DocumentText.objects.get().status, 'unsupported')
+
+    def test_pdfs_read_without_pypdf_are_retried(self):
+        with mock.patch.dict('sys.modules', {'pypdf': None}):
+            self.attach(self.acme_deliverable, 'report.pdf', b'%PDF-1.4 pitch deck')
+            self.assertEqual(DocumentText.objects.get().status, 'failed')
+            DocumentText.objects.update(status='unsupported')  # as recorded before pypdf was a retryable miss
+            out = StringIO()
+            call_command('index_documents', '--retry-failed', '--now', stdout=out)
+            self.assertIn('Forgot 0 failed', out.getvalue())
+            with mock.patch('incubator.documents.has_extractor', return_value=True):  # pypdf installed
+                call_command('index_documents', '--retry-failed', '--now', stdout=out)
+            self.assertIn('Forgot 1 failed', out.getvalue())
+            self.assertIn('Indexed 1', out.getvalue())
+        self.assertEqual(DocumentText.objects.get().status, 'failed')
+
+    @override_settings(DOCUMENT_TEXT_MAX_CHARS=5)
+    def test_text_cut_mid_character_stays_utf8(self):
+        data = 'aéééééééééé'.encode()  # the 20-byte read ends inside an é
+        self.assertEqual(documents.extract_text(io.BytesIO(data), '.txt'), 'aéééé')
+        self.assertEqual(documents.extract_text(io.BytesIO('naïve'.encode('cp1252')), '.txt'), 'naïve')
+
+
+@override_settings(STATUS_ROLLUP_SETTLE=0)
+class StatusTransitionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        cls.startup = Startup.objects.create(name='Acme', owner=cls.admin, stage='validation')
+        cls.milestone = Milestone.objects.create(startup=cls.startup, title='M1', milestone_progress=1, status='pending')
+
+    def test_status_changes_are_logged_and_rolled_up_incrementally(self):
+        self.client.force_login(self.admin)
+        self.client.post(reverse('update_milestone_status', args=[self.startup.id, self.milestone.id]),
+                         {'status': 'completed'})
+        deliverable = Deliverable.objects.create(milestone=self.milestone, name='Deck')
+        deliverable.status = 'approved'
+        deliverable.save()
+        deliverable.save()  # no change, no entry
+
+        entries = StatusTransition.objects.order_by('pk')
+        self.assertEqual([(e.kind, e.from_status, e.to_status, e.stage) for e in entries], [
+            ('milestone', 'pending', 'completed', 'validation'), ('deliverable', 'pending', 'approved', 'validation'),
+        ])
+        self.assertEqual(entries[0].changed_by, self.admin)
+        with self.assertRaises(ValueError):
+            entries[0].save()
+        self.assertEqual(Job.objects.filter(task='incubator.tasks.rollup_status_transitions').count(), 1)
+
+        call_command('rollup_transitions', stdout=StringIO())
+        Milestone.objects.get(pk=self.milestone.pk).save()
+        milestone = Milestone.objects.get(pk=self.milestone.pk)
+        milestone.status = 'pending'
+        milestone.save()
+        milestone.status = 'completed'
+        milestone.save()
+        self.assertEqual(rollups.fold_transitions(), 2)  # only the new rows
+        self.assertEqual(rollups.daily_series(days=1)[0][1], 2)
+        self.assertEqual(rollups.daily_series(days=1, stage='scaling')[0][1], 0)
+        self.assertEqual(rollups.rebuild(), 4)
+
+        response = self.client.get(reverse('transition_trends'), {'days': 7})
+        self.assertEqual(response.json()['counts'][-1], 2)
+        self.assertEqual(len(response.json()['days']), 7)
+
+
+@unittest.skipUnless(importlib.util.find_spec('numpy'), 'numpy is not installed')
+class CohortAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', role='admin')
+        start = timezone.make_aware(timezone.datetime(2024, 1, 10))
+        for index, days in enumerate([10, 20, 30, 40, 50, 360]):
+            startup = Startup.objects.create(name=f'S{index}', owner=cls.admin, created_at=start + timedelta(days=index),
+                                             industry='Agritech' if index % 2 else None)
+            Milestone.objects.create(startup=startup, milestone_progress=1, status='completed',
+                                     completed_at=startup.created_at + timedelta(days=days))
+            Milestone.objects.create(startup=startup, milestone_progress=2, status='pending')
+
+    def test_percentiles_curves_and_outliers(self):
+        result = analytics.compute()
+        first, second = result['by_milestone']
+        self.assertEqual((first['key'], first['completed'], first['p50_days'], first['p90_days']), (1, 6, 35.0, 205.0))
+        self.assertEqual((second['completed'], second['p50_days']), (0, None))
+        self.assertEqual({row['key'] for row in result['by_industry']}, {'Agritech', 'Unspecified'})
+        self.assertEqual(result['cohort_curves'][0]['cohort'], '2024-Q1')
+        self.assertEqual(result['cohort_curves'][0]['curve']['30'], 25.0)  # 3 of 12 milestones
+        self.assertEqual([row['startup_name'] for row in result['outliers']], ['S5'])
+        self.assertEqual(analytics.compute('2023-Q1')['milestones'], 0)
+        out = StringIO()
+        call_command('cohort_analytics', '--refresh', stdout=out)
+        self.assertIn('2024-Q1: 30d 25.0%', out.getvalue())
+
+    def test_view_is_cached_until_next_transition(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        url = reverse('cohort_analytics')
+        with self.assertNumQueries(4):  # session, user, transition watermark, one values_list
+            self.client.get(url)
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(url).json()['completed'], 6)
+        milestone = Milestone.objects.filter(status='pending').first()
+        milestone.status, milestone.completed_at = 'completed', timezone.now()
+        milestone.save()
+        self.assertEqual(self.client.get(url).json()['completed'], 7)
+        self.assertEqual(self.client.get(url, {'cohort': 'soon'}).status_code, 400)
+
+
+class RollupSchedulingTests(TestCase):
+    def test_unsettled_transitions_queue_a_follow_up_run(self):
+        admin = User.objects.create(username='admin', role='admin')
+        milestone = Milestone.objects.create(startup=Startup.objects.create(name='Acme', owner=admin), status='pending')
+        milestone.status = 'completed'
+        milestone.save()
+        milestone.status = 'pending'
+        milestone.save()
+        rollup_jobs = Job.objects.filter(task=rollups.ROLLUP_TASK)
+        self.assertEqual(rollup_jobs.count(), 1)
+
+        first, second = StatusTransition.objects.order_by('pk')
+        StatusTransition.objects.filter(pk=first.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+        rollup_jobs.update(run_at=timezone.now())
+        call_command('run_worker', '--burst', stdout=StringIO())
+        self.assertEqual(sum(DailyStatusRollup.objects.values_list('count', flat=True)), 1)
+        follow_up = rollup_jobs.get(status='queued')
+        self.assertAlmostEqual(follow_up.run_at, second.created_at + timedelta(seconds=rollups.settle_seconds()),
+                               delta=timedelta(seconds=1))
+
+        StatusTransition.objects.filter(pk=second.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+        rollup_jobs.update(run_at=timezone.now())
+        call_command('run_worker', '--burst', stdout=StringIO())
+        self.assertEqual(sum(DailyStatusRollup.objects.values_list('count', flat=True)), 2)
+        self.assertFalse(rollup_jobs.filter(status='queued').exists())
+
+    @override_settings(JOB_QUEUE_EAGER=True)
+    def test_eager_status_change_leaves_the_rollup_to_a_worker(self):
+        admin = User.objects.create(username='admin', role='admin')
+        startup = Startup.objects.create(name='Acme', owner=admin)
+        milestone = Milestone.objects.create(startup=startup, milestone_progress=1, status='pending')
+        self.client.force_login(admin)
+        with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(10):
+            self.client.post(reverse('update_milestone_status', args=[startup.id, milestone.id]), {'status': 'completed'})
+        self.assertEqual(list(Job.objects.values_list('task', 'status')), [(rollups.ROLLUP_TASK, 'queued')])
+        self.assertFalse(DailyStatusRollup.objects.exists())
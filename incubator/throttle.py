@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Q, Value, When
+
+
+class LoginThrottle:
+    """Fixed-window counters of failed logins per client IP and per account.
+
+    Checked before any password hashing so a credential-stuffing burst is
+    turned away without burning CPU on PBKDF2. Limits come from the
+    LOGIN_THROTTLE setting: IP_LIMIT and ACCOUNT_LIMIT failures per WINDOW
+    seconds. An account is counted under its casefolded username whether the
+    login named it by username or by email, so alternating the two does not
+    double the allowance.
+    """
+
+    defaults = {'IP_LIMIT': 30, 'ACCOUNT_LIMIT': 5, 'WINDOW': 300}
+
+    @property
+    def config(self):
+        return {**self.defaults, **getattr(settings, 'LOGIN_THROTTLE', {})}
+
+    def account_key(self, request, login):
+        """Cache key counting failures against the account `login` names.
+
+        Resolved with the same indexed lookup as EmailOrUsernameBackend
+        (username match preferred over email), once per request; logins
+        naming no account are counted under themselves.
+        """
+        login = login.strip()
+        resolved = getattr(request, '_login_throttle_accounts', {})
+        if login not in resolved:
+            lookup = Q(username=login)
+            if '@' in login:
+                lookup |= Q(email=login)
+            username = (
+                get_user_model()._default_manager.filter(lookup)
+                .annotate(username_match=Case(When(username=login, then=Value(0)), default=Value(1),
+                                              output_field=IntegerField()))
+                .order_by('username_match', 'id')
+                .values_list('username', flat=True)
+                .first()
+            )
+            resolved[login] = f'login-fail:user:{(username or login).casefold()}'
+            if request is not None:
+                request._login_throttle_accounts = resolved
+        return resolved[login]
+
+    def keys(self, request, username):
+        config, keys = self.config, []
+        if username:
+            keys.append((self.account_key(request, username), config['ACCOUNT_LIMIT']))
+        if request is not None and request.META.get('REMOTE_ADDR'):
+            keys.append((f"login-fail:ip:{request.META['REMOTE_ADDR']}", config['IP_LIMIT']))
+        return keys
+
+    def is_blocked(self, request, username):
+        keys = self.keys(request, username)
+        counts = cache.get_many([key for key, _ in keys])
+        return any(counts.get(key, 0) >= limit for key, limit in keys)
+
+    def record_failure(self, request, username):
+        window = self.config['WINDOW']
+        for key, _ in self.keys(request, username):
+            cache.add(key, 0, window)
+            try:
+                cache.incr(key)
+            except ValueError:  # expired between add() and incr()
+                cache.set(key, 1, window)
+
+    def reset(self, request, username):
+        cache.delete(self.account_key(request, username))
+
+
+login_throttle = LoginThrottle()
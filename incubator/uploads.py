@@ -0,0 +1,174 @@
+import hashlib
+import os
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.utils import timezone
+
+from .models import ChunkedUpload
+
+COPY_BUFFER = 64 * 1024
+
+
+class UploadError(Exception):
+    """A chunk or finalize request the upload cannot accept; `status` is the HTTP status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class _PartialFile(File):
+    """A finished partial file; FileSystemStorage moves it into place instead of copying.
+
+    A `sha256` already computed for the file is passed on so that
+    ContentAddressedStorage does not read it a second time.
+    """
+
+    def __init__(self, file, name, sha256=None):
+        super().__init__(file, name)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.name
+
+
+def chunk_size():
+    return getattr(settings, 'CHUNKED_UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024)
+
+
+def max_upload_size():
+    return getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 2 * 1024 ** 3)
+
+
+def partial_dir():
+    return Path(getattr(settings, 'CHUNKED_UPLOAD_TEMP_DIR', None) or Path(settings.MEDIA_ROOT) / 'partial_uploads')
+
+
+def part_path(upload):
+    return partial_dir() / f'{upload.pk}.part'
+
+
+def start_upload(deliverable, field, user, filename, size):
+    if size < 0 or size > max_upload_size():
+        raise UploadError(f'Files must be at most {max_upload_size()} bytes.', status=413)
+    upload = ChunkedUpload.objects.create(
+        deliverable=deliverable, field=field, user=user, filename=os.path.basename(filename)[:255], size=size,
+    )
+    path = part_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+def append_chunk(upload, offset, stream, length, checksum=None):
+    """Write `length` bytes from `stream` at `offset` of the partial file.
+
+    Only the next expected offset is accepted (409 otherwise, so a client
+    that lost track asks for the progress and resumes). Data is copied to
+    disk in COPY_BUFFER pieces, never holding the chunk in memory, and
+    hashed on the way: a chunk whose SHA-256 differs from `checksum` is cut
+    off again (422) and the client sends it anew. The offset is advanced
+    with a conditional UPDATE, so of two clients racing on the same chunk
+    only one is counted.
+    """
+    if offset != upload.offset:
+        raise UploadError(f'Expected offset {upload.offset}.', status=409)
+    if length > chunk_size():
+        raise UploadError(f'Chunks must be at most {chunk_size()} bytes.', status=413)
+    if offset + length > upload.size:
+        raise UploadError('Chunk runs past the declared file size.', status=416)
+
+    written, digest = 0, hashlib.sha256()
+    with open(part_path(upload), 'r+b') as part:
+        part.seek(offset)
+        while written < length:
+            data = stream.read(min(COPY_BUFFER, length - written))
+            if not data:
+                break
+            part.write(data)
+            digest.update(data)
+            written += len(data)
+        if checksum is not None and written == length and digest.hexdigest() != checksum.strip().lower():
+            part.truncate(offset)
+            raise UploadError('Chunk checksum mismatch; send the chunk again.', status=422)
+        part.truncate()
+
+    updated = ChunkedUpload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=offset + written, updated_at=timezone.now(),
+    )
+    if not updated:
+        upload.refresh_from_db(fields=['offset'])
+        raise UploadError(f'Expected offset {upload.offset}.', status=409)
+    upload.offset = offset + written
+    if written < length:
+        raise UploadError('Connection closed mid-chunk; resume from the current offset.', status=400)
+    return upload.offset
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fileobj:
+        for data in iter(lambda: fileobj.read(COPY_BUFFER), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def finalize_upload(upload, checksum=None):
+    """Attach the received bytes to the deliverable, checking the whole file's SHA-256 if given.
+
+    Chunks are verified as they arrive (see append_chunk), so browsers need
+    not hash the whole file; clients that can may still send its digest. A
+    mismatch discards the received data so the client starts over. On
+    success the partial file is moved (not copied) into storage and the
+    upload row removed.
+    """
+    if upload.offset != upload.size:
+        raise UploadError(f'Only {upload.offset} of {upload.size} bytes received.', status=409)
+
+    path = part_path(upload)
+    digest = file_sha256(path)  # also the content address the storage files it under
+    if checksum and digest != checksum.strip().lower():
+        ChunkedUpload.objects.filter(pk=upload.pk).update(offset=0, updated_at=timezone.now())
+        path.write_bytes(b'')
+        raise UploadError('Checksum mismatch; the upload was reset.', status=422)
+
+    deliverable = upload.deliverable
+    attach_staged_file(deliverable, upload.field, path, upload.filename, sha256=digest)
+    upload.delete()
+    return deliverable
+
+
+def attach_staged_file(deliverable, field, path, filename, sha256=None):
+    """Store the file at `path` as the deliverable's `field`; the staged file is consumed"""
+    path = Path(path)
+    with open(path, 'rb') as fileobj:
+        getattr(deliverable, field).save(filename, _PartialFile(fileobj, name=str(path), sha256=sha256), save=False)
+    deliverable.save(update_fields=[field])
+    path.unlink(missing_ok=True)
+
+
+def stage_file(uploaded):
+    """Park a request's UploadedFile beside the partial uploads for a background job.
+
+    Large uploads Django already spooled to disk are moved, not copied.
+    Returns the staged path.
+    """
+    directory = partial_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{uuid.uuid4()}.staged'
+    if hasattr(uploaded, 'temporary_file_path'):
+        file_move_safe(uploaded.temporary_file_path(), str(path))
+    else:
+        with open(path, 'wb') as staged:
+            for chunk in uploaded.chunks():
+                staged.write(chunk)
+    return str(path)
+
+
+def discard_upload(upload):
+    part_path(upload).unlink(missing_ok=True)
+    upload.delete()
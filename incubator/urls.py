@@ -6,6 +6,9 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('search/', views.search_portfolio, name='search'),
+    path('analytics/transitions/', views.transition_trends, name='transition_trends'),
+    path('analytics/cohorts/', views.cohort_analytics, name='cohort_analytics'),
     
     # Super Admin
     path('super-admin/add-admin/', views.add_admin, name='add_admin'),
@@ -14,6 +17,8 @@ urlpatterns = [
     # Admin / Startup Management
     path('startups/<int:startup_id>/delete/', views.delete_startup, name='delete_startup'),
     path('startups/add/', views.add_startup, name='add_startup'),
+    path('startups/page/', views.startup_page, name='startup_page'),
+    path('startups/import-members/', views.import_members, name='import_members'),
     path('startups/<int:startup_id>/edit/', views.edit_startup, name='edit_startup'),
     path('startups/<int:startup_id>/', views.view_startup, name='view_startup'),
     path('startups/<int:startup_id>/add-member/', views.add_member, name='add_member'),
@@ -23,7 +28,15 @@ urlpatterns = [
     # Progress & Milestones
     path('startups/<int:startup_id>/submit-report/', views.submit_progress, name='submit_progress'),
     path('startups/<int:startup_id>/milestones/<int:milestone_id>/', views.view_milestone, name='view_milestone'),
+    path('startups/<int:startup_id>/milestones/<int:milestone_id>/download-all/', views.download_milestone_deliverables, name='download_milestone_deliverables'),
+    path('startups/<int:startup_id>/download-all/', views.download_startup_deliverables, name='download_startup_deliverables'),
+    path('cohorts/<str:cohort>/download-all/', views.download_cohort_deliverables, name='download_cohort_deliverables'),
+    path('exports/<str:kind>/', views.export_data, name='export_data'),
     path('startups/<int:startup_id>/milestones/<int:milestone_id>/status/', views.update_milestone_status, name='update_milestone_status'),
     path('deliverables/<int:deliverable_id>/attach_admin/', views.attach_admin_file, name='attach_admin_file'),
     path('deliverables/<int:deliverable_id>/attach_incubatee/', views.attach_incubatee_file, name='attach_incubatee_file'),
+    path('deliverables/<int:deliverable_id>/files/<str:field>/', views.download_deliverable_file, name='download_deliverable_file'),
+    path('deliverables/<int:deliverable_id>/uploads/', views.start_upload, name='start_upload'),
+    path('uploads/<uuid:upload_id>/', views.upload_detail, name='upload_detail'),
+    path('uploads/<uuid:upload_id>/complete/', views.complete_upload, name='complete_upload'),
 ]
@@ -1,14 +1,29 @@
+import os
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from .models import User, Startup, StartupMember, ProgressReport, Milestone, Deliverable
-from .forms import LoginForm, StartupForm, AdminCreationForm, ProgressReportForm, StartupMemberForm
-from django.db.models import Count
+from .models import User, Startup, StartupMember, ProgressReport, Milestone, Deliverable, ChunkedUpload, StatusTransition
+from .accounts import base_username, create_user_with_unique_username
+from .forms import LoginForm, StartupForm, AdminCreationForm, ProgressReportForm, StartupMemberForm, MemberImportForm
+from .importers import ImportFileError, MemberImporter, read_member_rows
+from .pagination import InvalidCursor, paginate_startups, startup_filters
+from .throttle import login_throttle
+from . import analytics, exports, rollups, search, tasks, uploads
+from .archives import deliverables_for, stream_deliverables_zip
+from .cohorts import InvalidCohort, filter_cohort
+from .downloads import serve_file
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
 from django.shortcuts import HttpResponse
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_http_methods, require_POST
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.text import slugify
+from django.views.static import serve
 
 def csrf_failure(request, reason=""):
     """Handle CSRF failures gracefully"""
@@ -25,15 +40,12 @@ def login_view(request):
         if form.is_valid():
             username = form.cleaned_data['username']
             password = form.cleaned_data['password']
+            if login_throttle.is_blocked(request, username):
+                messages.error(request, 'Too many failed login attempts. Please try again later.')
+                return render(request, 'login.html', {'form': form}, status=429)
+
+            # Accepts a username or an email (incubator.backends.EmailOrUsernameBackend)
             user = authenticate(request, username=username, password=password)
-            if user is None:
-                # Try finding user by email
-                try:
-                    user_obj = User.objects.filter(email=username).first()
-                    if user_obj:
-                        user = authenticate(request, username=user_obj.username, password=password)
-                except:
-                    pass
             
             if user is not None:
                 login(request, user)
@@ -61,29 +73,109 @@ def dashboard(request):
 
 def super_admin_dashboard(request):
     admins = User.objects.filter(role='admin')
-    incubatees = User.objects.filter(role='incubatee')
-    startups = Startup.objects.all()
+    startups, next_cursor, filters = paginate_startups(
+        Startup.objects.with_dashboard_stats(), startup_filters(request.GET)
+    )
+    user_stats = User.objects.aggregate(
+        total_users=Count('pk'),
+        total_admins=Count('pk', filter=Q(role='admin')),
+    )
     context = {
         'admins': admins, 
-        'incubatees': incubatees, 
         'startups': startups,
-        'total_startups': startups.count(),
-        'total_users': User.objects.count()
+        'total_startups': Startup.objects.count(),
+        'total_users': user_stats['total_users'],
+        'total_admins': user_stats['total_admins'],
+        'next_cursor': next_cursor,
+        'filters': filters,
+        'stage_choices': Startup.STAGE_CHOICES,
     }
     return render(request, 'dashboard/super_admin.html', context)
 
 def admin_dashboard(request):
-    startups = Startup.objects.all()
-    recent_reports = ProgressReport.objects.order_by('-submitted_at')[:10]
-    context = {'startups': startups, 'recent_reports': recent_reports}
+    startups, next_cursor, filters = paginate_startups(
+        Startup.objects.with_dashboard_stats(), startup_filters(request.GET)
+    )
+    recent_reports = ProgressReport.objects.select_related('startup', 'submitted_by').order_by('-submitted_at')[:10]
+    context = {
+        'startups': startups,
+        'recent_reports': recent_reports,
+        'next_cursor': next_cursor,
+        'filters': filters,
+        'stage_choices': Startup.STAGE_CHOICES,
+    }
     return render(request, 'dashboard/admin.html', context)
 
 def incubatee_dashboard(request):
     # Memberships
-    startups = request.user.startups.all()
+    startups = Startup.objects.filter(members=request.user).with_dashboard_stats()
     context = {'startups': startups}
     return render(request, 'dashboard/incubatee.html', context)
 
+@login_required
+def startup_page(request):
+    """Next keyset page of the dashboard startup list as an HTML fragment in JSON"""
+    if request.user.role not in ['admin', 'super_admin']:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+
+    try:
+        startups, next_cursor, _ = paginate_startups(Startup.objects.with_dashboard_stats(), request.GET)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    template = 'dashboard/_startup_rows.html' if request.user.role == 'super_admin' else 'dashboard/_startup_cards.html'
+    html = render_to_string(template, {'startups': startups}, request=request)
+    return JsonResponse({'html': html, 'next_cursor': next_cursor, 'ids': [startup.id for startup in startups]})
+
+@login_required
+def search_portfolio(request):
+    """Ranked full-text search over startups and progress reports (admins only)"""
+    if request.user.role not in ['admin', 'super_admin']:
+        return redirect('dashboard')
+    query = request.GET.get('q', '').strip()[:200]
+    # ?startup= / ?milestone= narrow the document results to one startup or milestone
+    startup_id, milestone_id = (
+        int(value) if value.isdigit() else None
+        for value in (request.GET.get('startup', ''), request.GET.get('milestone', ''))
+    )
+    context = {
+        'query': query,
+        'startups': search.search('startups', query) if query else [],
+        'reports': search.search('reports', query) if query else [],
+        'documents': search.search_documents(query, startup_id, milestone_id) if query else [],
+    }
+    return render(request, 'search/results.html', context)
+
+@login_required
+def transition_trends(request):
+    """Daily status transitions for trend charts, read from the precomputed rollups"""
+    if request.user.role not in ['admin', 'super_admin']:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    kind = request.GET.get('kind', 'milestone')
+    if kind not in dict(StatusTransition.KIND_CHOICES):
+        return JsonResponse({'error': 'Unknown kind'}, status=400)
+    try:
+        days = min(max(int(request.GET.get('days', 30)), 1), 366)
+    except ValueError:
+        return JsonResponse({'error': 'days must be a number'}, status=400)
+    series = rollups.daily_series(
+        kind, request.GET.get('status', 'completed'), days=days, stage=request.GET.get('stage') or None,
+    )
+    return JsonResponse({'days': [day.isoformat() for day, _ in series], 'counts': [count for _, count in series]})
+
+@login_required
+def cohort_analytics(request):
+    """Milestone time-to-complete statistics, cohort curves and outliers (?cohort= narrows to one intake)"""
+    if request.user.role not in ['admin', 'super_admin']:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    try:
+        result = analytics.cohort_analytics(request.GET.get('cohort') or None)
+    except InvalidCohort as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    except analytics.AnalyticsUnavailable as exc:
+        return JsonResponse({'error': str(exc)}, status=503)
+    return JsonResponse(result)
+
 @login_required
 def add_admin(request):
     if request.user.role != 'super_admin':
@@ -131,8 +223,9 @@ def delete_startup(request, startup_id):
         return redirect('dashboard')
         
     startup = get_object_or_404(Startup, id=startup_id)
-    startup.delete()
-    messages.success(request, f'Startup {startup.name} deleted.')
+    # Cascading through milestones, deliverables and files runs on a worker
+    tasks.delete_startup.enqueue(startup_id=startup.id)
+    messages.success(request, f'Startup {startup.name} is being deleted.')
     return redirect('dashboard')
 
 @login_required
@@ -146,29 +239,11 @@ def add_startup(request):
         if form.is_valid():
             startup = form.save(commit=False)
             startup.owner = request.user
-            startup.save()
             
-            # Auto-create default milestones
-            deliverable_counts = {1: 5, 2: 3, 3: 4, 4: 3}
-            
-            for i in range(1, 5):
-                milestone = Milestone.objects.create(
-                    startup=startup,
-                    milestone_progress=i,
-                    title=f"Milestone {i}",
-                    description=f"Default milestone {i} for {startup.name}",
-                    status='pending'
-                )
-                
-                # Add default deliverables based on milestone number
-                deliverable_count = deliverable_counts.get(i, 0)
-                for j in range(1, deliverable_count + 1):
-                    Deliverable.objects.create(
-                        milestone=milestone,
-                        name=f"Deliverable {j}",
-                        requirements=f"Complete deliverable {j} for milestone {i}",
-                        status='pending'
-                    )
+            with transaction.atomic():
+                startup.save()
+                # Default milestones and deliverables are created by a worker
+                tasks.apply_program_template.enqueue(startup_ids=[startup.id])
 
             messages.success(request, 'Startup created! Now add members.')
             return redirect('add_member', startup_id=startup.id)
@@ -179,19 +254,18 @@ def add_startup(request):
 # ... view_startup ...
 @login_required
 def view_startup(request, startup_id):
-    startup = get_object_or_404(Startup, id=startup_id)
+    startup = get_object_or_404(Startup.objects.select_related('owner'), id=startup_id)
     # Check permission?
-    milestones = startup.milestones.all()
-    reports = startup.progress_reports.order_by('-submitted_at')
+    milestones = list(
+        startup.milestones.order_by('milestone_progress', 'id').prefetch_related(
+            Prefetch('deliverables', queryset=Deliverable.objects.order_by('id'))
+        )
+    )
+    reports = startup.progress_reports.select_related('submitted_by').order_by('-submitted_at')
     
-    # Calculate current milestone (first one that's not completed and not locked)
-    current_milestone = None
-    current_milestone_id = None
-    for milestone in milestones:
-        if milestone.status != 'completed' and not milestone.is_locked():
-            current_milestone = milestone
-            current_milestone_id = milestone.id
-            break
+    # Lock state and current milestone (first one that's not completed and not locked)
+    current_milestone = Milestone.resolve_timeline(milestones)
+    current_milestone_id = current_milestone.id if current_milestone else None
     
     # Get startup members (only for admins)
     startup_members = []
@@ -240,8 +314,12 @@ def attach_admin_file(request, deliverable_id):
     deliverable = get_object_or_404(Deliverable, id=deliverable_id)
 
     if request.method == 'POST' and request.FILES.get('file'):
-        deliverable.admin_file = request.FILES.get('file')
-        deliverable.save()
+        upload = request.FILES['file']
+        tasks.attach_deliverable_file.enqueue(
+            deliverable_id=deliverable.id, field='admin_file',
+            staged_path=uploads.stage_file(upload), filename=upload.name,
+        )
+        messages.success(request, f'{upload.name} received and is being processed.')
 
     # Redirect back to milestone view
     milestone = deliverable.milestone
@@ -260,12 +338,213 @@ def attach_incubatee_file(request, deliverable_id):
         return redirect('dashboard')
 
     if request.method == 'POST' and request.FILES.get('file'):
-        deliverable.upload_file = request.FILES.get('file')
-        deliverable.save()
+        upload = request.FILES['file']
+        tasks.attach_deliverable_file.enqueue(
+            deliverable_id=deliverable.id, field='upload_file',
+            staged_path=uploads.stage_file(upload), filename=upload.name,
+        )
+        messages.success(request, f'{upload.name} received and is being processed.')
 
     milestone = deliverable.milestone
     return HttpResponseRedirect(reverse('view_milestone', args=[milestone.startup.id, milestone.id]))
 
+def _can_attach(user, deliverable, field):
+    """Admins attach either file; the startup's owner and members only their submission"""
+    if user.role in ['admin', 'super_admin']:
+        return True
+    if field != 'upload_file':
+        return False
+    startup = deliverable.milestone.startup
+    return startup.owner_id == user.id or startup.members.filter(pk=user.pk).exists()
+
+
+def _upload_progress(upload):
+    return {
+        'id': str(upload.pk),
+        'field': upload.field,
+        'filename': upload.filename,
+        'offset': upload.offset,
+        'size': upload.size,
+        'percent': round(upload.offset * 100 / upload.size, 1) if upload.size else 100.0,
+        'chunk_size': uploads.chunk_size(),
+        'url': reverse('upload_detail', args=[upload.pk]),
+        'complete_url': reverse('complete_upload', args=[upload.pk]),
+    }
+
+
+@login_required
+@require_POST
+def start_upload(request, deliverable_id):
+    """Begin (or resume) a chunked upload of a deliverable file"""
+    deliverable = get_object_or_404(Deliverable.objects.select_related('milestone__startup'), id=deliverable_id)
+    field = request.POST.get('field', 'upload_file')
+    if field not in dict(ChunkedUpload.FIELD_CHOICES):
+        return JsonResponse({'error': 'Unknown file field'}, status=400)
+    if not _can_attach(request.user, deliverable, field):
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    try:
+        size = int(request.POST.get('size', ''))
+    except ValueError:
+        return JsonResponse({'error': 'size is required'}, status=400)
+    filename = request.POST.get('filename', '').strip()
+    if not filename:
+        return JsonResponse({'error': 'filename is required'}, status=400)
+
+    # The same file started earlier by this user resumes where it stopped
+    upload = ChunkedUpload.objects.filter(
+        deliverable=deliverable, field=field, user=request.user, filename=filename, size=size,
+    ).order_by('-updated_at').first()
+    if upload is None:
+        try:
+            upload = uploads.start_upload(deliverable, field, request.user, filename, size)
+        except uploads.UploadError as e:
+            return JsonResponse({'error': str(e)}, status=e.status)
+    return JsonResponse(_upload_progress(upload), status=201)
+
+
+@login_required
+@require_http_methods(['GET', 'PUT', 'DELETE'])
+def upload_detail(request, upload_id):
+    """GET: progress. PUT: append the body at Upload-Offset, checked against Upload-Checksum. DELETE: abandon"""
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id, user=request.user)
+    if request.method == 'DELETE':
+        uploads.discard_upload(upload)
+        return JsonResponse({'id': str(upload_id), 'deleted': True})
+    if request.method == 'PUT':
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return JsonResponse({'error': 'Upload-Offset header is required'}, status=400)
+        # "sha256 <hex digest of this chunk>"
+        algorithm, _, checksum = request.headers.get('Upload-Checksum', '').partition(' ')
+        if algorithm.lower() != 'sha256' or not checksum:
+            return JsonResponse({'error': 'Upload-Checksum: sha256 <hex> header is required'}, status=400)
+        try:
+            uploads.append_chunk(upload, offset, request, length, checksum)
+        except uploads.UploadError as e:
+            return JsonResponse({'error': str(e), **_upload_progress(upload)}, status=e.status)
+    return JsonResponse(_upload_progress(upload))
+
+
+@login_required
+@require_POST
+def complete_upload(request, upload_id):
+    """Attach the assembled file to the deliverable (checking an optional whole-file sha256)"""
+    upload = get_object_or_404(ChunkedUpload.objects.select_related('deliverable'), pk=upload_id, user=request.user)
+    try:
+        deliverable = uploads.finalize_upload(upload, request.POST.get('sha256') or None)
+    except uploads.UploadError as e:
+        upload.refresh_from_db()
+        return JsonResponse({'error': str(e), **_upload_progress(upload)}, status=e.status)
+    return JsonResponse({
+        'id': str(upload_id),
+        'field': upload.field,
+        'name': getattr(deliverable, upload.field).name,
+        'url': reverse('download_deliverable_file', args=[deliverable.id, upload.field]),
+    })
+
+
+@login_required
+@require_http_methods(['GET', 'HEAD'])
+def download_deliverable_file(request, deliverable_id, field):
+    """A deliverable's file for admins and the startup's owner/members only"""
+    if field not in dict(ChunkedUpload.FIELD_CHOICES):
+        raise Http404
+    deliverable = get_object_or_404(Deliverable.objects.select_related('milestone__startup'), id=deliverable_id)
+    startup = deliverable.milestone.startup
+    if request.user.role not in ['admin', 'super_admin'] and not (
+        startup.owner_id == request.user.id or startup.members.filter(pk=request.user.pk).exists()
+    ):
+        return HttpResponse(status=403)
+
+    file = getattr(deliverable, field)
+    if not file or not file.storage.exists(file.name):
+        raise Http404
+    extension = os.path.splitext(file.name)[1].lower()
+    filename = f"{slugify(deliverable.name) or 'deliverable'}{'-admin' if field == 'admin_file' else ''}{extension}"
+    return serve_file(request, file.storage, file.name, filename, as_attachment='download' in request.GET)
+
+
+def serve_public_media(request, path, document_root=None):
+    """MEDIA_URL under DEBUG: startup logos and their variants only.
+
+    Deliverable files share the storage but are served by
+    download_deliverable_file, which checks who is asking.
+    """
+    if not Startup.objects.filter(Q(logo=path) | Q(logo_variants__icontains=path)).exists():
+        raise Http404
+    return serve(request, path, document_root=document_root)
+
+
+def _can_view_startup(user, startup):
+    return user.role in ['admin', 'super_admin'] or (
+        startup.owner_id == user.id or startup.members.filter(pk=user.pk).exists()
+    )
+
+
+def _zip_response(request, deliverables, filename):
+    """Stream the deliverables' files as a ZIP; `?manifest=1` adds a manifest.csv"""
+    response = StreamingHttpResponse(
+        stream_deliverables_zip(deliverables, manifest=request.GET.get('manifest') == '1'),
+        content_type='application/zip',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+@login_required
+def download_milestone_deliverables(request, startup_id, milestone_id):
+    startup = get_object_or_404(Startup, id=startup_id)
+    milestone = get_object_or_404(Milestone, id=milestone_id, startup=startup)
+    if not _can_view_startup(request.user, startup):
+        return HttpResponse(status=403)
+    milestone_slug = slugify(milestone.title or '') or f'milestone-{milestone.milestone_progress or milestone.id}'
+    filename = f"{slugify(startup.name) or 'startup'}-{milestone_slug}-deliverables"
+    return _zip_response(request, deliverables_for(milestone=milestone), filename)
+
+
+@login_required
+def download_startup_deliverables(request, startup_id):
+    startup = get_object_or_404(Startup, id=startup_id)
+    if not _can_view_startup(request.user, startup):
+        return HttpResponse(status=403)
+    return _zip_response(request, deliverables_for(startup=startup), f"{slugify(startup.name) or 'startup'}-deliverables")
+
+
+@login_required
+def download_cohort_deliverables(request, cohort):
+    """Every deliverable of the startups in an intake cohort (admins only)"""
+    if request.user.role not in ['admin', 'super_admin']:
+        return HttpResponse(status=403)
+    try:
+        startups = filter_cohort(Startup.objects.all(), cohort)
+    except InvalidCohort as exc:
+        return HttpResponse(str(exc), status=400, content_type='text/plain')
+    return _zip_response(request, deliverables_for(startups=startups), f'cohort-{cohort.upper()}-deliverables')
+
+
+@login_required
+def export_data(request, kind):
+    """Stream a portfolio extract; ?format=csv|jsonl&since=&until=&stage=&cohort="""
+    if request.user.role not in ['admin', 'super_admin']:
+        return HttpResponse(status=403)
+    fmt = request.GET.get('format', 'csv')
+    try:
+        fields, rows = exports.export_rows(
+            kind, since=request.GET.get('since'), until=request.GET.get('until'),
+            stage=request.GET.get('stage'), cohort=request.GET.get('cohort'),
+        )
+        content = exports.stream_export(fmt, fields, rows)
+    except exports.ExportError as exc:
+        return HttpResponse(str(exc), status=400, content_type='text/plain')
+    response = StreamingHttpResponse(content, content_type=f'{exports.FORMATS[fmt]}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{kind}-{timezone.localdate():%Y%m%d}.{fmt}"'
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
 @login_required
 def add_member(request, startup_id):
     if request.user.role not in ['admin', 'super_admin']:
@@ -284,19 +563,11 @@ def add_member(request, startup_id):
             email = form.cleaned_data['email']
             contact = form.cleaned_data['contact_number']
             
-            # Generate Username: lastname.firstname
-            base_username = f"{last_name.lower()}.{first_name.lower()}".replace(" ", "")
-            username = base_username
-            counter = 1
-            while User.objects.filter(username=username).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
-            
-            # Create User (Default password)
+            # Create User (Default password) under the first free lastname.firstname[N]
             password = "123"
             try:
-                user = User.objects.create_user(
-                    username=username, 
+                user = create_user_with_unique_username(
+                    base_username(first_name, last_name),
                     email=email, 
                     password=password,
                     first_name=first_name,
@@ -305,6 +576,7 @@ def add_member(request, startup_id):
                     contact_number=contact,
                     role='incubatee' 
                 )
+                username = user.username
                 
                 # Link to Startup
                 StartupMember.objects.create(
@@ -320,7 +592,30 @@ def add_member(request, startup_id):
     else:
         form = StartupMemberForm()
 
-    return render(request, 'startups/add_member.html', {'form': form, 'startup': startup})
+    members = startup.startupmember_set.select_related('user').order_by('id')
+    return render(request, 'startups/add_member.html', {'form': form, 'startup': startup, 'members': members})
+
+
+@login_required
+def import_members(request):
+    """Bulk-create members across startups from a CSV/XLSX spreadsheet"""
+    if request.user.role not in ['admin', 'super_admin']:
+        return redirect('dashboard')
+
+    result = None
+    if request.method == 'POST':
+        form = MemberImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                result = MemberImporter().run(read_member_rows(upload, upload.name))
+            except ImportFileError as e:
+                form.add_error('file', str(e))
+            else:
+                messages.success(request, f'{result.created} member(s) imported, {result.failed} row(s) skipped.')
+    else:
+        form = MemberImportForm()
+    return render(request, 'startups/import_members.html', {'form': form, 'result': result})
 
 
 @login_required
@@ -442,6 +737,7 @@ def update_milestone_status(request, startup_id, milestone_id):
             milestone.status = new_status
             if new_status == 'completed':
                 milestone.completed_at = timezone.now()
+            milestone._changed_by = request.user  # credited in the status transition log
             milestone.save()
             messages.success(request, f'Milestone status updated to {milestone.get_status_display()}')
     
@@ -0,0 +1,76 @@
+// Resumable chunked uploads for deliverable files (see incubator.uploads).
+// Forms marked data-chunked-upload="<field>" with a data-start-url are sent in
+// chunks; starting the same file again resumes from the server's offset. Each
+// chunk carries its own SHA-256, so only one chunk is ever held in memory.
+(function () {
+    function hex(buffer) {
+        return Array.from(new Uint8Array(buffer), function (b) { return b.toString(16).padStart(2, '0'); }).join('');
+    }
+
+    function request(url, options, csrfToken) {
+        options.headers = Object.assign({ 'X-CSRFToken': csrfToken, 'Accept': 'application/json' }, options.headers);
+        options.credentials = 'same-origin';
+        return fetch(url, options).then(function (response) {
+            return response.json().then(function (body) {
+                body.status = response.status;
+                return body;
+            });
+        });
+    }
+
+    async function upload(form, file, onProgress) {
+        const csrfToken = form.querySelector('[name=csrfmiddlewaretoken]').value;
+        const start = new FormData();
+        start.append('field', form.dataset.chunkedUpload);
+        start.append('filename', file.name);
+        start.append('size', file.size);
+        let state = await request(form.dataset.startUrl, { method: 'POST', body: start }, csrfToken);
+        if (state.status >= 400) throw new Error(state.error);
+
+        while (state.offset < state.size) {
+            onProgress(state.percent);
+            const chunk = await file.slice(state.offset, state.offset + state.chunk_size).arrayBuffer();
+            const next = await request(state.url, {
+                method: 'PUT',
+                headers: {
+                    'Upload-Offset': String(state.offset),
+                    'Upload-Checksum': 'sha256 ' + hex(await crypto.subtle.digest('SHA-256', chunk)),
+                    'Content-Type': 'application/octet-stream',
+                },
+                body: chunk,
+            }, csrfToken);
+            // 409 carries the offset to resume from; 422 means the chunk arrived damaged, so send it again
+            if (next.status >= 400 && next.status !== 409 && next.status !== 422) throw new Error(next.error);
+            Object.assign(state, next);
+        }
+        onProgress(100);
+
+        const done = await request(state.complete_url, { method: 'POST', body: new FormData() }, csrfToken);
+        if (done.status >= 400) throw new Error(done.error);
+        return done;
+    }
+
+    document.querySelectorAll('form[data-chunked-upload]').forEach(function (form) {
+        form.addEventListener('submit', function (event) {
+            const input = form.querySelector('input[type=file]');
+            if (!form.dataset.startUrl || !input.files.length || !window.crypto || !crypto.subtle) {
+                return;  // fall back to the plain multipart POST
+            }
+            event.preventDefault();
+            const button = form.querySelector('[type=submit]');
+            const label = button.textContent;
+            button.disabled = true;
+            upload(form, input.files[0], function (percent) {
+                button.textContent = Math.floor(percent) + '%';
+            })
+                .then(function () { window.location.reload(); })
+                .catch(function (error) {
+                    alert('Upload failed: ' + error.message + '. Submit again to resume.');
+                })
+                .finally(function () {
+                    button.disabled = false;
+                    button.textContent = label;
+                });
+        });
+    });
+})();
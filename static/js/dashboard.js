@@ -0,0 +1,19 @@
+// Incremental loading for keyset-paginated startup lists
+document.querySelectorAll('[data-load-more]').forEach(function (button) {
+    const target = document.getElementById(button.dataset.target);
+
+    button.addEventListener('click', function () {
+        button.disabled = true;
+        fetch(button.dataset.url + '?cursor=' + encodeURIComponent(button.dataset.cursor), {
+            headers: { 'Accept': 'application/json' },
+            credentials: 'same-origin',
+        })
+            .then(function (response) { return response.json(); })
+            .then(function (page) {
+                target.insertAdjacentHTML('beforeend', page.html);
+                button.dataset.cursor = page.next_cursor || '';
+                button.hidden = !page.next_cursor;
+            })
+            .finally(function () { button.disabled = false; });
+    });
+});